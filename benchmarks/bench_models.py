@@ -0,0 +1,108 @@
+"""Latency/throughput benchmark for the model runtime backends.
+
+Run with ``python benchmarks/bench_models.py [--rows 200] [--repeat 2000]``.
+A batch of ``--rows`` rows mirrors one second of ticks across the
+subscribed universe; the per-batch latency should stay below 1 ms.
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from scanner.model import (  # noqa: E402
+    FEATURE_NAMES,
+    LogisticModel,
+    TreeEnsembleModel,
+    OnnxModel,
+)
+
+
+def make_trees(n_trees: int, depth: int, n_features: int, rng: np.random.Generator) -> TreeEnsembleModel:
+    roots, feature, threshold, left, right, value = [], [], [], [], [], []
+    for _ in range(n_trees):
+        roots.append(len(feature))
+        n_inner = 2 ** depth - 1
+        base = len(feature)
+        for i in range(2 ** (depth + 1) - 1):
+            if i < n_inner:
+                feature.append(int(rng.integers(n_features)))
+                threshold.append(float(rng.normal()))
+                left.append(base + 2 * i + 1)
+                right.append(base + 2 * i + 2)
+                value.append(0.0)
+            else:
+                feature.append(-1)
+                threshold.append(0.0)
+                left.append(-1)
+                right.append(-1)
+                value.append(float(rng.normal(scale=0.1)))
+    return TreeEnsembleModel(FEATURE_NAMES, roots, feature, threshold, left, right, value)
+
+
+def make_onnx(weights: np.ndarray, intercept: float, path: Path) -> OnnxModel | None:
+    try:
+        import onnx
+        from onnx import TensorProto, helper, numpy_helper
+        import onnxruntime  # noqa: F401
+    except ImportError:
+        return None
+    w = numpy_helper.from_array(weights.astype(np.float32).reshape(-1, 1), "w")
+    b = numpy_helper.from_array(np.array([intercept], dtype=np.float32), "b")
+    graph = helper.make_graph(
+        [
+            helper.make_node("MatMul", ["x", "w"], ["xw"]),
+            helper.make_node("Add", ["xw", "b"], ["z"]),
+            helper.make_node("Sigmoid", ["z"], ["prob"]),
+        ],
+        "logistic",
+        [helper.make_tensor_value_info("x", TensorProto.FLOAT, [None, len(weights)])],
+        [helper.make_tensor_value_info("prob", TensorProto.FLOAT, [None, 1])],
+        [w, b],
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)])
+    model.ir_version = 8
+    onnx.save(model, path)
+    return OnnxModel(path)
+
+
+def bench(name: str, model, matrix: np.ndarray, repeat: int) -> None:
+    model.predict_batch(matrix)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        model.predict_batch(matrix)
+    elapsed = time.perf_counter() - start
+    per_batch_us = elapsed / repeat * 1e6
+    rows_per_sec = matrix.shape[0] * repeat / elapsed
+    print(f"{name:<16} {per_batch_us:10.1f} us/batch {rows_per_sec:14,.0f} rows/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--trees", type=int, default=100)
+    parser.add_argument("--depth", type=int, default=4)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    matrix = rng.normal(size=(args.rows, len(FEATURE_NAMES)))
+    coef = {n: float(c) for n, c in zip(FEATURE_NAMES, rng.normal(size=len(FEATURE_NAMES)))}
+    logistic = LogisticModel(-1.0, coef, {})
+    bench("logistic", logistic, matrix, args.repeat)
+    bench("tree_ensemble", make_trees(args.trees, args.depth, len(FEATURE_NAMES), rng), matrix, args.repeat)
+    with tempfile.TemporaryDirectory() as tmp:
+        onnx_model = make_onnx(logistic._weights, logistic.intercept, Path(tmp) / "model.onnx")
+        if onnx_model is None:
+            print("onnx             skipped (onnx/onnxruntime not installed)")
+        else:
+            bench("onnx", onnx_model, matrix, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
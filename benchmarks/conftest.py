@@ -0,0 +1,166 @@
+"""Fixtures and baseline regression gate for the hot-path benchmarks.
+
+Run ``pytest benchmarks`` (requires ``pytest-benchmark``). Each benchmark's
+median is compared with ``benchmarks/baseline.json`` and fails when it is
+more than ``--max-regression`` percent slower. Medians are normalised by a
+fixed reference workload timed in the same session and stored with every
+baseline entry, so a slower or busier machine does not fail the gate.
+Record new baselines with ``pytest benchmarks --update-baseline``; only the
+benchmarks that ran are re-recorded.
+"""
+
+import json
+import platform
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from scanner.features import BarResampler  # noqa: E402
+from scanner.mexc_sim import MarketGenerator, Scenario  # noqa: E402
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+SIX_HOURS = 21600
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("baseline")
+    group.addoption("--baseline", default=str(BASELINE_PATH), help="baseline JSON file")
+    group.addoption("--update-baseline", action="store_true", help="record medians as the new baseline")
+    group.addoption(
+        "--max-regression",
+        type=float,
+        default=25.0,
+        help="fail when a median is this many percent slower than the baseline",
+    )
+
+
+def reference_time(rounds: int = 50) -> float:
+    """Best time of a fixed Python and NumPy workload, the gate's yardstick."""
+    data = np.random.default_rng(0).random(100_000)
+    values = data[:20_000].tolist()
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        total = 0.0
+        for x in values:
+            total += x * x
+        np.sort(data)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+class BaselineGate:
+    """Compare benchmark medians with stored baselines.
+
+    Every entry keeps the :func:`reference_time` of the run that recorded
+    it; the allowed median is scaled by how much slower the reference runs
+    now.
+    """
+
+    def __init__(self, path: Path, update: bool, max_regression: float, reference: float) -> None:
+        self.path = path
+        self.update = update
+        self.max_regression = max_regression
+        self.reference = reference
+        data = json.loads(path.read_text()) if path.exists() else {}
+        self.results: Dict[str, Dict[str, float]] = dict(data.get("benchmarks", {}))
+
+    def check(self, name: str, median: float) -> None:
+        if self.update:
+            self.results[name] = {"median": float(f"{median:.4g}"), "reference": float(f"{self.reference:.4g}")}
+            return
+        base = self.results.get(name)
+        if base is None:
+            return
+        scale = self.reference / base.get("reference", self.reference)
+        limit = base["median"] * scale * (1 + self.max_regression / 100)
+        if median > limit:
+            pytest.fail(
+                f"{name} regressed: median {median * 1e6:.1f} us vs baseline "
+                f"{base['median'] * 1e6:.1f} us x {scale:.2f} machine speed (+{self.max_regression:g}% allowed)"
+            )
+
+    def save(self) -> None:
+        data = {
+            "machine": {"python": platform.python_version(), "processor": platform.machine()},
+            "recorded": time.strftime("%Y-%m-%d"),
+            "benchmarks": dict(sorted(self.results.items())),
+        }
+        self.path.write_text(json.dumps(data, indent=2) + "\n")
+
+
+@pytest.fixture(scope="session")
+def baseline_gate(request: pytest.FixtureRequest):
+    opt = request.config.getoption
+    gate = BaselineGate(
+        Path(opt("--baseline")), opt("--update-baseline"), opt("--max-regression"), reference_time()
+    )
+    yield gate
+    if gate.update:
+        gate.save()
+
+
+@pytest.fixture
+def bench(benchmark, baseline_gate, request) -> Callable[..., Any]:
+    """Run ``benchmark(fn, *args)`` and gate its median against the baseline."""
+
+    def run(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        result = benchmark(fn, *args, **kwargs)
+        if benchmark.stats is not None:
+            baseline_gate.check(request.node.name, benchmark.stats.stats.median)
+        return result
+
+    return run
+
+
+@pytest.fixture(scope="session")
+def market() -> MarketGenerator:
+    gen = MarketGenerator(Scenario(symbols=2000, pump_rate=0.001, depth_levels=20, seed=7))
+    for t in range(1, 61):
+        gen.step(float(t))
+    return gen
+
+
+@pytest.fixture(scope="session")
+def ticker_payload(market: MarketGenerator) -> List[Dict[str, Any]]:
+    """Bulk ``/api/v3/ticker/24hr`` response for 2,000 pairs."""
+    return market.tickers()
+
+
+@pytest.fixture(scope="session")
+def depth_frames(market: MarketGenerator) -> List[Dict[str, Any]]:
+    """``depth.diff`` frames in the shape the stand-in server sends."""
+    frames = []
+    for i in range(200):
+        market.step(61.0 + i)
+        frames.append({"stream": f"{market.names[0]}@depth.diff", "data": market.depth(0)})
+    return frames
+
+
+@pytest.fixture(scope="session")
+def kline_frames(market: MarketGenerator) -> List[Dict[str, Any]]:
+    return [
+        {"stream": f"{market.names[i]}@kline_1s", "data": market.kline(i)} for i in range(200)
+    ]
+
+
+@pytest.fixture
+def six_hour_bars() -> Callable[..., BarResampler]:
+    """Factory of :class:`BarResampler` objects fed 6h of per-second klines."""
+
+    def make(now: float | None = None, seed: int = 0) -> BarResampler:
+        now = time.time() if now is None else now
+        rng = np.random.default_rng(seed)
+        bars = BarResampler()
+        prices = 1.0 + np.cumsum(rng.normal(0, 1e-4, SIX_HOURS))
+        for i, (p, v) in enumerate(zip(prices, rng.uniform(100, 10_000, SIX_HOURS))):
+            bars.update(now - SIX_HOURS + 1 + i, p, v)
+        return bars
+
+    return make
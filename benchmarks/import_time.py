@@ -0,0 +1,71 @@
+"""Import-time benchmark based on ``python -X importtime``.
+
+Run ``python benchmarks/import_time.py`` to print the cumulative import time
+of each light entry point against its budget. ``pytest benchmarks`` enforces
+the same wall-clock budgets; ``tests/test_import_time.py`` only checks that
+heavy dependencies stay unloaded.
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# cumulative import time budgets in milliseconds
+BUDGETS_MS: Dict[str, float] = {
+    "scanner": 50.0,
+    "scanner.storage": 100.0,
+    "config": 250.0,
+}
+
+# heavy dependencies that light entry points must not pull in
+HEAVY_MODULES = ["numpy", "pandas", "pyarrow", "websockets", "telegram", "httpx", "aiohttp"]
+
+
+def import_time_ms(module: str) -> float:
+    """Return the cumulative import time of ``module`` in a fresh interpreter."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1]) / 1000.0
+    raise RuntimeError(f"{module} not found in -X importtime output")
+
+
+def loaded_heavy_modules(module: str) -> List[str]:
+    """Return the heavy dependencies loaded by importing ``module``."""
+    code = (
+        f"import sys, {module}; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    out = proc.stdout.strip()
+    return out.split(",") if out else []
+
+
+def main() -> None:
+    failed = False
+    for module, budget in BUDGETS_MS.items():
+        best = min(import_time_ms(module) for _ in range(3))
+        heavy = loaded_heavy_modules(module)
+        ok = best <= budget and not heavy
+        failed |= not ok
+        extra = f" loads {', '.join(heavy)}" if heavy else ""
+        print(f"{module:<18} {best:8.1f} ms  budget {budget:6.1f} ms  {'ok' if ok else 'FAIL'}{extra}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""Soak test of ``MexcWSClient`` -> ``Scanner.run`` against the local stand-in.
+
+Run with ``python benchmarks/soak.py [--symbols 2000] [--duration 600]``.
+The stand-in server (``scanner.mexc_sim``) runs in a subprocess so that the
+measured process only contains the scanner. Every ``--interval`` seconds
+the script prints message/tick throughput and resident memory; it exits
+non-zero if memory grows more than ``--max-growth-mb`` after the warm-up
+or the scanner processes fewer than ``--min-ratio`` of the ticks offered.
+The default of 2000 symbols is 10x the default ``subscriptions.top_n``.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import config  # noqa: E402
+from scanner.mexc_sim import MarketGenerator, Scenario  # noqa: E402
+from scanner.scanner import Scanner  # noqa: E402
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def rss_mb() -> float:
+    """Current resident set size of this process."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):  # pragma: no cover - non-Linux
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def scanner_config(ws_url: str, rest_url: str, symbols: int) -> Dict[str, Any]:
+    return {
+        "mexc": {"ws_url": ws_url, "rest_url": rest_url},
+        "scanner": {
+            "prob_threshold": 0.99,
+            "metrics": {"vsr": 5, "pm": 0.02, "obi": 0.25, "spread": 0.01, "listing_age_min": 0},
+        },
+        "scout": {"min_quote_vol_usd": 0, "top_n": symbols},
+        "subscriptions": {"top_n": symbols, "lru_ttl_sec": 900, "poll_interval": 60},
+    }
+
+
+async def soak(args: argparse.Namespace, ws_url: str, rest_url: str) -> List[Dict[str, float]]:
+    names = MarketGenerator(Scenario(symbols=args.symbols)).names
+    cfg = scanner_config(ws_url, rest_url, args.symbols)
+    with tempfile.NamedTemporaryFile("w", suffix=".yaml", delete=False) as f:
+        yaml.safe_dump(cfg, f)
+    # model loading reads thresholds through the global config
+    config.load_config(f.name)
+    os.unlink(f.name)
+
+    sc = Scanner(names, cfg)
+    sc.client.MAX_PENDING_TICKS = max(sc.client.MAX_PENDING_TICKS, args.symbols)
+    sc.client.mailbox.maxsize = sc.client.MAX_PENDING_TICKS
+
+    async def consume() -> None:
+        async for _ in sc.run():
+            pass
+
+    task = asyncio.create_task(consume())
+    samples: List[Dict[str, float]] = []
+    started = time.monotonic()
+    last_msgs = last_ticks = 0
+    last_t = started
+    try:
+        while time.monotonic() - started < args.duration:
+            await asyncio.sleep(args.interval)
+            if task.done():
+                task.result()
+            now = time.monotonic()
+            msgs, ticks = sc.client.messages_received, sc.ticks_processed
+            dt = now - last_t
+            sample = {
+                "t": round(now - started, 1),
+                "msgs_per_sec": round((msgs - last_msgs) / dt, 1),
+                "ticks_per_sec": round((ticks - last_ticks) / dt, 1),
+                "ticks_dropped": sc.client.mailbox.overflowed,
+                "symbols": len(sc.client._symbol_conn),
+                "rss_mb": round(rss_mb(), 1),
+            }
+            samples.append(sample)
+            print(json.dumps(sample), flush=True)
+            last_msgs, last_ticks, last_t = msgs, ticks, now
+    finally:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError, Exception):
+            await task
+    return samples
+
+
+def check(samples: List[Dict[str, float]], args: argparse.Namespace) -> List[str]:
+    steady = [s for s in samples if s["t"] >= args.warmup]
+    if len(steady) < 2:
+        return ["run too short for the warm-up period"]
+    problems = []
+    growth = steady[-1]["rss_mb"] - steady[0]["rss_mb"]
+    if growth > args.max_growth_mb:
+        problems.append(f"memory grew {growth:.1f} MB after warm-up")
+    offered = args.symbols * args.rate
+    ticks = sum(s["ticks_per_sec"] for s in steady) / len(steady)
+    if ticks < offered * args.min_ratio:
+        problems.append(f"processed {ticks:.0f} ticks/s of {offered:.0f} offered")
+    return problems
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=2000)
+    parser.add_argument("--rate", type=float, default=1.0, help="updates per symbol and second")
+    parser.add_argument("--duration", type=float, default=600)
+    parser.add_argument("--interval", type=float, default=10)
+    parser.add_argument("--warmup", type=float, default=60)
+    parser.add_argument("--pump-rate", type=float, default=0.0005)
+    parser.add_argument("--gap-rate", type=float, default=0.001)
+    parser.add_argument("--disconnect-every", type=float, default=120)
+    parser.add_argument("--max-growth-mb", type=float, default=50)
+    parser.add_argument("--min-ratio", type=float, default=0.8)
+    args = parser.parse_args(argv)
+
+    port = free_port()
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "scanner.mexc_sim",
+            "--port", str(port),
+            "--symbols", str(args.symbols),
+            "--rate", str(args.rate),
+            "--pump-rate", str(args.pump_rate),
+            "--gap-rate", str(args.gap_rate),
+            "--disconnect-every", str(args.disconnect_every),
+        ],
+        cwd=ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 10
+        while True:
+            with contextlib.suppress(OSError), socket.create_connection(("127.0.0.1", port), 0.2):
+                break
+            if time.monotonic() > deadline or server.poll() is not None:
+                print("stand-in server failed to start", file=sys.stderr)
+                return 1
+            time.sleep(0.1)
+        samples = asyncio.run(soak(args, f"ws://127.0.0.1:{port}/ws", f"http://127.0.0.1:{port}"))
+    finally:
+        server.terminate()
+        server.wait()
+    problems = check(samples, args)
+    for p in problems:
+        print(f"FAIL: {p}")
+    if not problems:
+        print("ok")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+import asyncio
+import itertools
+from collections import deque
+
+import numpy as np
+import pytest
+
+import scanner.storage as storage
+import scanner.volume_scout as volume_scout
+from scanner.candles import Candle
+from scanner.collector import MexcWSClient, Tick
+import scanner.features as features
+from scanner.features import FeatureEngine, FeatureVector, RollingWindow
+from scanner.bus import SignalEvent
+from scanner.model import LogisticModel
+from scanner.paper import PaperTrader
+from scanner.trades import TradeAggregator
+from scanner.universe import UniverseScanner
+
+THRESHOLDS = {"vsr": 5, "pm": 0.02, "obi": 0.25}
+
+
+def make_client(symbols):
+    client = MexcWSClient(symbols, "ws://bench")
+    for s in symbols:
+        client._symbol_conn[s] = 0
+    client._stream_counts = [2 * len(symbols)]
+    return client
+
+
+def test_update_depth(bench, depth_frames):
+    symbol = depth_frames[0]["data"]["s"]
+    client = make_client([symbol])
+    frames = [f["data"] for f in depth_frames]
+
+    def apply():
+        for data in frames:
+            client._update_depth(symbol, data)
+
+    bench(apply)
+    assert client.get_best(symbol)
+
+
+def test_get_cum_depth(bench, depth_frames):
+    symbol = depth_frames[0]["data"]["s"]
+    client = make_client([symbol])
+    for f in depth_frames:
+        client._update_depth(symbol, f["data"])
+    assert bench(client.get_cum_depth, symbol)
+
+
+def test_handle_message(bench, kline_frames, depth_frames):
+    symbols = [f["data"]["s"] for f in kline_frames]
+    client = make_client(symbols)
+    client._check_quality = _no_quality_check
+    depth = [{"stream": f"{s}@depth.diff", "data": {**depth_frames[0]["data"], "s": s}} for s in symbols]
+    frames = [m for pair in zip(kline_frames, depth) for m in pair]
+
+    async def handle():
+        for msg in frames:
+            await client._handle_message(msg)
+
+    loop = asyncio.new_event_loop()
+    try:
+        bench(lambda: loop.run_until_complete(handle()))
+    finally:
+        loop.close()
+
+
+async def _no_quality_check(symbol):
+    return None
+
+
+def test_rolling_window_append(bench):
+    window = RollingWindow(21600)
+    clock = iter(range(10**9))
+    bench(lambda: window.append(next(clock), 1.0))
+
+
+def test_bar_median_6h(bench, six_hour_bars):
+    bars = six_hour_bars()
+    assert bench(bars.volume_rate_median) > 0
+
+
+def test_bar_update(bench, six_hour_bars):
+    bars = six_hour_bars(now=0.0)
+    clock = iter(range(1, 10**9))
+    bench(lambda: bars.update(next(clock), 1.0, 100.0))
+
+
+def test_feature_engine_update(bench, six_hour_bars, depth_frames, monkeypatch):
+    symbol = depth_frames[0]["data"]["s"]
+    client = make_client([symbol])
+    for f in depth_frames:
+        client._update_depth(symbol, f["data"])
+    engine = FeatureEngine()
+    clock = [0.0]
+    monkeypatch.setattr(features.time, "time", lambda: clock[0])
+    engine._bars[symbol] = six_hour_bars(now=0.0)
+
+    def update():
+        # one closed 1s candle per call keeps the 5m windows at steady size
+        clock[0] += 1
+        client._closed_candles.setdefault(symbol, deque()).append(Candle(clock[0] - 1, 1.01, 2500.0))
+        tick = Tick(symbol, {"t": int(clock[0] * 1000), "c": "1.01", "quoteVol": "2500"}, {}, clock[0])
+        return engine.update(tick, client)
+
+    for _ in range(300):
+        update()
+    fv = bench(update)
+    assert fv.symbol == symbol
+
+
+def test_trade_burst_1000(bench):
+    deals = [{"p": "1.01", "v": str(10 + i % 50), "S": 1 + i % 2, "t": 1_000} for i in range(1000)]
+    agg = TradeAggregator()
+    bench(agg.add_deals, deals, 1.0)
+
+
+def test_paper_book_update_500_positions(bench, tmp_path):
+    bids = [(1.0 - i * 1e-4, 100.0) for i in range(10)]
+    asks = [(1.0001 + i * 1e-4, 100.0) for i in range(10)]
+    books = {f"S{i}": (bids, asks) for i in range(50)}
+    trader = PaperTrader(books.get, stake_usdt=50.0, db_path=tmp_path / "pump.db")
+    fv = FeatureVector("S0", 6.0, 0.03, 0.3, 0.0, 0.001, 3600.0, True)
+    for i in range(500):
+        fv.symbol = f"S{i % 50}"
+        trader.open(SignalEvent(i, fv, 0.8, 0.0, "default", 0.0), now=0.0)
+
+    def update():
+        for i in range(50):
+            trader.on_book(f"S{i}", bids, asks, now=1.0)
+
+    bench(update)
+    assert trader.open_count == 500
+
+
+def test_predict_proba(bench):
+    model = LogisticModel(-2.0, {"vsr": 0.6, "pm": 0.3, "obi": 0.1}, THRESHOLDS)
+    fv = FeatureVector("AAA", 6.0, 0.03, 0.3, 0.0, 0.001, 3600.0, True)
+    assert 0 < bench(model.predict_proba, fv) < 1
+
+
+def test_predict_batch_200(bench):
+    model = LogisticModel(-2.0, {"vsr": 0.6, "pm": 0.3, "obi": 0.1}, THRESHOLDS)
+    matrix = np.random.default_rng(0).normal(size=(200, len(model.feature_names)))
+    assert len(bench(model.predict_batch, matrix)) == 200
+
+
+class _Response:
+    def __init__(self, payload):
+        self._payload = payload
+
+    def raise_for_status(self):
+        return None
+
+    def json(self):
+        return self._payload
+
+
+def test_poll_stats_2000_pairs(bench, monkeypatch, ticker_payload):
+    class Client:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return None
+
+        async def get(self, url):
+            return _Response(ticker_payload)
+
+    monkeypatch.setattr(volume_scout.httpx, "AsyncClient", Client)
+    history = {}
+    cfg = {"min_quote_vol_usd": 0, "top_n": 200}
+    loop = asyncio.new_event_loop()
+    try:
+        stats = bench(lambda: loop.run_until_complete(volume_scout.poll_stats("http://bench", history, cfg)))
+    finally:
+        loop.close()
+    assert len(stats) == 200
+
+
+def test_universe_update_2000_pairs(bench, ticker_payload):
+    universe = UniverseScanner("http://bench", {"window_sec": 60})
+    clock = iter(range(0, 10**9, 5))
+    bench(lambda: universe.update(ticker_payload, now=float(next(clock))))
+    assert len(universe.symbols) == 2000
+
+
+def test_save_signal(bench, tmp_path, monkeypatch):
+    pytest.importorskip("pandas")
+    monkeypatch.setattr(storage, "_DATA_DIR", tmp_path)
+    db = tmp_path / "pump.db"
+    storage.init_db(db)
+    fv = FeatureVector("AAA", 6.0, 0.03, 0.3, 10.0, 0.001, 3600.0, True)
+    # a fresh Parquet file per call: appending to one file would re-read and
+    # rewrite a file that grows by a row every round
+    paths = (tmp_path / f"signals_{i}.parquet" for i in itertools.count())
+    monkeypatch.setattr(storage, "_parquet_path", lambda: next(paths))
+    assert bench(storage.save_signal, fv, 0.8, db) > 0
@@ -0,0 +1,9 @@
+import pytest
+
+from benchmarks.import_time import BUDGETS_MS, import_time_ms
+
+
+@pytest.mark.parametrize("module", sorted(BUDGETS_MS))
+def test_import_time_budget(module):
+    best = min(import_time_ms(module) for _ in range(3))
+    assert best <= BUDGETS_MS[module]
@@ -1,3 +1,5 @@
+import hashlib
+import json
 import os
 import re
 import yaml
@@ -9,9 +11,8 @@ _CONFIG_PATH = Path(__file__).with_name('config.yaml')
 _config: Dict[str, Any] = {}
 
 
-def load_config(path: Path | str | None = None) -> Dict[str, Any]:
-    """Load configuration from YAML file using environment variables."""
-    global _config
+def read_config(path: Path | str | None = None) -> Dict[str, Any]:
+    """Parse the YAML config with environment variables, without activating it."""
     load_dotenv()
     cfg_path = Path(path) if path else _CONFIG_PATH
     text = cfg_path.read_text()
@@ -25,10 +26,21 @@ def load_config(path: Path | str | None = None) -> Dict[str, Any]:
         return val
 
     text = re.sub(r"\$\{([^}]+)\}", replace_var, text)
-    _config = yaml.safe_load(text)
+    return yaml.safe_load(text)
+
+
+def set_config(cfg: Dict[str, Any]) -> Dict[str, Any]:
+    """Make ``cfg`` the configuration returned by the getters."""
+    global _config
+    _config = cfg
     return _config
 
 
+def load_config(path: Path | str | None = None) -> Dict[str, Any]:
+    """Load configuration from YAML file using environment variables."""
+    return set_config(read_config(path))
+
+
 def get_thresholds() -> Dict[str, float]:
     """Return scanner metric thresholds."""
     if not _config:
@@ -53,3 +65,13 @@ def get_ws_cfg() -> Dict[str, Any]:
 def reload_config(path: Path | str | None = None) -> Dict[str, Any]:
     """Reload configuration at runtime."""
     return load_config(path)
+
+
+def config_hash(cfg: Dict[str, Any] | None = None) -> str:
+    """Return a short stable hash of the configuration."""
+    if cfg is None:
+        if not _config:
+            load_config()
+        cfg = _config
+    blob = json.dumps(cfg, sort_keys=True, default=str).encode()
+    return hashlib.sha1(blob).hexdigest()[:12]
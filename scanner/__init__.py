@@ -1,16 +1,24 @@
-"""Pump scanner package."""
-
-from .scanner import Scanner
-from .collector import MexcWSClient
-from .symbols import fetch_all_pairs
-from .sub_manager import SubscriptionManager
-from config import (
-    load_config,
-    get_thresholds,
-    get_scout_cfg,
-    get_ws_cfg,
-    reload_config,
-)
+"""Pump scanner package.
+
+Public names are resolved lazily (PEP 562) so that tools importing only
+``scanner.storage`` or ``config`` do not pay for websockets, NumPy, httpx
+and python-telegram-bot at import time.
+"""
+
+from importlib import import_module
+from typing import Any
+
+_LAZY = {
+    "Scanner": ".scanner",
+    "MexcWSClient": ".collector",
+    "SubscriptionManager": ".sub_manager",
+    "fetch_all_pairs": ".symbols",
+    "load_config": "config",
+    "get_thresholds": "config",
+    "get_scout_cfg": "config",
+    "get_ws_cfg": "config",
+    "reload_config": "config",
+}
 
 __all__ = [
     "Scanner",
@@ -23,3 +31,22 @@ __all__ = [
     "reload_config",
     "fetch_all_pairs",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    target = _LAZY.get(name)
+    if target is None:
+        # submodule access such as ``scanner.scanner`` after ``import scanner``
+        try:
+            return import_module(f".{name}", __name__)
+        except ModuleNotFoundError as exc:
+            if exc.name != f"{__name__}.{name}":
+                raise
+            raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(import_module(target, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(list(globals()) + list(_LAZY))
@@ -0,0 +1,241 @@
+"""Columnar analytics queries over the signals history.
+
+Filters and aggregates run inside SQLite (using the indexes created by
+:data:`storage.MIGRATIONS`) or inside DuckDB over the monthly Parquet dumps,
+and results come back as NumPy column arrays instead of per-row dicts.
+Large ranges are streamed with keyset pagination on ``(ts, id)``.
+"""
+
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import storage
+
+Columns = Dict[str, np.ndarray]
+
+SIGNAL_COLUMNS = ("id", "symbol", "vsr", "pm", "probability", "ts")
+
+
+def _connect(db_path: Path | str) -> sqlite3.Connection:
+    storage.init_db(db_path)
+    return sqlite3.connect(db_path)
+
+
+def _to_columns(names: Sequence[str], rows: List[tuple]) -> Columns:
+    if not rows:
+        return {n: np.array([]) for n in names}
+    cols = list(zip(*rows))
+    out: Columns = {}
+    for name, values in zip(names, cols):
+        arr = np.array(values)
+        if arr.dtype == object:
+            try:
+                arr = arr.astype(float)
+            except (TypeError, ValueError):
+                pass
+        out[name] = arr
+    return out
+
+
+def _where(
+    start: Optional[int],
+    end: Optional[int],
+    symbols: Optional[Sequence[str]],
+    prob_min: Optional[float],
+    prob_max: Optional[float],
+    alias: str = "",
+) -> Tuple[str, List[Any]]:
+    p = f"{alias}." if alias else ""
+    clauses: List[str] = []
+    params: List[Any] = []
+    if start is not None:
+        clauses.append(f"{p}ts >= ?")
+        params.append(start)
+    if end is not None:
+        clauses.append(f"{p}ts < ?")
+        params.append(end)
+    if symbols:
+        clauses.append(f"{p}symbol IN ({','.join('?' * len(symbols))})")
+        params.extend(symbols)
+    if prob_min is not None:
+        clauses.append(f"{p}probability >= ?")
+        params.append(prob_min)
+    if prob_max is not None:
+        clauses.append(f"{p}probability < ?")
+        params.append(prob_max)
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+def iter_signals(
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+    symbols: Optional[Sequence[str]] = None,
+    prob_min: Optional[float] = None,
+    prob_max: Optional[float] = None,
+    columns: Sequence[str] = SIGNAL_COLUMNS,
+    chunk_size: int = 50000,
+    cursor: Optional[Tuple[int, int]] = None,
+    db_path: Path | str = storage._DB_PATH,
+) -> Iterator[Tuple[Columns, Tuple[int, int]]]:
+    """Stream matching signals in ``(ts, id)`` order as column chunks.
+
+    Each item is ``(columns, cursor)``; pass ``cursor`` back to resume after
+    the last row. Every page is an index range scan, so deep pages cost the
+    same as the first one.
+    """
+    unknown = set(columns) - set(storage.signal_columns(db_path))
+    if unknown:
+        raise ValueError(f"Unknown signal columns: {', '.join(sorted(unknown))}")
+    cols = list(dict.fromkeys([*columns, "ts", "id"]))
+    where, params = _where(start, end, symbols, prob_min, prob_max)
+    conn = _connect(db_path)
+    try:
+        while True:
+            page_where, page_params = where, list(params)
+            if cursor is not None:
+                page_where += (" AND " if page_where else " WHERE ") + "(ts, id) > (?, ?)"
+                page_params.extend(cursor)
+            rows = conn.execute(
+                f"SELECT {', '.join(cols)} FROM signals{page_where} ORDER BY ts, id LIMIT ?",
+                (*page_params, chunk_size),
+            ).fetchall()
+            if not rows:
+                return
+            data = _to_columns(cols, rows)
+            cursor = (int(data["ts"][-1]), int(data["id"][-1]))
+            yield {c: data[c] for c in columns}, cursor
+            if len(rows) < chunk_size:
+                return
+    finally:
+        conn.close()
+
+
+def query_signals(
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+    symbols: Optional[Sequence[str]] = None,
+    prob_min: Optional[float] = None,
+    prob_max: Optional[float] = None,
+    columns: Sequence[str] = SIGNAL_COLUMNS,
+    as_arrow: bool = False,
+    db_path: Path | str = storage._DB_PATH,
+) -> Any:
+    """Return matching signals as NumPy columns (or a ``pyarrow.Table``)."""
+    chunks = [c for c, _ in iter_signals(start, end, symbols, prob_min, prob_max, columns, db_path=db_path)]
+    if chunks:
+        data = {c: np.concatenate([ch[c] for ch in chunks]) for c in columns}
+    else:
+        data = _to_columns(columns, [])
+    if as_arrow:
+        import pyarrow as pa
+
+        return pa.table(data)
+    return data
+
+
+def signals_per_hour(
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+    parquet: Optional[str] = None,
+    db_path: Path | str = storage._DB_PATH,
+) -> Columns:
+    """Signal counts per hour bucket: ``hour`` (epoch seconds) and ``count``."""
+    where, params = _where(start, end, None, None, None)
+    div = "//" if parquet else "/"
+    sql = (
+        f"SELECT (ts {div} 3600) * 3600 AS hour, COUNT(*) AS count FROM signals{where} "
+        "GROUP BY hour ORDER BY hour"
+    )
+    return _aggregate(sql, params, ("hour", "count"), parquet, db_path)
+
+
+def probability_buckets(
+    width: float = 0.1,
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+    parquet: Optional[str] = None,
+    db_path: Path | str = storage._DB_PATH,
+) -> Columns:
+    """Signal counts per probability bucket of ``width``."""
+    where, params = _where(start, end, None, None, None)
+    # round off float error first so 0.3 / 0.1 lands in bucket 3, not 2;
+    # SQLite's CAST truncates (= floor for probabilities), DuckDB's rounds
+    index = "ROUND(probability / ?, 9)"
+    if parquet:
+        index = f"FLOOR({index})"
+    sql = (
+        f"SELECT ROUND(CAST({index} AS INTEGER) * ?, 9) AS bucket, COUNT(*) AS count "
+        f"FROM signals{where} GROUP BY bucket ORDER BY bucket"
+    )
+    return _aggregate(sql, [width, width, *params], ("bucket", "count"), parquet, db_path)
+
+
+def action_stats_per_symbol(
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+    db_path: Path | str = storage._DB_PATH,
+) -> Columns:
+    """Per-symbol signal counts, action conversion and buy hit rate.
+
+    ``conversion`` is the share of signals with any user action and
+    ``hit_rate`` the share of acted-on signals the user bought.
+    """
+    where, params = _where(start, end, None, None, None, alias="s")
+    sql = f"""
+        WITH last AS (
+            SELECT signal_id, action, MAX(ts) FROM actions GROUP BY signal_id
+        )
+        SELECT s.symbol,
+               COUNT(*) AS signals,
+               COUNT(last.action) AS acted,
+               SUM(last.action = 'buy') AS buys
+        FROM signals s LEFT JOIN last ON last.signal_id = s.id
+        {where}
+        GROUP BY s.symbol ORDER BY signals DESC
+    """
+    conn = _connect(db_path)
+    try:
+        rows = conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+    data = _to_columns(("symbol", "signals", "acted", "buys"), rows)
+    signals = data["signals"].astype(float)
+    acted = data["acted"].astype(float)
+    buys = np.nan_to_num(data["buys"].astype(float))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        data["conversion"] = np.where(signals > 0, acted / signals, 0.0)
+        data["hit_rate"] = np.where(acted > 0, buys / acted, 0.0)
+    data["buys"] = buys
+    return data
+
+
+def _aggregate(
+    sql: str,
+    params: List[Any],
+    names: Sequence[str],
+    parquet: Optional[str],
+    db_path: Path | str,
+) -> Columns:
+    if parquet:
+        import duckdb
+
+        con = duckdb.connect()
+        try:
+            # DDL cannot take bound parameters in DuckDB
+            pattern = parquet.replace("'", "''")
+            con.execute(
+                f"CREATE VIEW signals AS SELECT * FROM read_parquet('{pattern}', union_by_name = true)"
+            )
+            rows = con.execute(sql, params).fetchall()
+        finally:
+            con.close()
+    else:
+        conn = _connect(db_path)
+        try:
+            rows = conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+    return _to_columns(names, rows)
@@ -0,0 +1,443 @@
+"""Threshold sweeps over recorded feature matrices.
+
+:class:`FeatureRecorder` appends every ready feature vector to raw binary
+column files (``features.bin``, ``ts.bin``, ``symbol.bin``, ``price.bin``)
+described by ``meta.json``. Every numeric feature is recorded, so rules and
+models naming optional or market-regime features can be replayed.
+:class:`FeatureDataset` memory-maps them back,
+so a month of per-second rows is never loaded at once.
+
+:func:`sweep` evaluates the rule thresholds and ``prob_threshold`` over a
+grid. Rows passing the loosest corner of the grid are extracted once; each
+cell then only touches that subset, and all ``prob_threshold`` values of a
+cell share one model evaluation. Cells run on a process pool that
+memory-maps the subset instead of receiving a pickled copy.
+
+Run with ``python -m scanner.backtest --data data/features --grid grid.yaml``.
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .features import FeatureVector
+from .model import FEATURE_NAMES, OPTIONAL_FEATURE_NAMES, LogisticModel, Model, load_model
+from .ruleset import THRESHOLD_RULES, Rule, rule_from_thresholds
+
+
+logger = logging.getLogger(__name__)
+
+RECORDED_FEATURES = (*FEATURE_NAMES, *OPTIONAL_FEATURE_NAMES)
+
+_COLUMNS = {"ts": np.float64, "symbol": np.int32, "price": np.float64}
+
+
+class FeatureRecorder:
+    """Append feature vectors to a directory of raw column files.
+
+    ``names`` defaults to the features of an existing recording, else to
+    :data:`RECORDED_FEATURES`.
+    """
+
+    def __init__(
+        self,
+        path: Path | str,
+        names: Sequence[str] | None = None,
+        flush_rows: int = 10000,
+    ) -> None:
+        self.path = Path(path)
+        self.flush_rows = flush_rows
+        self.path.mkdir(parents=True, exist_ok=True)
+        meta_path = self.path / "meta.json"
+        meta = json.loads(meta_path.read_text()) if meta_path.exists() else {}
+        if names is None:
+            names = meta["features"] if meta else RECORDED_FEATURES
+        self.names = tuple(names)
+        if meta and tuple(meta["features"]) != self.names:
+            raise ValueError(f"{self.path} was recorded with features {meta['features']}")
+        self.symbols: List[str] = list(meta.get("symbols", []))
+        self._index = {s: i for i, s in enumerate(self.symbols)}
+        self._rows: List[Tuple[float, int, float, List[float]]] = []
+
+    def append(self, fv: FeatureVector, price: float | None, ts: float | None = None) -> None:
+        ts = time.time() if ts is None else ts
+        idx = self._index.get(fv.symbol)
+        if idx is None:
+            idx = self._index[fv.symbol] = len(self.symbols)
+            self.symbols.append(fv.symbol)
+        price = np.nan if price is None else price
+        self._rows.append((ts, idx, price, [getattr(fv, n) for n in self.names]))
+        if len(self._rows) >= self.flush_rows:
+            self.flush()
+
+    def flush(self) -> int:
+        if not self._rows:
+            return 0
+        rows, self._rows = self._rows, []
+        ts, sym, price, feats = zip(*rows)
+        columns = {
+            "features": np.asarray(feats, dtype=np.float32),
+            "ts": np.asarray(ts, dtype=_COLUMNS["ts"]),
+            "symbol": np.asarray(sym, dtype=_COLUMNS["symbol"]),
+            "price": np.asarray(price, dtype=_COLUMNS["price"]),
+        }
+        for name, arr in columns.items():
+            with (self.path / f"{name}.bin").open("ab") as f:
+                arr.tofile(f)
+        tmp = self.path / "meta.json.tmp"
+        tmp.write_text(json.dumps({"features": list(self.names), "symbols": self.symbols}))
+        tmp.replace(self.path / "meta.json")
+        return len(rows)
+
+
+@dataclass
+class FeatureDataset:
+    """Memory-mapped feature matrix with per-row timestamp, symbol and price."""
+
+    path: Path
+    names: Tuple[str, ...]
+    symbols: List[str]
+    X: np.ndarray
+    ts: np.ndarray
+    symbol: np.ndarray
+    price: np.ndarray
+
+    @classmethod
+    def open(cls, path: Path | str) -> "FeatureDataset":
+        path = Path(path)
+        meta = json.loads((path / "meta.json").read_text())
+        names = tuple(meta["features"])
+        ts = np.memmap(path / "ts.bin", dtype=_COLUMNS["ts"], mode="r")
+        n = len(ts)
+        return cls(
+            path,
+            names,
+            list(meta["symbols"]),
+            np.memmap(path / "features.bin", dtype=np.float32, mode="r", shape=(n, len(names))),
+            ts,
+            np.memmap(path / "symbol.bin", dtype=_COLUMNS["symbol"], mode="r", shape=(n,)),
+            np.memmap(path / "price.bin", dtype=_COLUMNS["price"], mode="r", shape=(n,)),
+        )
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    @property
+    def days(self) -> float:
+        if not len(self):
+            return 0.0
+        return max(float(self.ts.max() - self.ts.min()), 1.0) / 86400.0
+
+    def labels(self, horizon_sec: float = 300, target: float = 0.05) -> np.ndarray:
+        """Rows whose price gains ``target`` after ``horizon_sec`` (cached on disk)."""
+        cache = self.path / f"labels_{int(horizon_sec)}_{target:g}.npy"
+        if cache.exists() and os.path.getmtime(cache) >= os.path.getmtime(self.path / "ts.bin"):
+            return np.load(cache, mmap_mode="r")
+        order = np.lexsort((self.ts, self.symbol))
+        ts = np.asarray(self.ts)[order]
+        sym = np.asarray(self.symbol)[order]
+        price = np.asarray(self.price)[order]
+        # one monotonic key per (symbol, ts) so a single searchsorted finds the horizon row
+        span = float(ts.max() - ts.min()) + horizon_sec + 1 if len(ts) else 1.0
+        key = sym * span + (ts - (ts.min() if len(ts) else 0.0))
+        j = np.searchsorted(key, key + horizon_sec)
+        valid = j < len(key)
+        j = np.minimum(j, len(key) - 1)
+        valid &= sym[j] == sym
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ret = price[j] / price - 1
+        label = np.zeros(len(ts), dtype=bool)
+        label[order] = valid & (ret >= target)
+        np.save(cache, label)
+        return label
+
+
+def feature_index(names: Sequence[str], wanted: Iterable[str]) -> List[int]:
+    """Positions of ``wanted`` in ``names``; raises if one was not recorded."""
+    col = {n: i for i, n in enumerate(names)}
+    wanted = list(wanted)
+    missing = sorted({n for n in wanted if n not in col})
+    if missing:
+        raise ValueError(f"Features not in the recording: {', '.join(missing)}")
+    return [col[n] for n in wanted]
+
+
+def feature_columns(X: np.ndarray, names: Sequence[str], wanted: Iterable[str]) -> Dict[str, np.ndarray]:
+    """Columns of ``X`` by feature name."""
+    wanted = list(wanted)
+    return {n: X[:, i] for n, i in zip(wanted, feature_index(names, wanted))}
+
+
+def candidate_mask(X: np.ndarray, names: Sequence[str], thresholds: Dict[str, float]) -> np.ndarray:
+    """Vectorised ``is_candidate`` over the rows of ``X``.
+
+    A ``rule`` expression in ``thresholds`` replaces the threshold rules.
+    """
+    source = thresholds.get("rule")
+    rule = Rule(str(source)) if source else rule_from_thresholds(thresholds)
+    cols = feature_columns(X, names, rule.features)
+    return np.broadcast_to(rule.mask(cols), (len(X),)).copy()
+
+
+def _loosest(grid: Dict[str, Sequence[float]], base: Dict[str, float]) -> Dict[str, float]:
+    out = dict(base)
+    for key, values in grid.items():
+        if key in THRESHOLD_RULES:
+            out[key] = min(values) if THRESHOLD_RULES[key][1] == ">" else max(values)
+    return out
+
+
+@dataclass
+class _Subset:
+    names: Tuple[str, ...]
+    X: np.ndarray
+    ts: np.ndarray
+    symbol: np.ndarray
+    label: np.ndarray
+    episode: np.ndarray
+    n_episodes: int
+    days: float
+
+    _ARRAYS = ("X", "ts", "symbol", "label", "episode")
+
+    def save(self, path: Path) -> None:
+        """Write arrays as ``.npy`` so worker processes can memory-map them."""
+        for name in self._ARRAYS:
+            np.save(path / f"{name}.npy", getattr(self, name))
+        meta = {"names": list(self.names), "n_episodes": self.n_episodes, "days": self.days}
+        (path / "subset.json").write_text(json.dumps(meta))
+
+    @classmethod
+    def load(cls, path: Path) -> "_Subset":
+        meta = json.loads((path / "subset.json").read_text())
+        arrays = {name: np.load(path / f"{name}.npy", mmap_mode="r") for name in cls._ARRAYS}
+        return cls(tuple(meta["names"]), n_episodes=meta["n_episodes"], days=meta["days"], **arrays)
+
+
+def _episodes(sym: np.ndarray, ts: np.ndarray, gap: float) -> np.ndarray:
+    """Ids of runs of rows (sorted by symbol, ts) separated by more than ``gap``."""
+    if not len(ts):
+        return np.zeros(0, dtype=np.int64)
+    new = np.ones(len(ts), dtype=bool)
+    new[1:] = (sym[1:] != sym[:-1]) | (np.diff(ts) > gap)
+    return np.cumsum(new) - 1
+
+
+def prepare(
+    data: FeatureDataset,
+    grid: Dict[str, Sequence[float]],
+    base: Dict[str, float],
+    horizon_sec: float = 300,
+    target: float = 0.05,
+    cooldown_sec: float = 300,
+    chunk_rows: int = 1_000_000,
+) -> _Subset:
+    """Extract rows passing the loosest grid corner, sorted by (symbol, ts).
+
+    Positive rows are grouped into pump episodes over the full dataset so
+    recall is measured per episode rather than per second.
+    """
+    labels = data.labels(horizon_sec, target)
+    loose = _loosest(grid, base)
+    keep: List[np.ndarray] = []
+    for start in range(0, len(data), chunk_rows):
+        block = np.asarray(data.X[start:start + chunk_rows], dtype=float)
+        keep.append(np.flatnonzero(candidate_mask(block, data.names, loose)) + start)
+    rows = np.concatenate(keep) if keep else np.zeros(0, dtype=np.int64)
+
+    pos = np.flatnonzero(labels)
+    pos = pos[np.lexsort((data.ts[pos], data.symbol[pos]))]
+    pos_episode = _episodes(data.symbol[pos], data.ts[pos], cooldown_sec)
+    n_episodes = int(pos_episode[-1] + 1) if len(pos) else 0
+    by_row = np.argsort(pos)
+    pos_sorted = pos[by_row]
+    episode_sorted = pos_episode[by_row]
+
+    rows = rows[np.lexsort((data.ts[rows], data.symbol[rows]))]
+    label = np.asarray(labels[rows], dtype=bool)
+    episode = np.full(len(rows), -1, dtype=np.int64)
+    if len(pos_sorted):
+        where = np.searchsorted(pos_sorted, rows[label])
+        episode[label] = episode_sorted[where]
+    logger.info("Backtest subset: %d of %d rows, %d pump episodes", len(rows), len(data), n_episodes)
+    return _Subset(
+        data.names,
+        # column-major so every rule compares one contiguous column
+        np.asfortranarray(data.X[rows], dtype=np.float32),
+        np.asarray(data.ts[rows]),
+        np.asarray(data.symbol[rows]),
+        label,
+        episode,
+        n_episodes,
+        data.days,
+    )
+
+
+def evaluate(
+    subset: _Subset,
+    model: Model,
+    thresholds: Dict[str, float],
+    prob_thresholds: Sequence[float],
+    cooldown_sec: float = 300,
+) -> List[Dict[str, Any]]:
+    """Precision, recall and alerts per day for one threshold cell.
+
+    A row passing the rules and ``prob_threshold`` alerts unless the same
+    symbol passed within ``cooldown_sec`` before it.
+    """
+    mask = candidate_mask(subset.X, subset.names, thresholds)
+    idx = np.flatnonzero(mask)
+    if isinstance(model, LogisticModel) and model.normalize:
+        model = LogisticModel(model.intercept, model.coef, thresholds, True)
+    cols = feature_index(subset.names, model.feature_names)
+    probs = model.predict_batch(subset.X[np.ix_(idx, cols)]) if len(idx) else np.zeros(0)
+
+    symbol, ts = subset.symbol[idx], subset.ts[idx]
+    label, episode = subset.label[idx], subset.episode[idx]
+    seen = np.zeros(subset.n_episodes + 1, dtype=bool)
+    results = []
+    for p in prob_thresholds:
+        passed = probs >= p
+        sym, t = symbol[passed], ts[passed]
+        first = np.ones(len(sym), dtype=bool)
+        first[1:] = (sym[1:] != sym[:-1]) | (np.diff(t) > cooldown_sec)
+        n_alerts = int(first.sum())
+        seen[:] = False
+        seen[episode[passed]] = True  # -1 (no pump) lands in the spare last slot
+        caught = int(seen[:-1].sum())
+        results.append(
+            {
+                **thresholds,
+                "prob_threshold": float(p),
+                "alerts": n_alerts,
+                "alerts_per_day": n_alerts / subset.days if subset.days else 0.0,
+                "precision": float(label[passed][first].mean()) if n_alerts else 0.0,
+                "recall": caught / subset.n_episodes if subset.n_episodes else 0.0,
+            }
+        )
+    return results
+
+
+def grid_cells(grid: Dict[str, Sequence[float]], base: Dict[str, float]) -> List[Dict[str, float]]:
+    keys = [k for k in grid if k in THRESHOLD_RULES]
+    return [{**base, **dict(zip(keys, values))} for values in itertools.product(*(grid[k] for k in keys))]
+
+
+_STATE: Dict[str, Any] = {}
+
+
+def _init_worker(
+    subset: _Subset | Path, model: Model, prob_thresholds: Sequence[float], cooldown_sec: float
+) -> None:
+    if not isinstance(subset, _Subset):
+        subset = _Subset.load(subset)
+    _STATE.update(subset=subset, model=model, prob=prob_thresholds, cooldown=cooldown_sec)
+
+
+def _run_cells(cells: List[Dict[str, float]]) -> List[Dict[str, Any]]:
+    out: List[Dict[str, Any]] = []
+    for cell in cells:
+        out.extend(evaluate(_STATE["subset"], _STATE["model"], cell, _STATE["prob"], _STATE["cooldown"]))
+    return out
+
+
+def _chunks(items: List[Any], n: int) -> Iterable[List[Any]]:
+    size = max(1, -(-len(items) // n))
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def sweep(
+    data: FeatureDataset | Path | str,
+    model: Model,
+    grid: Dict[str, Sequence[float]],
+    base: Dict[str, float] | None = None,
+    horizon_sec: float = 300,
+    target: float = 0.05,
+    cooldown_sec: float = 300,
+    workers: int | None = None,
+) -> List[Dict[str, Any]]:
+    """Evaluate every grid cell; ``grid['prob_threshold']`` is vectorised per cell."""
+    if not isinstance(data, FeatureDataset):
+        data = FeatureDataset.open(data)
+    base = dict(base or {})
+    prob_thresholds = list(grid.get("prob_threshold", [base.pop("prob_threshold", 0.5)]))
+    base.pop("prob_threshold", None)
+    subset = prepare(data, grid, base, horizon_sec, target, cooldown_sec)
+    cells = grid_cells(grid, base)
+    workers = workers or os.cpu_count() or 1
+    started = time.perf_counter()
+    if workers <= 1 or len(cells) < 2:
+        _init_worker(subset, model, prob_thresholds, cooldown_sec)
+        results = _run_cells(cells)
+    else:
+        with tempfile.TemporaryDirectory(dir=data.path) as tmp:
+            subset.save(Path(tmp))
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(Path(tmp), model, prob_thresholds, cooldown_sec),
+            ) as pool:
+                parts = pool.map(_run_cells, list(_chunks(cells, workers * 4)))
+                results = [r for part in parts for r in part]
+    logger.info(
+        "Swept %d configurations in %.1fs", len(results), time.perf_counter() - started
+    )
+    return results
+
+
+def main(argv: List[str] | None = None) -> None:
+    import yaml
+
+    parser = argparse.ArgumentParser(description="Sweep thresholds over recorded features")
+    parser.add_argument("--data", default="data/features")
+    parser.add_argument("--grid", required=True, help="YAML mapping of threshold key to values")
+    parser.add_argument("--model", default=None)
+    parser.add_argument("--horizon", type=float, default=300, help="label horizon in seconds")
+    parser.add_argument("--target", type=float, default=0.05, help="return that counts as a pump")
+    parser.add_argument("--cooldown", type=float, default=300)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default="-", help="CSV output path, '-' for stdout")
+    args = parser.parse_args(argv)
+
+    import config
+
+    logging.basicConfig(level=logging.INFO)
+    grid = yaml.safe_load(Path(args.grid).read_text())
+    cfg = config.load_config()
+    base = {**config.get_thresholds(), "prob_threshold": cfg["scanner"]["prob_threshold"]}
+    results = sweep(
+        args.data,
+        load_model(args.model),
+        grid,
+        base,
+        args.horizon,
+        args.target,
+        args.cooldown,
+        args.workers,
+    )
+    results.sort(key=lambda r: (-r["precision"], -r["recall"]))
+    out = sys.stdout if args.out == "-" else open(args.out, "w", newline="")
+    try:
+        writer = csv.DictWriter(out, fieldnames=list(results[0]) if results else [])
+        writer.writeheader()
+        writer.writerows(results)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ import time
 from typing import Iterable
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
 from telegram.constants import ParseMode
+from telegram.helpers import escape_markdown
 from telegram.ext import (
     Application,
     CallbackQueryHandler,
@@ -12,12 +13,15 @@ from telegram.ext import (
 )
 
 from config import load_config
-from .symbols import fetch_all_pairs
+from .symbols import select_pairs
 from .scanner import Scanner
-from .volume_scout import VolumeScout
+from .bus import SignalEvent
 from .features import FeatureVector
-from .storage import save_signal, save_action
-from .metrics import LATENCY, record_signal, start_metrics_server
+from .profiles import DEFAULT
+from .storage import save_action
+from .dispatcher import AlertDispatcher
+from .suppress import SignalSuppressor
+from .metrics import start_metrics_server
 from .logging_setup import setup_logging
 
 
@@ -30,10 +34,21 @@ class AlertBot:
     def __init__(self, symbols: Iterable[str]) -> None:
         self.config = load_config()
         self.allowed_ids = set(self.config.get("telegram", {}).get("allowed_ids", []))
-        self.scanner = Scanner(list(symbols))
+        self.scanner = Scanner(list(symbols), self.config)
         logger.info("AlertBot initialized for %d symbols", len(list(symbols)))
         start_metrics_server()
         self.app = Application.builder().token(self.config["telegram"]["token"]).build()
+        rate_cfg = self.config.get("telegram", {}).get("rate_limit", {})
+        self.dispatcher = AlertDispatcher(
+            self.app.bot,
+            global_rate=float(rate_cfg.get("global_per_sec", 30)),
+            per_chat_rate=float(rate_cfg.get("per_chat_per_sec", 1)),
+            max_queue=int(rate_cfg.get("max_queue", 100)),
+        )
+        self.suppressor = SignalSuppressor.from_config(self.config.get("alerts", {}))
+        self.scanner.bus.subscribe("telegram", self.send_batch, queue_size=100)
+        paper = self.scanner.paper
+        self._stake = paper.stake_usdt if paper is not None else float(self.config["scanner"].get("stake_usdt") or 100)
 
         self.app.add_handler(CommandHandler("start", self.cmd_start))
         self.app.add_handler(CommandHandler("help", self.cmd_help))
@@ -66,9 +81,17 @@ class AlertBot:
     async def cmd_reload(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         if not self._is_allowed(update):
             return
-        self.scanner.reload_thresholds()
-        self.config = load_config()
+        try:
+            self.scanner.reload_thresholds()
+        except (ValueError, OSError) as exc:
+            await update.message.reply_text(f"Profiles not reloaded: {exc}")
+            return
+        self.config = self.scanner.config
         self.allowed_ids = set(self.config.get("telegram", {}).get("allowed_ids", []))
+        alerts_cfg = self.config.get("alerts", {})
+        self.suppressor.cooldown_sec = float(alerts_cfg.get("cooldown_sec", 300))
+        self.suppressor.prob_delta = float(alerts_cfg.get("prob_delta", 0.1))
+        self.suppressor.vsr_delta = float(alerts_cfg.get("vsr_delta", 2.0))
         await update.message.reply_text("Configuration reloaded")
 
     async def cmd_cfg(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -79,6 +102,7 @@ class AlertBot:
             return
         key, value = context.args[0], context.args[1]
         self.config.setdefault("scanner", {}).setdefault("metrics", {})[key] = float(value)
+        self.scanner.reload_profiles()
         await update.message.reply_text(f"Set {key} = {value}")
 
     async def on_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -89,7 +113,7 @@ class AlertBot:
         if data.startswith("buy_"):
             sid = int(data[4:])
             save_action(sid, "buy")
-            await update.callback_query.answer("Buy disabled", show_alert=True)
+            await update.callback_query.answer(self._paper_buy(sid), show_alert=True)
         elif data.startswith("skip_"):
             sid = int(data[5:])
             save_action(sid, "skip")
@@ -98,36 +122,84 @@ class AlertBot:
             await update.callback_query.answer()
 
 
-    async def send_alert(self, fv: FeatureVector, prob: float, start_ts: float) -> None:
-        LATENCY.observe((time.time() - start_ts) * 1000)
-        record_signal()
+    def _paper_buy(self, signal_id: int) -> str:
+        paper = self.scanner.paper
+        if paper is None:
+            return "Buy disabled"
+        pos = paper.buy(signal_id)
+        if pos is None:
+            return "Signal no longer available"
+        if pos.status == "pending":
+            return f"Paper limit order at {pos.limit_price:.8g}"
+        if pos.status == "open":
+            return f"Paper buy {pos.qty:.6g} {pos.symbol} at {pos.entry_price:.8g}"
+        return f"Paper position {pos.status} ({pos.exit_reason})"
+
+    def _recipients(self, profile: str) -> set[int]:
+        chat_ids = self.scanner.profile(profile).chat_ids
+        return set(chat_ids) if chat_ids else self.allowed_ids
+
+    @staticmethod
+    def _headline(fv: FeatureVector, prob: float, profile: str) -> str:
+        line = f"\ud83d\ude80 *{fv.symbol}*  — VSR {fv.vsr:.1f}  PM {fv.pm:.2%}  Prob {prob:.2f}"
+        if profile != DEFAULT:
+            line += f"  _{escape_markdown(profile, version=2)}_"
+        return line
+
+    def send_alert(self, ev: SignalEvent) -> None:
         text = (
-            f"\ud83d\ude80 *{fv.symbol}*  — VSR {fv.vsr:.1f}  PM {fv.pm:.2%}  Prob {prob:.2f}\n"
+            f"{self._headline(ev.fv, ev.prob, ev.profile)}\n"
             f"Time: {time.strftime('%H:%M:%S')}"
         )
-        signal_id = save_signal(fv, prob)
         keyboard = InlineKeyboardMarkup(
             [
                 [
-                    InlineKeyboardButton("Buy $100", callback_data=f"buy_{signal_id}"),
-                    InlineKeyboardButton("Skip", callback_data=f"skip_{signal_id}"),
+                    InlineKeyboardButton(f"Buy ${self._stake:g}", callback_data=f"buy_{ev.id}"),
+                    InlineKeyboardButton("Skip", callback_data=f"skip_{ev.id}"),
                 ]
             ]
         )
-        for chat_id in self.allowed_ids:
-            await self.app.bot.send_message(
-                chat_id=chat_id,
-                text=text,
+        self.dispatcher.submit(
+            self._recipients(ev.profile),
+            text,
+            parse_mode=ParseMode.MARKDOWN_V2,
+            reply_markup=keyboard,
+        )
+
+    def send_batch(self, batch: list[SignalEvent]) -> None:
+        """Telegram sink: send simultaneous signals as one message per profile."""
+        by_profile: dict[str, list[SignalEvent]] = {}
+        for ev in batch:
+            by_profile.setdefault(ev.profile, []).append(ev)
+        for profile, events in by_profile.items():
+            if len(events) == 1:
+                self.send_alert(events[0])
+                continue
+            lines = []
+            rows = []
+            for ev in events:
+                lines.append(self._headline(ev.fv, ev.prob, profile))
+                rows.append(
+                    [
+                        InlineKeyboardButton(f"Buy {ev.fv.symbol}", callback_data=f"buy_{ev.id}"),
+                        InlineKeyboardButton(f"Skip {ev.fv.symbol}", callback_data=f"skip_{ev.id}"),
+                    ]
+                )
+            text = "\n".join(lines) + f"\nTime: {time.strftime('%H:%M:%S')}"
+            self.dispatcher.submit(
+                self._recipients(profile),
+                text,
                 parse_mode=ParseMode.MARKDOWN_V2,
-                reply_markup=keyboard,
+                reply_markup=InlineKeyboardMarkup(rows),
             )
 
     async def _scanner_loop(self) -> None:
-        async for fv, prob, ts in self.scanner.run():
-            await self.send_alert(fv, prob, ts)
+        async for batch in self.suppressor.batches(self.scanner.run()):
+            await self.scanner.publish(batch)
 
     async def run(self) -> None:
         logger.info("Bot event loop starting")
+        self.scanner.bus.start()
         task = asyncio.create_task(self._scanner_loop())
         await self.app.initialize()
         await self.app.start()
@@ -135,6 +207,8 @@ class AlertBot:
         try:
             await task
         finally:
+            await self.scanner.bus.stop()
+            await self.dispatcher.stop()
             await self.app.updater.stop()
             await self.app.stop()
             await self.app.shutdown()
@@ -148,20 +222,11 @@ def main() -> None:
     cfg = load_config()
     symbols = sys.argv[1:]
     if not symbols:
-        scout_cfg = cfg.get("scout", {})
-        logger.info("Selecting hot pairs using Volume Scout")
         try:
-            pairs = _aio.run(VolumeScout(cfg["mexc"]["rest_url"], scout_cfg).poll())
-            symbols = [p.symbol for p in pairs]
-            logger.info("Volume Scout returned %d pairs", len(symbols))
+            symbols = _aio.run(select_pairs(cfg))
         except Exception as exc:  # pragma: no cover - network
-            logger.error("Volume Scout failed: %s", exc)
-            logger.info("Fetching full symbol list from MEXC")
-            try:
-                symbols = _aio.run(fetch_all_pairs(cfg["mexc"]["rest_url"]))
-            except Exception as exc2:  # pragma: no cover - network
-                logger.error("Failed to fetch symbols: %s", exc2)
-                sys.exit(1)
+            logger.error("Failed to fetch symbols: %s", exc)
+            sys.exit(1)
     logger.info("Starting AlertBot with %d symbols", len(symbols))
     bot = AlertBot(symbols)
     _aio.run(bot.run())
@@ -0,0 +1,176 @@
+"""In-process publish/subscribe bus for alert signals.
+
+The bot loop publishes each batch of signals once; storage, metrics,
+outcome tracking and Telegram subscribe to it independently. Every
+subscriber has its own bounded queue and worker task, so a slow sink only
+fills its own queue. What happens when that queue is full is the
+subscriber's policy:
+
+* ``drop_oldest`` (default) – discard the oldest queued event;
+* ``drop_newest`` – discard the event being published;
+* ``block`` – :meth:`EventBus.publish` waits for room (backpressure onto
+  the publisher, use only for sinks that must not lose events).
+
+Sink errors are logged and counted; they never reach the publisher or the
+other sinks.
+"""
+
+import asyncio
+import contextlib
+import inspect
+import logging
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional, Union
+
+from .metrics import BUS_DROPPED, BUS_QUEUE_DEPTH, BUS_SINK_ERRORS
+
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from .features import FeatureVector
+
+
+logger = logging.getLogger(__name__)
+
+POLICIES = ("drop_oldest", "drop_newest", "block")
+
+Handler = Callable[[Any], Union[None, Awaitable[None]]]
+
+
+@dataclass
+class SignalEvent:
+    """One delivered signal with the context it was detected in."""
+
+    id: int
+    fv: "FeatureVector"
+    prob: float
+    start_ts: float
+    profile: str
+    ts: float
+    price: Optional[float] = None
+    config_hash: Optional[str] = None
+    model_version: Optional[str] = None
+    thresholds: Dict[str, Any] = field(default_factory=dict)
+
+
+class Subscriber:
+    """A named sink with its own queue and worker task."""
+
+    def __init__(self, name: str, handler: Handler, queue_size: int, policy: str) -> None:
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown bus policy '{policy}' for sink '{name}'")
+        self.name = name
+        self.handler = handler
+        self.policy = policy
+        self.queue: asyncio.Queue[Any] = asyncio.Queue(queue_size)
+        self.task: Optional[asyncio.Task] = None
+        self.handled = 0
+        self.dropped = 0
+        self.errors = 0
+
+    async def put(self, event: Any) -> None:
+        if self.policy == "block":
+            await self.queue.put(event)
+        else:
+            if self.queue.full():
+                if self.policy == "drop_newest":
+                    self._drop()
+                    return
+                self.queue.get_nowait()
+                self.queue.task_done()
+                self._drop()
+            self.queue.put_nowait(event)
+        BUS_QUEUE_DEPTH.labels(self.name).set(self.queue.qsize())
+
+    def _drop(self) -> None:
+        self.dropped += 1
+        BUS_DROPPED.labels(self.name).inc()
+
+    async def run(self) -> None:
+        while True:
+            event = await self.queue.get()
+            try:
+                result = self.handler(event)
+                if inspect.isawaitable(result):
+                    await result
+                self.handled += 1
+            except Exception as exc:
+                self.errors += 1
+                BUS_SINK_ERRORS.labels(self.name).inc()
+                logger.error("Sink %s failed: %s", self.name, exc)
+            finally:
+                self.queue.task_done()
+                BUS_QUEUE_DEPTH.labels(self.name).set(self.queue.qsize())
+
+
+class EventBus:
+    """Fan published events out to independent subscribers.
+
+    ``cfg`` is the ``bus`` config section: ``queue_size`` and ``policy``
+    defaults plus per-sink overrides under ``sinks.<name>``.
+    """
+
+    def __init__(self, cfg: Optional[Dict[str, Any]] = None) -> None:
+        self.cfg = cfg or {}
+        self.subscribers: List[Subscriber] = []
+
+    def subscribe(
+        self,
+        name: str,
+        handler: Handler,
+        queue_size: Optional[int] = None,
+        policy: Optional[str] = None,
+    ) -> Subscriber:
+        """Register ``handler``; config overrides win over the arguments."""
+        sink_cfg = (self.cfg.get("sinks") or {}).get(name, {})
+        sub = Subscriber(
+            name,
+            handler,
+            int(sink_cfg.get("queue_size", queue_size or self.cfg.get("queue_size", 1000))),
+            str(sink_cfg.get("policy", policy or self.cfg.get("policy", "drop_oldest"))),
+        )
+        self.subscribers.append(sub)
+        if self.running:
+            sub.task = asyncio.create_task(sub.run())
+        return sub
+
+    async def unsubscribe(self, sub: Subscriber) -> None:
+        """Remove ``sub`` and stop its worker; queued events are discarded."""
+        if sub in self.subscribers:
+            self.subscribers.remove(sub)
+        if sub.task is not None:
+            sub.task.cancel()
+            with contextlib.suppress(Exception, asyncio.CancelledError):
+                await sub.task
+            sub.task = None
+
+    @property
+    def running(self) -> bool:
+        return any(s.task is not None for s in self.subscribers)
+
+    def start(self) -> None:
+        for sub in self.subscribers:
+            if sub.task is None:
+                sub.task = asyncio.create_task(sub.run())
+
+    async def publish(self, event: Any) -> None:
+        """Queue ``event`` for every subscriber; only ``block`` sinks may wait."""
+        for sub in self.subscribers:
+            await sub.put(event)
+
+    async def join(self) -> None:
+        """Wait until every queued event has been handled."""
+        for sub in self.subscribers:
+            await sub.queue.join()
+
+    async def stop(self, timeout: Optional[float] = 5.0) -> None:
+        """Drain the queues (up to ``timeout``) and stop the workers."""
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(self.join(), timeout)
+        for sub in self.subscribers:
+            if sub.task is not None:
+                sub.task.cancel()
+        for sub in self.subscribers:
+            if sub.task is not None:
+                with contextlib.suppress(Exception, asyncio.CancelledError):
+                    await sub.task
+                sub.task = None
@@ -0,0 +1,63 @@
+"""Per-interval volume from cumulative ``kline_1s`` pushes.
+
+MEXC pushes several updates for the candle that is still open, and the
+volume in each of them is cumulative since the candle opened. Appending
+every push to a rolling window counts the same volume several times.
+:class:`CandleAccumulator` follows the open time of each symbol's current
+candle and reports it exactly once, with its final volume, when a push for a
+later candle arrives. Repeated and late pushes are ignored.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+
+@dataclass
+class Candle:
+    start: Optional[float]
+    close: float
+    volume: float
+
+
+def candle_start(data: Dict[str, Any]) -> Optional[float]:
+    """Open time of the candle a kline push belongs to, in seconds."""
+    raw = data.get("t") or data.get("T") or data.get("start")
+    if raw is None:
+        return None
+    ts = float(raw)
+    # MEXC sends milliseconds
+    return ts / 1000.0 if ts > 1e11 else ts
+
+
+class CandleAccumulator:
+    """Turn cumulative in-candle updates into one entry per closed candle.
+
+    Pushes without an open time cannot be grouped; each of them is treated
+    as a complete interval of its own.
+    """
+
+    def __init__(self) -> None:
+        self._open: Dict[str, Candle] = {}
+        self.duplicates = 0
+
+    def update(self, symbol: str, start: Optional[float], close: float, volume: float) -> Optional[Candle]:
+        """Fold one push and return the candle it closed, if any."""
+        if start is None:
+            return Candle(None, close, volume)
+        cur = self._open.get(symbol)
+        if cur is None or start > cur.start:
+            self._open[symbol] = Candle(start, close, volume)
+            return cur
+        if start < cur.start or volume < cur.volume or (volume == cur.volume and close == cur.close):
+            # repeated push or one that arrived after a newer update
+            self.duplicates += 1
+            return None
+        cur.volume = volume
+        cur.close = close
+        return None
+
+    def current(self, symbol: str) -> Optional[Candle]:
+        return self._open.get(symbol)
+
+    def drop(self, symbol: str) -> None:
+        self._open.pop(symbol, None)
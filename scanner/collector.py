@@ -1,11 +1,16 @@
 import asyncio
+import contextlib
 import json
 import logging
+import time
 from dataclasses import dataclass
-from typing import Dict, List, Optional, AsyncIterator, Any, Tuple
-from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, AsyncIterator, Any, Tuple
+from collections import deque, OrderedDict
 
-from .metrics import WS_RECONNECTS
+from .metrics import WS_RECONNECTS, TICKS_DROPPED, TICK_QUEUE_DEPTH, KLINE_DUPLICATES
+from .candles import Candle, CandleAccumulator, candle_start
+from .microstructure import BookFeatures, Microstructure
+from .trades import TradeAggregator
 
 import websockets
 
@@ -23,6 +28,58 @@ class Tick:
     ts: float
 
 
+class TickMailbox:
+    """Bounded latest-value mailbox holding at most one tick per symbol.
+
+    A new tick for a symbol that is still pending replaces the old one
+    (newest wins). When ``maxsize`` symbols are pending, the oldest pending
+    tick is dropped to make room, so consumer lag never grows unbounded.
+    """
+
+    def __init__(self, maxsize: int = 0) -> None:
+        self.maxsize = maxsize
+        self._pending: "OrderedDict[str, Tick]" = OrderedDict()
+        self._event = asyncio.Event()
+        self.coalesced = 0
+        self.overflowed = 0
+
+    def put(self, tick: Tick) -> None:
+        if tick.symbol in self._pending:
+            self._pending[tick.symbol] = tick
+            self.coalesced += 1
+            TICKS_DROPPED.labels("coalesced").inc()
+            return
+        if self.maxsize and len(self._pending) >= self.maxsize:
+            self._pending.popitem(last=False)
+            self.overflowed += 1
+            TICKS_DROPPED.labels("overflow").inc()
+        self._pending[tick.symbol] = tick
+        TICK_QUEUE_DEPTH.set(len(self._pending))
+        self._event.set()
+
+    async def get(self) -> Tick:
+        """Return the oldest pending tick, waiting if none is available."""
+        while not self._pending:
+            self._event.clear()
+            await self._event.wait()
+        _, tick = self._pending.popitem(last=False)
+        TICK_QUEUE_DEPTH.set(len(self._pending))
+        return tick
+
+    async def get_batch(self, max_items: int = 0) -> List[Tick]:
+        """Return up to ``max_items`` pending ticks (all if 0), oldest first."""
+        while not self._pending:
+            self._event.clear()
+            await self._event.wait()
+        n = len(self._pending) if not max_items else min(max_items, len(self._pending))
+        batch = [self._pending.popitem(last=False)[1] for _ in range(n)]
+        TICK_QUEUE_DEPTH.set(len(self._pending))
+        return batch
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+
 class MexcWSClient:
     """Minimal MEXC WebSocket collector.
 
@@ -32,14 +89,31 @@ class MexcWSClient:
         Trading pairs to subscribe to.
     ws_url:
         Base WebSocket URL.
+    trades:
+        Also subscribe to each symbol's ``deals`` stream and aggregate it
+        per second (see :class:`~scanner.trades.TradeAggregator`).
+    large_trade_usd:
+        Quote notional from which a trade counts as large.
     """
 
     MAX_STREAMS_PER_CONN = 30
     MAX_MSG_PER_SEC = 100
+    MAX_PENDING_TICKS = 2000
+    MAX_PENDING_CANDLES = 600
+    QUALITY_WINDOW_SEC = 300
 
-    def __init__(self, symbols: List[str], ws_url: str = "wss://wbs.mexc.com/ws"):
+    def __init__(
+        self,
+        symbols: List[str],
+        ws_url: str = "wss://wbs.mexc.com/ws",
+        trades: bool = False,
+        large_trade_usd: float = 10_000.0,
+    ):
         self._symbols = list(dict.fromkeys(symbols))
         self._ws_url = ws_url
+        self._kinds = ("kline_1s", "depth.diff", "deals") if trades else ("kline_1s", "depth.diff")
+        self._large_trade_usd = large_trade_usd
+        self._trades: Dict[str, TradeAggregator] = {}
         self._conns: List[websockets.WebSocketClientProtocol] = []
         self._stream_counts: List[int] = []
         self._symbol_conn: Dict[str, int] = {}
@@ -49,11 +123,22 @@ class MexcWSClient:
         self._kline_cache: Dict[str, Dict[str, Any]] = {}
         self._depth_cache: Dict[str, Dict[str, Any]] = {}
         self._order_books: Dict[str, Dict[str, Dict[float, float]]] = {}
+        self._micro: Dict[str, Microstructure] = {}
+        # called with (symbol, bids, asks) after every depth diff
+        self.book_listeners: List[Callable[[str, List[Tuple[float, float]], List[Tuple[float, float]]], None]] = []
+        # called with the symbols the client dropped on its own (data quality)
+        self.drop_listeners: List[Callable[[List[str]], None]] = []
         self._volume_window: Dict[str, deque] = {}
+        self._candles = CandleAccumulator()
+        # closed candles the feature engine has not read yet, see drain_candles
+        self._closed_candles: Dict[str, Deque[Candle]] = {}
+        self._first_seen: Dict[str, float] = {}
+        self.mailbox = TickMailbox(self.MAX_PENDING_TICKS)
+        self.messages_received = 0
 
     @property
     def active_streams(self) -> int:
-        """Total number of active kline/depth streams."""
+        """Total number of active kline/depth/deals streams."""
         return sum(self._stream_counts)
 
     async def _throttled_send(self, conn_idx: int, msg: dict) -> None:
@@ -68,16 +153,14 @@ class MexcWSClient:
     async def connect(self) -> None:
         """Open all required sockets and subscribe."""
 
-        groups = [
-            self._symbols[i : i + self.MAX_STREAMS_PER_CONN // 2]
-            for i in range(0, len(self._symbols), self.MAX_STREAMS_PER_CONN // 2)
-        ]
+        per_conn = self.MAX_STREAMS_PER_CONN // len(self._kinds)
+        groups = [self._symbols[i : i + per_conn] for i in range(0, len(self._symbols), per_conn)]
         logger.info("Connecting to %s (%d symbols in %d groups)", self._ws_url, len(self._symbols), len(groups))
         for group in groups:
             ws = await websockets.connect(self._ws_url)
             idx = len(self._conns)
             self._conns.append(ws)
-            self._stream_counts.append(len(group) * 2)
+            self._stream_counts.append(len(group) * len(self._kinds))
             for sym in group:
                 self._symbol_conn[sym] = idx
             await self._subscribe_group(idx, group)
@@ -86,29 +169,22 @@ class MexcWSClient:
         logger.info("All websocket connections established")
 
     async def _subscribe_group(self, conn_idx: int, symbols: List[str]) -> None:
-        params = []
-        for sym in symbols:
-            params.append(f"{sym}@kline_1s")
-            params.append(f"{sym}@depth.diff")
-        msg = {"method": "SUBSCRIPTION", "params": params, "id": conn_idx}
+        msg = {"method": "SUBSCRIPTION", "params": self._stream_params(symbols), "id": conn_idx}
         await self._throttled_send(conn_idx, msg)
 
     async def subscribe(self, symbol: str) -> None:
         """Subscribe to additional symbol."""
         if symbol in self._symbol_conn:
             return
+        n = len(self._kinds)
         for idx, _ in enumerate(self._conns):
-            if self._stream_counts[idx] + 2 <= self.MAX_STREAMS_PER_CONN:
+            if self._stream_counts[idx] + n <= self.MAX_STREAMS_PER_CONN:
                 logger.info("Subscribing %s on existing WS %d", symbol, idx)
                 await self._throttled_send(
                     idx,
-                    {
-                        "method": "SUBSCRIPTION",
-                        "params": [f"{symbol}@kline_1s", f"{symbol}@depth.diff"],
-                        "id": idx,
-                    },
+                    {"method": "SUBSCRIPTION", "params": self._stream_params([symbol]), "id": idx},
                 )
-                self._stream_counts[idx] += 2
+                self._stream_counts[idx] += n
                 self._symbol_conn[symbol] = idx
                 self._symbols.append(symbol)
                 return
@@ -116,7 +192,7 @@ class MexcWSClient:
         ws = await websockets.connect(self._ws_url)
         idx = len(self._conns)
         self._conns.append(ws)
-        self._stream_counts.append(2)
+        self._stream_counts.append(n)
         self._symbol_conn[symbol] = idx
         await self._subscribe_group(idx, [symbol])
         logger.info("WS %d subscribed to %s", idx, symbol)
@@ -125,25 +201,78 @@ class MexcWSClient:
 
     async def unsubscribe(self, symbol: str) -> None:
         """Unsubscribe a symbol."""
-        if symbol not in self._symbols:
+        await self.unsubscribe_many([symbol])
+
+    def is_subscribed(self, symbol: str) -> bool:
+        return symbol in self._symbol_conn
+
+    def _stream_params(self, symbols: List[str]) -> List[str]:
+        return [f"{sym}@{kind}" for sym in symbols for kind in self._kinds]
+
+    async def subscribe_many(self, symbols: List[str]) -> None:
+        """Subscribe several symbols with one message per connection."""
+        pending = [s for s in dict.fromkeys(symbols) if s not in self._symbol_conn]
+        n = len(self._kinds)
+        for idx in range(len(self._conns)):
+            if not pending:
+                return
+            free = (self.MAX_STREAMS_PER_CONN - self._stream_counts[idx]) // n
+            if free <= 0:
+                continue
+            group, pending = pending[:free], pending[free:]
+            logger.info("Subscribing %d symbols on existing WS %d", len(group), idx)
+            await self._throttled_send(
+                idx,
+                {"method": "SUBSCRIPTION", "params": self._stream_params(group), "id": idx},
+            )
+            self._stream_counts[idx] += n * len(group)
+            for sym in group:
+                self._symbol_conn[sym] = idx
+                self._symbols.append(sym)
+        per_conn = self.MAX_STREAMS_PER_CONN // n
+        for i in range(0, len(pending), per_conn):
+            group = pending[i : i + per_conn]
+            logger.info("Opening new WS for %d symbols", len(group))
+            ws = await websockets.connect(self._ws_url)
+            idx = len(self._conns)
+            self._conns.append(ws)
+            self._stream_counts.append(len(group) * n)
+            for sym in group:
+                self._symbol_conn[sym] = idx
+                self._symbols.append(sym)
+            await self._subscribe_group(idx, group)
+            self._tasks.append(asyncio.create_task(self._reader(idx)))
+
+    async def unsubscribe_many(self, symbols: List[str]) -> None:
+        """Unsubscribe several symbols with one message per connection."""
+        by_conn: Dict[int, List[str]] = {}
+        gone = set()
+        for symbol in dict.fromkeys(symbols):
+            idx = self._symbol_conn.pop(symbol, None)
+            if idx is None and symbol not in self._symbols:
+                continue
+            gone.add(symbol)
+            if idx is not None:
+                by_conn.setdefault(idx, []).append(symbol)
+            self._kline_cache.pop(symbol, None)
+            self._depth_cache.pop(symbol, None)
+            self._order_books.pop(symbol, None)
+            self._micro.pop(symbol, None)
+            self._trades.pop(symbol, None)
+            self._volume_window.pop(symbol, None)
+            self._candles.drop(symbol)
+            self._closed_candles.pop(symbol, None)
+            self._first_seen.pop(symbol, None)
+        if not gone:
             return
-        self._symbols.remove(symbol)
-        idx = self._symbol_conn.pop(symbol, None)
-        if idx is not None:
-            logger.info("Unsubscribing %s from WS %d", symbol, idx)
+        self._symbols = [s for s in self._symbols if s not in gone]
+        for idx, group in by_conn.items():
+            logger.info("Unsubscribing %d symbols from WS %d", len(group), idx)
             await self._throttled_send(
                 idx,
-                {
-                    "method": "UNSUBSCRIPTION",
-                    "params": [f"{symbol}@kline_1s", f"{symbol}@depth.diff"],
-                    "id": idx,
-                },
+                {"method": "UNSUBSCRIPTION", "params": self._stream_params(group), "id": idx},
             )
-            self._stream_counts[idx] -= 2
-        self._kline_cache.pop(symbol, None)
-        self._depth_cache.pop(symbol, None)
-        self._order_books.pop(symbol, None)
-        self._volume_window.pop(symbol, None)
+            self._stream_counts[idx] -= len(self._kinds) * len(group)
 
     async def _reader(self, conn_idx: int) -> None:
         ws = self._conns[conn_idx]
@@ -164,7 +293,9 @@ class MexcWSClient:
                         await asyncio.sleep(backoff)
                         ws = await websockets.connect(self._ws_url)
                         self._conns[conn_idx] = ws
-                        await self._subscribe_group(conn_idx, [])
+                        # restore every stream that lived on the dropped socket
+                        symbols = [s for s, i in self._symbol_conn.items() if i == conn_idx]
+                        await self._subscribe_group(conn_idx, symbols)
                         logger.info("WS %d reconnected", conn_idx)
                         first = True
                         backoff = 1.0
@@ -178,6 +309,7 @@ class MexcWSClient:
                 backoff = min(backoff * 2, 60.0)
                 await asyncio.sleep(backoff)
                 continue
+            self.messages_received += 1
             data = json.loads(msg)
             await self._handle_message(data)
 
@@ -186,20 +318,38 @@ class MexcWSClient:
         data = msg.get("data") or msg
         if not stream:
             return
+        symbol = data.get("symbol") or data.get("s")
+        if symbol not in self._symbol_conn:
+            return  # in flight when the symbol was unsubscribed
         if "kline" in stream:
-            symbol = data.get("symbol") or data.get("s")
             self._kline_cache[symbol] = data
             self._update_kline(symbol, data)
             await self._check_quality(symbol)
+        elif "deals" in stream:
+            agg = self._trades.get(symbol)
+            if agg is None:
+                agg = self._trades[symbol] = TradeAggregator(self._large_trade_usd)
+            agg.add_deals(data.get("deals") or [], time.time())
         elif "depth" in stream:
-            symbol = data.get("symbol") or data.get("s")
             self._depth_cache[symbol] = data
             self._update_depth(symbol, data)
             await self._check_quality(symbol)
 
     async def yield_ticks(self) -> AsyncIterator[Tick]:
-        """Async generator yielding merged ticks."""
-        queue: asyncio.Queue[Tick] = asyncio.Queue()
+        """Async generator yielding merged ticks one at a time."""
+        async with contextlib.aclosing(self.yield_batches()) as batches:
+            async for batch in batches:
+                for tick in batch:
+                    yield tick
+
+    async def yield_batches(self, max_items: int = 0) -> AsyncIterator[List[Tick]]:
+        """Async generator yielding the merged ticks pending at each wake-up.
+
+        Ticks pass through a :class:`TickMailbox`, so a slow consumer only
+        ever sees the latest tick of each symbol, and takes everything that
+        piled up while it was busy in one batch.
+        """
+        queue = self.mailbox
 
         async def merger() -> None:
             while True:
@@ -207,7 +357,7 @@ class MexcWSClient:
                 for sym in list(self._kline_cache.keys() & self._depth_cache.keys()):
                     kl = self._kline_cache.pop(sym)
                     dp = self._depth_cache.pop(sym)
-                    queue.put_nowait(
+                    queue.put(
                         Tick(
                             symbol=sym,
                             kline=kl,
@@ -220,11 +370,11 @@ class MexcWSClient:
         first = True
         try:
             while True:
-                tick = await queue.get()
+                batch = await queue.get_batch(max_items)
                 if first:
                     logger.info("Data stream started")
                     first = False
-                yield tick
+                yield batch
         finally:
             merge_task.cancel()
 
@@ -245,8 +395,9 @@ class MexcWSClient:
                 book["asks"].pop(p, None)
             else:
                 book["asks"][p] = q
-        sorted_bids = sorted(book["bids"].items(), key=lambda x: -x[0])
-        sorted_asks = sorted(book["asks"].items(), key=lambda x: x[0])
+        # prices are unique keys, so the (price, qty) tuples sort by price alone
+        sorted_bids = sorted(book["bids"].items(), reverse=True)
+        sorted_asks = sorted(book["asks"].items())
         if sorted_bids and sorted_asks:
             mid = (sorted_bids[0][0] + sorted_asks[0][0]) / 2
             bid_min = mid * 0.999
@@ -255,9 +406,15 @@ class MexcWSClient:
             sorted_asks = [a for a in sorted_asks if a[0] <= ask_max][:10]
         book["bids"] = dict(sorted_bids)
         book["asks"] = dict(sorted_asks)
+        micro = self._micro.get(symbol)
+        if micro is None:
+            micro = self._micro[symbol] = Microstructure()
+        micro.update(sorted_bids, sorted_asks)
+        for listener in self.book_listeners:
+            listener(symbol, sorted_bids, sorted_asks)
 
     def _update_kline(self, symbol: str, data: Dict[str, Any]) -> None:
-        """Track 5m quote volume using 1s kline updates."""
+        """Track 5m quote volume, one entry per closed 1s candle."""
         vol = float(
             data.get("quoteVol")
             or data.get("q")
@@ -267,7 +424,18 @@ class MexcWSClient:
         )
         dq = self._volume_window.setdefault(symbol, deque())
         now = asyncio.get_running_loop().time()
-        dq.append((now, vol))
+        self._first_seen.setdefault(symbol, now)
+        price = float(data.get("c") or data.get("close") or 0.0)
+        dups = self._candles.duplicates
+        closed = self._candles.update(symbol, candle_start(data), price, vol)
+        if closed is not None:
+            dq.append((now, closed.volume))
+            pending = self._closed_candles.get(symbol)
+            if pending is None:
+                pending = self._closed_candles[symbol] = deque(maxlen=self.MAX_PENDING_CANDLES)
+            pending.append(closed)
+        elif self._candles.duplicates > dups:
+            KLINE_DUPLICATES.inc()
         while dq and now - dq[0][0] > 300:
             dq.popleft()
 
@@ -279,24 +447,47 @@ class MexcWSClient:
         best_ask = min(book["asks"].items(), key=lambda x: x[0])
         return best_bid, best_ask
 
-    def get_cum_depth(self, symbol: str) -> Optional[Tuple[float, float]]:
+    def get_levels(self, symbol: str) -> Optional[Tuple[List[Tuple[float, float]], List[Tuple[float, float]]]]:
+        """Bid and ask levels of the local book, best first."""
+        book = self._order_books.get(symbol)
+        if not book:
+            return None
+        return list(book["bids"].items()), list(book["asks"].items())
+
+    def get_mid(self, symbol: str) -> Optional[float]:
+        """Return the mid price of the local order book, if any."""
         best = self.get_best(symbol)
         if not best:
             return None
-        book = self._order_books[symbol]
         (bid_p, _), (ask_p, _) = best
-        mid = (bid_p + ask_p) / 2
-        depth_bid = 0.0
-        for p, q in sorted(book["bids"].items(), key=lambda x: -x[0]):
-            if p < mid * 0.999:
-                break
-            depth_bid += q
-        depth_ask = 0.0
-        for p, q in sorted(book["asks"].items(), key=lambda x: x[0]):
-            if p > mid * 1.001:
-                break
-            depth_ask += q
-        return depth_bid, depth_ask
+        return (bid_p + ask_p) / 2
+
+    def get_cum_depth(self, symbol: str) -> Optional[Tuple[float, float]]:
+        """Bid and ask size within 0.1% of the mid (the whole trimmed book)."""
+        feats = self.get_microstructure(symbol)
+        if feats is None:
+            return None
+        return feats.depth_bid, feats.depth_ask
+
+    def get_trades(self, symbol: str) -> Optional[TradeAggregator]:
+        return self._trades.get(symbol)
+
+    def drain_candles(self, symbol: str) -> List[Candle]:
+        """Return and forget the 1s candles closed since the last call, oldest first.
+
+        Every kline push is folded here, so candles closed by pushes the tick
+        mailbox merged away still reach the feature engine.
+        """
+        pending = self._closed_candles.get(symbol)
+        if not pending:
+            return []
+        candles = list(pending)
+        pending.clear()
+        return candles
+
+    def get_microstructure(self, symbol: str) -> Optional[BookFeatures]:
+        micro = self._micro.get(symbol)
+        return micro.features if micro is not None else None
 
     async def _check_quality(self, symbol: str) -> None:
         best = self.get_best(symbol)
@@ -305,7 +496,10 @@ class MexcWSClient:
         (bid_p, _), (ask_p, _) = best
         spread = (ask_p - bid_p) / ((ask_p + bid_p) / 2)
         volume = sum(v for _, v in self._volume_window.get(symbol, []))
-        if spread > 0.015 or volume < 20000:
+        # volume is only judged once a full window has been observed
+        since = self._first_seen.get(symbol)
+        warm = since is not None and asyncio.get_running_loop().time() - since >= self.QUALITY_WINDOW_SEC
+        if spread > 0.015 or (warm and volume < 20000):
             logger.info(
                 "Dropping %s due to data quality (spread %.4f vol %.1f)",
                 symbol,
@@ -313,4 +507,6 @@ class MexcWSClient:
                 volume,
             )
             await self.unsubscribe(symbol)
+            for listener in self.drop_listeners:
+                listener([symbol])
 
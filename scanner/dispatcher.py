@@ -0,0 +1,153 @@
+import asyncio
+import contextlib
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Optional
+
+from telegram.error import RetryAfter
+
+from .metrics import ALERTS_DROPPED, TELEGRAM_RETRIES
+
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Async token bucket allowing ``rate`` operations per second."""
+
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self) -> float:
+        """Take a token if available and return ``0``, else the wait in seconds."""
+        self._refill(time.monotonic())
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                wait = self.try_acquire()
+                if wait <= 0:
+                    return
+                await asyncio.sleep(wait)
+
+
+@dataclass
+class OutboundMessage:
+    chat_id: int
+    text: str
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+
+
+def _retry_seconds(exc: RetryAfter) -> float:
+    value = exc.retry_after
+    if hasattr(value, "total_seconds"):
+        return float(value.total_seconds())
+    return float(value)
+
+
+class AlertDispatcher:
+    """Outbound Telegram queue with concurrent, rate-limited fan-out.
+
+    Every chat gets its own bounded queue and worker so one slow chat never
+    delays the others, while a shared bucket enforces the global limit.
+    :meth:`submit` never awaits, so the scanner loop is not blocked.
+    """
+
+    def __init__(
+        self,
+        bot: Any,
+        global_rate: float = 30.0,
+        per_chat_rate: float = 1.0,
+        max_queue: int = 100,
+        max_retries: int = 3,
+    ) -> None:
+        self.bot = bot
+        self.per_chat_rate = per_chat_rate
+        self.max_queue = max_queue
+        self.max_retries = max_retries
+        self._global = TokenBucket(global_rate)
+        self._queues: Dict[int, asyncio.Queue[OutboundMessage]] = {}
+        self._buckets: Dict[int, TokenBucket] = {}
+        self._workers: Dict[int, asyncio.Task] = {}
+        self.sent = 0
+        self.failed = 0
+
+    def submit(self, chat_ids: Iterable[int], text: str, **kwargs: Any) -> None:
+        """Queue ``text`` for every chat in ``chat_ids`` without blocking."""
+        for chat_id in chat_ids:
+            queue = self._queue_for(chat_id)
+            try:
+                queue.put_nowait(OutboundMessage(chat_id, text, kwargs))
+            except asyncio.QueueFull:
+                ALERTS_DROPPED.inc()
+                logger.warning("Alert queue full for chat %s, dropping message", chat_id)
+
+    def _queue_for(self, chat_id: int) -> asyncio.Queue[OutboundMessage]:
+        queue = self._queues.get(chat_id)
+        if queue is None:
+            queue = asyncio.Queue(self.max_queue)
+            self._queues[chat_id] = queue
+            self._buckets[chat_id] = TokenBucket(self.per_chat_rate)
+            self._workers[chat_id] = asyncio.create_task(self._worker(chat_id))
+        return queue
+
+    async def _worker(self, chat_id: int) -> None:
+        queue = self._queues[chat_id]
+        bucket = self._buckets[chat_id]
+        while True:
+            msg = await queue.get()
+            try:
+                await bucket.acquire()
+                await self._send(msg)
+            finally:
+                queue.task_done()
+
+    async def _send(self, msg: OutboundMessage) -> None:
+        for attempt in range(self.max_retries + 1):
+            await self._global.acquire()
+            try:
+                await self.bot.send_message(chat_id=msg.chat_id, text=msg.text, **msg.kwargs)
+                self.sent += 1
+                return
+            except RetryAfter as exc:
+                if attempt == self.max_retries:
+                    break
+                delay = _retry_seconds(exc)
+                TELEGRAM_RETRIES.inc()
+                logger.warning("Telegram flood limit for chat %s, retrying in %.1fs", msg.chat_id, delay)
+                await asyncio.sleep(delay)
+            except Exception as exc:  # pragma: no cover - network
+                logger.error("Failed to send alert to %s: %s", msg.chat_id, exc)
+                break
+        self.failed += 1
+
+    async def join(self) -> None:
+        """Wait until every queued message has been handled."""
+        for queue in list(self._queues.values()):
+            await queue.join()
+
+    async def stop(self, timeout: Optional[float] = 5.0) -> None:
+        """Flush pending messages (up to ``timeout``) and stop the workers."""
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(self.join(), timeout)
+        for task in self._workers.values():
+            task.cancel()
+        for task in self._workers.values():
+            with contextlib.suppress(Exception, asyncio.CancelledError):
+                await task
+        self._workers.clear()
+        self._queues.clear()
+        self._buckets.clear()
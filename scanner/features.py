@@ -1,11 +1,14 @@
 import time
 from dataclasses import dataclass
 from collections import deque
-from typing import Deque, Dict, Tuple, Optional
+from typing import TYPE_CHECKING, Deque, Dict, Tuple, Optional, Protocol
 
 import numpy as np
 
-from .collector import MexcWSClient, Tick
+from .trades import ROW_SIZE as TRADE_ROW_SIZE, summarize as summarize_trades
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from .collector import MexcWSClient, Tick
 
 
 class RollingWindow:
@@ -18,9 +21,10 @@ class RollingWindow:
     def append(self, ts: float, value) -> None:
         arr = np.asarray(value, dtype=float)
         self._dq.append((ts, arr))
-        self._trim(ts)
+        self.trim(ts)
 
-    def _trim(self, now: float) -> None:
+    def trim(self, now: float) -> None:
+        """Drop entries more than ``size_sec`` older than ``now``."""
         while self._dq and now - self._dq[0][0] > self.size_sec:
             self._dq.popleft()
 
@@ -31,15 +35,15 @@ class RollingWindow:
 
     def sum(self) -> np.ndarray:
         vals = self.values()
-        return vals.sum(axis=0) if vals.size else np.zeros(1)
+        return vals.sum(axis=0) if vals.size else np.zeros(())
 
     def median(self) -> np.ndarray:
         vals = self.values()
-        return np.median(vals, axis=0) if vals.size else np.zeros(1)
+        return np.median(vals, axis=0) if vals.size else np.zeros(())
 
     def max(self) -> np.ndarray:
         vals = self.values()
-        return vals.max(axis=0) if vals.size else np.zeros(1)
+        return vals.max(axis=0) if vals.size else np.zeros(())
 
     def oldest(self) -> Optional[np.ndarray]:
         return self._dq[0][1] if self._dq else None
@@ -51,6 +55,125 @@ class RollingWindow:
         return len(self._dq)
 
 
+@dataclass
+class Bar:
+    """OHLCV bar; ``updates`` counts the kline updates folded into it."""
+
+    start: float
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+    updates: int = 1
+
+
+class BarSeries:
+    """Incremental OHLCV bars of one interval for one symbol.
+
+    Updates are folded into the open bar; a bar closes when an update for a
+    later interval arrives. At most ``keep`` closed bars are retained, and
+    per-field arrays of the closed bars are cached until the next close.
+    """
+
+    def __init__(self, interval: float, keep: int) -> None:
+        self.interval = interval
+        self.keep = keep
+        self.closed: Deque[Bar] = deque(maxlen=keep)
+        self.current: Optional[Bar] = None
+        self._cache: Dict[str, np.ndarray] = {}
+
+    def update(self, ts: float, price: float, volume: float) -> None:
+        start = ts - ts % self.interval
+        bar = self.current
+        if bar is not None and start <= bar.start:
+            if price > 0:
+                bar.high = max(bar.high, price) if bar.high > 0 else price
+                bar.low = min(bar.low, price) if bar.low > 0 else price
+                bar.close = price
+                bar.open = bar.open or price
+            bar.volume += volume
+            bar.updates += 1
+            return
+        if bar is not None:
+            self.closed.append(bar)
+            self._cache.clear()
+        self.current = Bar(start, price, price, price, price, volume)
+
+    def array(self, field: str) -> np.ndarray:
+        """``field`` of the closed bars, oldest first."""
+        arr = self._cache.get(field)
+        if arr is None:
+            arr = np.fromiter((getattr(b, field) for b in self.closed), float, len(self.closed))
+            self._cache[field] = arr
+        return arr
+
+    def first_start(self) -> Optional[float]:
+        if self.closed:
+            return self.closed[0].start
+        return self.current.start if self.current is not None else None
+
+    def prev_close(self) -> float:
+        """Close of the last completed bar, ``0.0`` before the first close."""
+        return self.closed[-1].close if self.closed else 0.0
+
+    def __len__(self) -> int:
+        return len(self.closed) + (self.current is not None)
+
+
+# bar history a symbol needs before its features are ready
+WARMUP_SEC = 21600
+
+
+class BarResampler:
+    """Fold 1s kline updates into 1m, 5m and 1h bars as they arrive.
+
+    Six hours of 1m bars replace the per-second 6h volume window, so memory
+    per symbol is a few hundred bars instead of 21,600 samples.
+    """
+
+    def __init__(self) -> None:
+        self.m1 = BarSeries(60, 360)
+        self.m5 = BarSeries(300, 12)
+        self.h1 = BarSeries(3600, 24)
+
+    def update(self, ts: float, price: float, volume: float) -> None:
+        for series in (self.m1, self.m5, self.h1):
+            series.update(ts, price, volume)
+
+    def volume_rate_median(self) -> float:
+        """Median over the 6h of 1m bars of the mean volume per update."""
+        cur = self.m1.current
+        if cur is None:
+            return 0.0
+        rates = self.m1.array("volume") / self.m1.array("updates")
+        return float(np.median(np.append(rates, cur.volume / cur.updates)))
+
+    def covers(self, now: float, span: float) -> bool:
+        first = self.m1.first_start()
+        return first is not None and now - first >= span
+
+    def momentum(self, series: BarSeries, price: float) -> float:
+        prev = series.prev_close()
+        return price / prev - 1.0 if prev > 0 and price > 0 else 0.0
+
+    def volatility(self, bars: int = 60) -> float:
+        """Standard deviation of 1m log returns over the last ``bars`` closes."""
+        closes = self.m1.array("close")[-(bars + 1):]
+        closes = closes[closes > 0]
+        if len(closes) < 3:
+            return 0.0
+        return float(np.std(np.diff(np.log(closes))))
+
+    def volume_acceleration(self) -> float:
+        """Last closed 1m bar volume relative to the mean of the 5 before it."""
+        vols = self.m1.array("volume")
+        if len(vols) < 6:
+            return 0.0
+        base = vols[-6:-1].mean()
+        return float(vols[-1] / base) if base > 0 else 0.0
+
+
 @dataclass
 class FeatureVector:
     symbol: str
@@ -61,20 +184,69 @@ class FeatureVector:
     spread: float
     listing_age: float
     ready: bool
+    mom_1m: float = 0.0
+    mom_5m: float = 0.0
+    mom_1h: float = 0.0
+    volatility_1h: float = 0.0
+    vol_accel: float = 0.0
+    imbalance_5bp: float = 0.0
+    imbalance_10bp: float = 0.0
+    microprice_dev: float = 0.0
+    depth_slope: float = 0.0
+    ofi: float = 0.0
+    buy_ratio: float = 0.0
+    trade_count_1m: float = 0.0
+    large_trades_1m: float = 0.0
+    avg_trade_usd: float = 0.0
+    small_trade_share: float = 0.0
+    trade_vwap_dev: float = 0.0
+    market_vsr: float = 0.0
+    vsr_rel: float = 0.0
+    market_breadth: float = 0.0
+    btc_ret_5m: float = 0.0
+    eth_ret_5m: float = 0.0
+
+
+class ListingSource(Protocol):
+    def listing_ts(self, symbol: str) -> Optional[float]: ...
 
 
 class FeatureEngine:
-    """Compute microstructure metrics each second."""
+    """Compute microstructure metrics each second.
 
-    def __init__(self) -> None:
+    ``obi`` is the size imbalance at the best bid and ask; the band
+    imbalances, microprice, depth slope and order-flow imbalance come from
+    the client's :class:`~scanner.microstructure.Microstructure` state and
+    the trade features from its per-second deals aggregates.
+
+    ``listing_age`` uses the exchange listing time from ``symbol_meta`` when
+    known and falls back to the first time the symbol was seen.
+    """
+
+    def __init__(self, symbol_meta: ListingSource | None = None) -> None:
+        self.symbol_meta = symbol_meta
         self._vol_5m: Dict[str, RollingWindow] = {}
-        self._vol_6h: Dict[str, RollingWindow] = {}
         self._price_vol_5m: Dict[str, RollingWindow] = {}
-        self._vol1m: Dict[str, RollingWindow] = {}
+        self._bars: Dict[str, BarResampler] = {}
         self._depth_net: Dict[str, RollingWindow] = {}
+        self._ofi: Dict[str, RollingWindow] = {}
+        self._trades_1m: Dict[str, RollingWindow] = {}
         self._first_seen: Dict[str, float] = {}
 
-    def update(self, tick: Tick, client: MexcWSClient) -> FeatureVector:
+    def forget(self, symbol: str) -> None:
+        """Free the per-symbol state of an unsubscribed symbol."""
+        for state in (
+            self._vol_5m,
+            self._price_vol_5m,
+            self._bars,
+            self._depth_net,
+            self._ofi,
+            self._trades_1m,
+            self._first_seen,
+        ):
+            state.pop(symbol, None)
+
+    def update(self, tick: "Tick", client: "MexcWSClient") -> FeatureVector:
         now = time.time()
         symbol = tick.symbol
         price = float(
@@ -83,25 +255,20 @@ class FeatureEngine:
             or tick.kline.get("p")
             or 0.0
         )
-        vol = float(
-            tick.kline.get("quoteVol")
-            or tick.kline.get("q")
-            or tick.kline.get("quote_volume")
-            or tick.kline.get("v")
-            or 0.0
-        )
         self._first_seen.setdefault(symbol, now)
 
         w5 = self._vol_5m.setdefault(symbol, RollingWindow(300))
-        w6h = self._vol_6h.setdefault(symbol, RollingWindow(21600))
         pv5 = self._price_vol_5m.setdefault(symbol, RollingWindow(300))
-        vol1 = self._vol1m.setdefault(symbol, RollingWindow(60))
+        bars = self._bars.get(symbol)
+        if bars is None:
+            bars = self._bars[symbol] = BarResampler()
         depth_w = self._depth_net.setdefault(symbol, RollingWindow(180))
 
-        for w in (w5, w6h, vol1):
-            w.append(now, vol)
-        pv5.append(now, np.array([price * vol, vol]))
-
+        # windows take one entry per closed candle; the client folds the pushes
+        for closed in client.drain_candles(symbol):
+            w5.append(now, closed.volume)
+            pv5.append(now, np.array([closed.close * closed.volume, closed.volume]))
+            bars.update(now, closed.close, closed.volume)
 
         depth = client.get_cum_depth(symbol) or (0.0, 0.0)
         net = depth[0] - depth[1]
@@ -109,8 +276,18 @@ class FeatureEngine:
         oldest_net = depth_w.oldest()
         cum_depth_delta = float(net - oldest_net) if oldest_net is not None else 0.0
 
+        book = client.get_microstructure(symbol)
+        ofi = 0.0
+        if book is not None:
+            # order-flow imbalance over the last minute relative to book depth
+            ofi_w = self._ofi.setdefault(symbol, RollingWindow(60))
+            ofi_w.append(now, book.ofi)
+            total_depth = book.depth_bid + book.depth_ask
+            if total_depth > 0:
+                ofi = float(book.ofi - ofi_w.oldest()) / total_depth
+
         vol_5m = float(w5.sum())
-        median_6h = float(w6h.median())
+        median_6h = bars.volume_rate_median()
         vsr = vol_5m / median_6h if median_6h > 0 else 0.0
 
 
@@ -122,22 +299,34 @@ class FeatureEngine:
             vwap = 0.0
         pm = (price - vwap) / vwap if vwap > 0 else 0.0
 
+        trades = summarize_trades(np.zeros((0, TRADE_ROW_SIZE)))
+        agg = client.get_trades(symbol)
+        if agg is not None:
+            # per-second trade aggregates from the deals stream
+            agg.roll(now)
+            tw = self._trades_1m.setdefault(symbol, RollingWindow(60))
+            for sec, row in zip(*agg.drain()):
+                tw.append(float(sec), row)
+            tw.trim(now)
+            trades = summarize_trades(tw.values())
+        trade_vwap = trades["vwap"]
+
         best = client.get_best(symbol)
         if best:
-            (bid_p, _), (ask_p, _) = best
+            (bid_p, bid_q), (ask_p, ask_q) = best
             spread = (ask_p - bid_p) / ((ask_p + bid_p) / 2)
-            obi = (bid_p - ask_p) / (bid_p + ask_p)
+            obi = (bid_q - ask_q) / (bid_q + ask_q) if bid_q + ask_q > 0 else 0.0
         else:
             spread = 0.0
             obi = 0.0
 
-        listing_age = now - self._first_seen[symbol]
+        listed = self.symbol_meta.listing_ts(symbol) if self.symbol_meta else None
+        listing_age = now - (listed if listed is not None else self._first_seen[symbol])
 
         ready = (
             w5.first_timestamp() is not None
             and now - w5.first_timestamp() >= 300
-            and w6h.first_timestamp() is not None
-            and now - w6h.first_timestamp() >= 21600
+            and bars.covers(now, WARMUP_SEC)
             and depth_w.first_timestamp() is not None
             and now - depth_w.first_timestamp() >= 180
         )
@@ -151,4 +340,20 @@ class FeatureEngine:
             spread=float(spread),
             listing_age=float(listing_age),
             ready=ready,
+            mom_1m=bars.momentum(bars.m1, price),
+            mom_5m=bars.momentum(bars.m5, price),
+            mom_1h=bars.momentum(bars.h1, price),
+            volatility_1h=bars.volatility(),
+            vol_accel=bars.volume_acceleration(),
+            imbalance_5bp=book.imbalance_5bp if book else 0.0,
+            imbalance_10bp=book.imbalance_10bp if book else 0.0,
+            microprice_dev=(book.microprice - book.mid) / book.mid if book else 0.0,
+            depth_slope=book.depth_slope if book else 0.0,
+            ofi=ofi,
+            buy_ratio=trades["buy_ratio"],
+            trade_count_1m=trades["trade_count"],
+            large_trades_1m=trades["large_trades"],
+            avg_trade_usd=trades["avg_trade_usd"],
+            small_trade_share=trades["small_share"],
+            trade_vwap_dev=(price - trade_vwap) / trade_vwap if trade_vwap > 0 and price > 0 else 0.0,
         )
@@ -9,8 +9,32 @@ LATENCY = Histogram(
 )
 WS_RECONNECTS = Counter("ws_reconnects_total", "Number of websocket reconnects")
 SIGNALS_TOTAL = Counter("signals_total", "Total number of signals sent")
+SIGNALS_BY_PROFILE = Counter("profile_signals_total", "Signals sent per strategy profile", ["profile"])
+SIGNALS_SUPPRESSED = Counter("signals_suppressed_total", "Signals suppressed by cooldown")
 SIGNALS_PER_HOUR = Gauge("signals_per_hour", "Signals generated in the last hour")
 ACTIVE_STREAMS = Gauge("active_streams", "Number of active websocket streams")
+TICKS_DROPPED = Counter(
+    "ticks_dropped_total",
+    "Ticks dropped by the tick mailbox",
+    ["reason"],
+)
+ALERTS_DROPPED = Counter("alerts_dropped_total", "Outbound alerts dropped on a full queue")
+TELEGRAM_RETRIES = Counter("telegram_retries_total", "Telegram sends retried after a 429")
+SCOUT_POLL_INTERVAL = Gauge("scout_poll_interval_seconds", "Current volume scout poll interval")
+SCOUT_ACTIVITY = Gauge("scout_market_activity", "Market activity score driving the poll schedule")
+SCOUT_REST_WEIGHT = Gauge("scout_rest_weight_per_min", "REST weight spent by the scout in the last minute")
+UNIVERSE_SIZE = Gauge("universe_symbols", "Pairs tracked by the universe scan")
+UNIVERSE_PROMOTIONS = Counter("universe_promotions_total", "Pairs promoted by the universe scan")
+TICK_QUEUE_DEPTH = Gauge("tick_queue_depth", "Symbols with a pending tick")
+OUTCOMES_PENDING = Gauge("outcomes_pending", "Signal price samples waiting for their horizon")
+OUTCOMES_MISSED = Counter("outcomes_missed_total", "Signal price samples with no book available")
+BUS_DROPPED = Counter("bus_events_dropped_total", "Events dropped on a full sink queue", ["sink"])
+BUS_QUEUE_DEPTH = Gauge("bus_queue_depth", "Events waiting in a sink queue", ["sink"])
+BUS_SINK_ERRORS = Counter("bus_sink_errors_total", "Events a sink failed to handle", ["sink"])
+PAPER_OPEN = Gauge("paper_positions_open", "Open or pending paper positions")
+PAPER_CLOSED = Counter("paper_positions_closed_total", "Paper positions closed or cancelled", ["reason"])
+PAPER_PNL = Gauge("paper_realized_pnl_usdt", "Realized paper-trading PnL in USDT since start")
+KLINE_DUPLICATES = Counter("kline_duplicates_total", "Repeated or late kline pushes ignored")
 
 _signal_ts: deque[float] = deque()
 
@@ -23,12 +47,13 @@ def start_metrics_server(port: int = 8000) -> None:
         _started = True
 
 
-def record_signal() -> None:
+def record_signal(profile: str = "default") -> None:
     """Update counters and hourly gauge for a new signal."""
     now = time.time()
     _signal_ts.append(now)
     while _signal_ts and now - _signal_ts[0] > 3600:
         _signal_ts.popleft()
     SIGNALS_TOTAL.inc()
+    SIGNALS_BY_PROFILE.labels(profile).inc()
     SIGNALS_PER_HOUR.set(len(_signal_ts))
 
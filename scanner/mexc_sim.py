@@ -0,0 +1,348 @@
+"""Local stand-in for the MEXC spot WebSocket and ticker REST API.
+
+:class:`MarketGenerator` simulates thousands of symbols with NumPy: a random
+walk with bursty pump episodes (price and volume ramps) and silent gaps.
+:class:`MexcStandIn` serves it over an aiohttp app:
+
+* ``/ws`` speaks the ``SUBSCRIPTION``/``UNSUBSCRIPTION`` protocol for
+  ``<symbol>@kline_1s`` (cumulative within each 1s candle, like MEXC),
+  ``<symbol>@depth.diff`` and ``<symbol>@deals`` streams, enforces the
+  per-connection stream limit and can drop connections periodically;
+* ``/api/v3/ticker/24hr`` returns bulk tickers for the volume scout and the
+  universe scan.
+
+Run standalone with ``python -m scanner.mexc_sim --symbols 2000 --port 8765``.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set
+
+import numpy as np
+from aiohttp import WSMsgType, web
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Scenario:
+    """Load profile of the simulated market."""
+
+    symbols: int = 200
+    rate_hz: float = 1.0
+    depth_levels: int = 5
+    trades_per_update: float = 3.0
+    pump_rate: float = 0.0005
+    pump_duration: float = 120.0
+    pump_return: float = 0.3
+    pump_volume_mult: float = 20.0
+    gap_rate: float = 0.0
+    gap_duration: float = 5.0
+    disconnect_every: float = 0.0
+    max_streams_per_conn: int = 30
+    seed: int = 0
+
+
+class MarketGenerator:
+    """Vectorised price/volume state for every simulated symbol."""
+
+    def __init__(self, scenario: Scenario) -> None:
+        self.scenario = scenario
+        n = scenario.symbols
+        self.rng = np.random.default_rng(scenario.seed)
+        self.names = [f"S{i:05d}USDT" for i in range(n)]
+        self.index = {s: i for i, s in enumerate(self.names)}
+        self.price = self.rng.uniform(0.01, 100.0, n)
+        self.base_vol = self.rng.uniform(1e3, 1e5, n)  # quote volume per second
+        self.vol_24h = self.base_vol * 86400
+        self.last_vol = np.zeros(n)
+        # kline_1s pushes carry the volume accumulated since the candle opened
+        self.candle_start = np.zeros(n)
+        self.candle_vol = np.zeros(n)
+        self.pump_until = np.zeros(n)
+        self.gap_until = np.zeros(n)
+        self.pumps_started = 0
+        self.now = 0.0
+
+    def step(self, now: float) -> np.ndarray:
+        """Advance to ``now`` and return the mask of symbols emitting data."""
+        sc = self.scenario
+        dt = max(now - self.now, 0.0) if self.now else 1.0 / sc.rate_hz
+        self.now = now
+        n = len(self.price)
+        start = (self.pump_until <= now) & (self.rng.random(n) < sc.pump_rate * dt)
+        self.pump_until[start] = now + sc.pump_duration
+        self.pumps_started += int(start.sum())
+        pumping = self.pump_until > now
+
+        ret = self.rng.normal(0.0, 0.0005 * np.sqrt(dt), n)
+        ret[pumping] += np.log1p(sc.pump_return) * dt / sc.pump_duration
+        self.price *= np.exp(ret)
+        vol = self.base_vol * dt * self.rng.uniform(0.5, 1.5, n)
+        vol[pumping] *= sc.pump_volume_mult
+        self.last_vol = vol
+        rolled = self.candle_start != np.floor(now)
+        self.candle_start[rolled] = np.floor(now)
+        self.candle_vol[rolled] = 0.0
+        self.candle_vol += vol
+        # rolling 24h quote volume drifts towards the recent rate
+        self.vol_24h += vol - self.vol_24h * dt / 86400
+
+        if sc.gap_rate:
+            gap = (self.gap_until <= now) & (self.rng.random(n) < sc.gap_rate * dt)
+            self.gap_until[gap] = now + sc.gap_duration
+        return self.gap_until <= now
+
+    def kline(self, i: int) -> Dict[str, Any]:
+        p = self.price[i]
+        return {
+            "s": self.names[i],
+            "t": int(self.candle_start[i] * 1000),
+            "o": f"{p:.8g}",
+            "c": f"{p:.8g}",
+            "quoteVol": f"{self.candle_vol[i]:.2f}",
+        }
+
+    def depth(self, i: int) -> Dict[str, Any]:
+        p = self.price[i]
+        levels = self.scenario.depth_levels
+        tick = p * 0.0005
+        qty = self.rng.uniform(1, 100, 2 * levels)
+        return {
+            "s": self.names[i],
+            "b": [[f"{p - tick * (k + 1):.8g}", f"{qty[k]:.4f}"] for k in range(levels)],
+            "a": [[f"{p + tick * (k + 1):.8g}", f"{qty[levels + k]:.4f}"] for k in range(levels)],
+        }
+
+    def deals(self, i: int) -> Dict[str, Any]:
+        """Trades splitting the last step's volume; pumps are buyer-driven."""
+        pumping = self.pump_until[i] > self.now
+        n = int(self.rng.poisson(self.scenario.trades_per_update * (5 if pumping else 1))) + 1
+        p = self.price[i]
+        notional = self.last_vol[i] * self.rng.dirichlet(np.ones(n))
+        buy = self.rng.random(n) < (0.8 if pumping else 0.5)
+        t = int(self.now * 1000)
+        return {
+            "s": self.names[i],
+            "deals": [
+                {"p": f"{p:.8g}", "v": f"{notional[k] / p:.6g}", "S": 1 if buy[k] else 2, "t": t}
+                for k in range(n)
+            ],
+        }
+
+    def tickers(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "symbol": s,
+                "lastPrice": f"{self.price[i]:.8g}",
+                "quoteVolume": f"{self.vol_24h[i]:.2f}",
+                "bidPrice": f"{self.price[i] * 0.9995:.8g}",
+                "askPrice": f"{self.price[i] * 1.0005:.8g}",
+            }
+            for i, s in enumerate(self.names)
+        ]
+
+
+class _Conn:
+    def __init__(self, ws: web.WebSocketResponse) -> None:
+        self.ws = ws
+        self.streams: Dict[str, Set[str]] = {}
+
+    @property
+    def stream_count(self) -> int:
+        return sum(len(kinds) for kinds in self.streams.values())
+
+
+class MexcStandIn:
+    """aiohttp server replaying :class:`MarketGenerator` as MEXC streams."""
+
+    KINDS = ("kline_1s", "depth.diff", "deals")
+
+    def __init__(self, scenario: Scenario | None = None, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.scenario = scenario or Scenario()
+        self.market = MarketGenerator(self.scenario)
+        self.host = host
+        self.port = port
+        self.conns: List[_Conn] = []
+        self.sent = 0
+        self.disconnects = 0
+        self.rejected = 0
+        self._runner: Optional[web.AppRunner] = None
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def ws_url(self) -> str:
+        return f"ws://{self.host}:{self.port}/ws"
+
+    @property
+    def rest_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/ws", self._ws_handler)
+        app.router.add_get("/api/v3/ticker/24hr", self._tickers)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        self._tasks.append(asyncio.create_task(self._broadcast()))
+        if self.scenario.disconnect_every:
+            self._tasks.append(asyncio.create_task(self._disconnector()))
+        logger.info("MEXC stand-in on %s with %d symbols", self.ws_url, self.scenario.symbols)
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        for conn in list(self.conns):
+            await conn.ws.close()
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def __aenter__(self) -> "MexcStandIn":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.stop()
+
+    async def _tickers(self, request: web.Request) -> web.Response:
+        return web.json_response(self.market.tickers())
+
+    def _handle_request(self, conn: _Conn, msg: Dict[str, Any]) -> Dict[str, Any]:
+        method = msg.get("method")
+        params = msg.get("params") or []
+        if method == "PING":
+            return {"id": msg.get("id"), "code": 0, "msg": "PONG"}
+        if method == "SUBSCRIPTION":
+            new = 0
+            for p in params:
+                symbol, _, kind = p.partition("@")
+                new += kind not in conn.streams.get(symbol, ())
+            if conn.stream_count + new > self.scenario.max_streams_per_conn:
+                self.rejected += 1
+                return {"id": msg.get("id"), "code": 1, "msg": "Exceeded subscription limit"}
+            for p in params:
+                symbol, _, kind = p.partition("@")
+                if symbol in self.market.index and kind in self.KINDS:
+                    conn.streams.setdefault(symbol, set()).add(kind)
+            return {"id": msg.get("id"), "code": 0, "msg": ",".join(params)}
+        if method == "UNSUBSCRIPTION":
+            for p in params:
+                symbol, _, kind = p.partition("@")
+                kinds = conn.streams.get(symbol)
+                if kinds is not None:
+                    kinds.discard(kind)
+                    if not kinds:
+                        del conn.streams[symbol]
+            return {"id": msg.get("id"), "code": 0, "msg": ",".join(params)}
+        return {"id": msg.get("id"), "code": 1, "msg": f"Unknown method {method}"}
+
+    async def _ws_handler(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        conn = _Conn(ws)
+        self.conns.append(conn)
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                try:
+                    reply = self._handle_request(conn, json.loads(msg.data))
+                except (ValueError, AttributeError):
+                    reply = {"code": 1, "msg": "Invalid request"}
+                await ws.send_str(json.dumps(reply))
+        finally:
+            self.conns.remove(conn)
+        return ws
+
+    async def _broadcast(self) -> None:
+        loop = asyncio.get_running_loop()
+        period = 1.0 / self.scenario.rate_hz
+        next_at = loop.time()
+        while True:
+            live = self.market.step(loop.time())
+            for conn in list(self.conns):
+                if conn.ws.closed:
+                    continue
+                for symbol, kinds in list(conn.streams.items()):
+                    i = self.market.index[symbol]
+                    if not live[i]:
+                        continue
+                    for kind in kinds:
+                        if kind == "kline_1s":
+                            data = self.market.kline(i)
+                        elif kind == "deals":
+                            data = self.market.deals(i)
+                        else:
+                            data = self.market.depth(i)
+                        try:
+                            await conn.ws.send_str(json.dumps({"stream": f"{symbol}@{kind}", "data": data}))
+                        except ConnectionError:
+                            break
+                        self.sent += 1
+            next_at += period
+            # never build a backlog: skip missed periods under overload
+            next_at = max(next_at, loop.time())
+            await asyncio.sleep(next_at - loop.time())
+
+    async def _disconnector(self) -> None:
+        while True:
+            await asyncio.sleep(self.scenario.disconnect_every)
+            if self.conns:
+                conn = random.choice(self.conns)
+                self.disconnects += 1
+                await conn.ws.close()
+
+
+async def _serve(scenario: Scenario, host: str, port: int) -> None:
+    async with MexcStandIn(scenario, host, port) as server:
+        print(f"ws: {server.ws_url}  rest: {server.rest_url}")
+        while True:
+            await asyncio.sleep(10)
+            logger.info(
+                "sent=%d conns=%d pumps=%d disconnects=%d",
+                server.sent,
+                len(server.conns),
+                server.market.pumps_started,
+                server.disconnects,
+            )
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Local MEXC WebSocket stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--rate", type=float, default=1.0, help="updates per symbol and second")
+    parser.add_argument("--pump-rate", type=float, default=0.0005)
+    parser.add_argument("--gap-rate", type=float, default=0.0)
+    parser.add_argument("--disconnect-every", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    scenario = Scenario(
+        symbols=args.symbols,
+        rate_hz=args.rate,
+        pump_rate=args.pump_rate,
+        gap_rate=args.gap_rate,
+        disconnect_every=args.disconnect_every,
+        seed=args.seed,
+    )
+    try:
+        asyncio.run(_serve(scenario, args.host, args.port))
+    except KeyboardInterrupt:  # pragma: no cover - interactive
+        pass
+
+
+if __name__ == "__main__":
+    main()
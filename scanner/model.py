@@ -1,35 +1,242 @@
 import json
 import math
+from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Dict
+from typing import Any, Callable, Dict, Iterable, Sequence, Tuple
+
+import numpy as np
 
 from .features import FeatureVector
 from config import get_thresholds
 
 _MODEL_PATH = Path(__file__).resolve().parents[1] / 'model.json'
 
+FEATURE_NAMES = ('vsr', 'pm', 'obi', 'cum_depth_delta', 'spread', 'listing_age')
+# multi-timeframe, order-book, trade and market-regime features a model may opt into by name
+OPTIONAL_FEATURE_NAMES = (
+    'mom_1m', 'mom_5m', 'mom_1h', 'volatility_1h', 'vol_accel',
+    'imbalance_5bp', 'imbalance_10bp', 'microprice_dev', 'depth_slope', 'ofi',
+    'buy_ratio', 'trade_count_1m', 'large_trades_1m', 'avg_trade_usd', 'small_trade_share',
+    'trade_vwap_dev', 'market_vsr', 'vsr_rel', 'market_breadth', 'btc_ret_5m', 'eth_ret_5m',
+)
+
+
+def feature_matrix(fvs: Iterable[FeatureVector], names: Sequence[str] = FEATURE_NAMES) -> np.ndarray:
+    """Stack feature vectors into an ``(n, len(names))`` float matrix."""
+    rows = [[getattr(fv, n) for n in names] for fv in fvs]
+    return np.asarray(rows, dtype=float).reshape(len(rows), len(names))
+
+
+class Model(ABC):
+    """Runtime interface shared by every model backend."""
+
+    feature_names: Sequence[str] = FEATURE_NAMES
+    version: str = ''
+
+    @abstractmethod
+    def predict_batch(self, matrix: np.ndarray) -> np.ndarray:
+        """Probabilities for the rows of a ``(n, len(feature_names))`` matrix."""
+
+    def predict_proba(self, fv: FeatureVector) -> float:
+        return float(self.predict_batch(feature_matrix([fv], self.feature_names))[0])
+
 
-class LogisticModel:
-    def __init__(self, intercept: float, coefficients: Dict[str, float], thresholds: Dict[str, float]) -> None:
+class LogisticModel(Model):
+    def __init__(
+        self,
+        intercept: float,
+        coefficients: Dict[str, float],
+        thresholds: Dict[str, float],
+        normalize: bool = True,
+    ) -> None:
         self.intercept = intercept
         self.coef = coefficients
         self.thresholds = thresholds
+        self.normalize = normalize
+        known = (*FEATURE_NAMES, *OPTIONAL_FEATURE_NAMES)
+        self.feature_names = tuple(n for n in known if n in coefficients) or ('vsr', 'pm', 'obi')
+        # vsr/pm/obi are normalised by their rule thresholds, other features are used raw
+        self._weights = np.array(
+            [self.coef.get(n, 0.0) / self._norm(n) for n in self.feature_names], dtype=float
+        )
 
-    def predict_proba(self, fv: FeatureVector) -> float:
-        vsr_norm = fv.vsr / self.thresholds.get('vsr', 1.0)
-        pm_norm = fv.pm / self.thresholds.get('pm', 1.0)
-        obi_norm = fv.obi / self.thresholds.get('obi', 1.0)
+    def _norm(self, name: str) -> float:
+        if self.normalize and name in ('vsr', 'pm', 'obi'):
+            return self.thresholds.get(name, 1.0) or 1.0
+        return 1.0
 
+    def predict_proba(self, fv: FeatureVector) -> float:
         x = self.intercept
-        x += vsr_norm * self.coef.get('vsr', 0.0)
-        x += pm_norm * self.coef.get('pm', 0.0)
-        x += obi_norm * self.coef.get('obi', 0.0)
+        for name, w in zip(self.feature_names, self._weights):
+            x += getattr(fv, name) * w
         return 1.0 / (1.0 + math.exp(-x))
 
+    def predict_batch(self, matrix: np.ndarray) -> np.ndarray:
+        x = self.intercept + matrix @ self._weights
+        return 1.0 / (1.0 + np.exp(-x))
+
+
+class TreeEnsembleModel(Model):
+    """Gradient-boosted trees stored as flat node arrays.
+
+    All trees share the arrays ``feature``, ``threshold``, ``left``, ``right``
+    and ``value``; ``roots`` holds the index of each tree's first node and a
+    leaf is a node with ``left == -1``. Evaluation walks every row through
+    every tree at once, one depth level per NumPy step.
+    """
+
+    def __init__(
+        self,
+        feature_names: Sequence[str],
+        roots: Sequence[int],
+        feature: Sequence[int],
+        threshold: Sequence[float],
+        left: Sequence[int],
+        right: Sequence[int],
+        value: Sequence[float],
+        base_score: float = 0.0,
+        max_depth: int | None = None,
+    ) -> None:
+        self.feature_names = tuple(feature_names)
+        self.roots = np.asarray(roots, dtype=np.int64)
+        self.feature = np.asarray(feature, dtype=np.int64)
+        self.threshold = np.asarray(threshold, dtype=float)
+        self.left = np.asarray(left, dtype=np.int64)
+        self.right = np.asarray(right, dtype=np.int64)
+        self.value = np.asarray(value, dtype=float)
+        self.base_score = base_score
+        self.max_depth = max_depth if max_depth is not None else self._depth()
+        leaf = self.left < 0
+        # leaves point to themselves so extra steps are no-ops
+        idx = np.arange(len(self.left))
+        self._children = np.stack(
+            [np.where(leaf, idx, self.left), np.where(leaf, idx, self.right)], axis=1
+        ).ravel()
+        self._feature = np.where(leaf, 0, self.feature)
+
+    def _depth(self) -> int:
+        depth = 0
+        for root in self.roots:
+            stack = [(int(root), 0)]
+            while stack:
+                node, d = stack.pop()
+                if self.left[node] < 0:
+                    depth = max(depth, d)
+                    continue
+                stack.append((int(self.left[node]), d + 1))
+                stack.append((int(self.right[node]), d + 1))
+        return depth
+
+    def predict_batch(self, matrix: np.ndarray) -> np.ndarray:
+        matrix = np.ascontiguousarray(matrix, dtype=float)
+        n_rows, n_cols = matrix.shape
+        flat = matrix.ravel()
+        offsets = (np.arange(n_rows) * n_cols)[:, None]
+        nodes = np.broadcast_to(self.roots, (n_rows, len(self.roots)))
+        for _ in range(self.max_depth):
+            x = flat.take(offsets + self._feature.take(nodes))
+            go_right = x >= self.threshold.take(nodes)
+            nodes = self._children.take(2 * nodes + go_right)
+        margin = self.base_score + self.value.take(nodes).sum(axis=1)
+        return 1.0 / (1.0 + np.exp(-margin))
+
+
+class OnnxModel(Model):
+    """Binary classifier executed by ``onnxruntime`` on CPU."""
+
+    def __init__(self, path: Path | str, feature_names: Sequence[str] = FEATURE_NAMES) -> None:
+        try:
+            import onnxruntime as ort
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise ImportError("onnxruntime is required for ONNX models") from exc
+        self.path = Path(path)
+        opts = ort.SessionOptions()
+        opts.intra_op_num_threads = 1
+        self.session = ort.InferenceSession(str(path), opts, providers=['CPUExecutionProvider'])
+        self.input_name = self.session.get_inputs()[0].name
+        self.feature_names = tuple(feature_names)
+
+    def __reduce__(self):
+        # inference sessions cannot be pickled; worker processes reopen the file
+        return (OnnxModel, (self.path, self.feature_names), {'version': self.version})
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.version = state.get('version', '')
+
+    def predict_batch(self, matrix: np.ndarray) -> np.ndarray:
+        outputs = self.session.run(None, {self.input_name: np.asarray(matrix, dtype=np.float32)})
+        out = outputs[-1]
+        if isinstance(out, list):  # ZipMap output: list of {label: prob}
+            return np.array([row[1] for row in out], dtype=float)
+        out = np.asarray(out, dtype=float)
+        if out.ndim == 2:
+            out = out[:, -1]
+        return out
+
+
+_LOADERS: Dict[str, Callable[[Dict[str, Any], Path], Model]] = {}
+# resolved path -> ((mtime, thresholds), model); only the newest load per path is kept
+_CACHE: Dict[str, Tuple[tuple, Model]] = {}
+
+
+def register_model(kind: str) -> Callable:
+    """Register a loader for ``model.json`` files with ``"type": kind``."""
+
+    def wrap(fn: Callable[[Dict[str, Any], Path], Model]) -> Callable[[Dict[str, Any], Path], Model]:
+        _LOADERS[kind] = fn
+        return fn
+
+    return wrap
+
+
+@register_model('logistic')
+def _load_logistic(data: Dict[str, Any], path: Path) -> Model:
+    normalize = data.get('normalize', True)
+    return LogisticModel(
+        data['intercept'],
+        data['coefficients'],
+        get_thresholds() if normalize else {},
+        normalize,
+    )
+
+
+@register_model('tree_ensemble')
+def _load_trees(data: Dict[str, Any], path: Path) -> Model:
+    return TreeEnsembleModel(
+        data.get('features', FEATURE_NAMES),
+        data['roots'],
+        data['feature'],
+        data['threshold'],
+        data['left'],
+        data['right'],
+        data['value'],
+        data.get('base_score', 0.0),
+    )
+
+
+@register_model('onnx')
+def _load_onnx(data: Dict[str, Any], path: Path) -> Model:
+    return OnnxModel(path.parent / data['path'], data.get('features', FEATURE_NAMES))
+
 
-def load_model(path: Path | str | None = None) -> LogisticModel:
+def load_model(path: Path | str | None = None) -> Model:
+    """Load a model by file type, caching it until the file changes."""
     p = Path(path) if path else _MODEL_PATH
-    with p.open('r') as f:
-        data = json.load(f)
     thresholds = get_thresholds()
-    return LogisticModel(data['intercept'], data['coefficients'], thresholds)
+    key = str(p.resolve())
+    stamp = (p.stat().st_mtime_ns, tuple(sorted(thresholds.items())))
+    cached = _CACHE.get(key)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    if p.suffix == '.onnx':
+        model = OnnxModel(p)
+    else:
+        with p.open('r') as f:
+            data = json.load(f)
+        kind = data.get('type', 'logistic')
+        if kind not in _LOADERS:
+            raise ValueError(f"Unknown model type '{kind}'")
+        model = _LOADERS[kind](data, p)
+        model.version = str(data.get('version', ''))
+    _CACHE[key] = (stamp, model)
+    return model
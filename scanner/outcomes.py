@@ -0,0 +1,103 @@
+import asyncio
+import heapq
+import logging
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .metrics import OUTCOMES_MISSED, OUTCOMES_PENDING
+from .storage import OUTCOME_HORIZONS, _DB_PATH, save_outcomes
+
+
+logger = logging.getLogger(__name__)
+
+PriceSource = Callable[[str], Optional[float]]
+
+
+class OutcomeTracker:
+    """Sample the post-signal price path and write it back in batches.
+
+    Every tracked signal schedules one sample per horizon in a heap ordered
+    by due time. ``sample`` reads the current price from ``price_source``
+    (normally the live order book mid) for all due entries and ``flush``
+    writes them with a single transaction. A sample whose book stays empty
+    for ``grace_sec`` past its horizon is dropped.
+    """
+
+    def __init__(
+        self,
+        price_source: PriceSource,
+        horizons: Dict[str, int] = OUTCOME_HORIZONS,
+        flush_interval: float = 5.0,
+        grace_sec: float = 30.0,
+        db_path: Path | str = _DB_PATH,
+    ) -> None:
+        self.price_source = price_source
+        self.horizons = horizons
+        self.flush_interval = flush_interval
+        self.grace_sec = grace_sec
+        self.db_path = db_path
+        self._due: List[Tuple[float, int, str, str]] = []
+        self._pending: List[Tuple[int, str, float]] = []
+
+    @property
+    def max_horizon(self) -> float:
+        return float(max(self.horizons.values(), default=0))
+
+    def track(self, signal_id: int, symbol: str, ts: float | None = None) -> None:
+        ts = time.time() if ts is None else ts
+        for column, offset in self.horizons.items():
+            heapq.heappush(self._due, (ts + offset, signal_id, symbol, column))
+        OUTCOMES_PENDING.set(len(self._due))
+
+    def sample(self, now: float | None = None) -> int:
+        """Collect prices for every due horizon; return samples taken."""
+        now = time.time() if now is None else now
+        taken = 0
+        retry: List[Tuple[float, int, str, str]] = []
+        while self._due and self._due[0][0] <= now:
+            item = heapq.heappop(self._due)
+            due, signal_id, symbol, column = item
+            price = self.price_source(symbol)
+            if price is None:
+                if now - due < self.grace_sec:
+                    retry.append(item)
+                else:
+                    OUTCOMES_MISSED.inc()
+                continue
+            self._pending.append((signal_id, column, price))
+            taken += 1
+        for item in retry:
+            # keep the original due time so the grace period is bounded
+            heapq.heappush(self._due, item)
+        OUTCOMES_PENDING.set(len(self._due))
+        return taken
+
+    def next_due(self) -> Optional[float]:
+        return self._due[0][0] if self._due else None
+
+    def flush(self) -> int:
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, []
+        return save_outcomes(pending, self.db_path)
+
+    async def flush_async(self) -> int:
+        """:meth:`flush` with the SQLite write in a worker thread."""
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, []
+        return await asyncio.to_thread(save_outcomes, pending, self.db_path)
+
+    async def run(self) -> None:
+        try:
+            while True:
+                await asyncio.sleep(self.flush_interval)
+                try:
+                    self.sample()
+                    await self.flush_async()
+                except Exception as exc:  # pragma: no cover - runtime
+                    logger.error("Outcome tracker error: %s", exc)
+        finally:
+            self.sample()
+            await self.flush_async()
@@ -0,0 +1,355 @@
+"""Paper trading of signals against the collector's local order book.
+
+:class:`PaperTrader` subscribes to the signal bus and opens a simulated
+long position per signal:
+
+* ``market`` entries walk the ask levels until ``stake_usdt`` is spent, so
+  the fill price includes the slippage of the visible book;
+* ``limit`` entries rest at ``limit_offset_bps`` below the best ask and fill
+  once the best ask trades down to them, or are cancelled after
+  ``limit_timeout_sec``. A fill only takes the asks at or below the limit
+  price, so it may be partial.
+
+Open positions leave at ``take_profit`` / ``stop_loss`` (fractions of the
+entry price) checked against the best bid, or after ``max_hold_sec``. Exits
+walk the bid levels for the position size.
+
+The collector calls :meth:`PaperTrader.on_book` after every depth diff with
+the already sorted levels. Positions are indexed by symbol, so an update
+costs nothing for symbols without positions and O(1) per open position
+otherwise. Deadlines sit in a heap like :class:`~scanner.outcomes.OutcomeTracker`
+uses, and changed positions are written to ``paper_trades`` in one
+transaction every ``flush_interval``.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .bus import SignalEvent
+from .metrics import PAPER_CLOSED, PAPER_OPEN, PAPER_PNL
+from .microstructure import Level
+from .storage import _DB_PATH, save_paper_trades
+
+
+logger = logging.getLogger(__name__)
+
+LevelsSource = Callable[[str], Optional[Tuple[List[Level], List[Level]]]]
+
+
+def walk_book(levels: Sequence[Level], qty: float | None = None, quote: float | None = None) -> Tuple[float, float]:
+    """Fill against ``levels`` (best first) up to ``qty`` or ``quote`` notional.
+
+    Returns the filled quantity and its quote cost; the fill is partial when
+    the visible levels run out.
+    """
+    filled = cost = 0.0
+    for price, size in levels:
+        if qty is not None:
+            take = min(size, qty - filled)
+        else:
+            take = min(size, (quote - cost) / price)
+        filled += take
+        cost += take * price
+        if (qty is not None and filled >= qty) or (quote is not None and cost >= quote - 1e-12):
+            break
+    return filled, cost
+
+
+@dataclass
+class Position:
+    signal_id: int
+    symbol: str
+    profile: str
+    entry_type: str
+    opened_ts: float
+    status: str = "pending"  # pending -> open -> closed | cancelled
+    limit_price: float = 0.0
+    qty: float = 0.0
+    entry_price: float = 0.0
+    entry_ts: float = 0.0
+    slippage_bps: float = 0.0
+    tp_price: float = 0.0
+    sl_price: float = 0.0
+    last_bid: float = 0.0
+    exit_price: float = 0.0
+    exit_ts: float = 0.0
+    exit_reason: str = ""
+    pnl_usdt: float = 0.0
+    pnl_pct: float = 0.0
+
+    def row(self) -> Dict[str, Any]:
+        return {
+            "signal_id": self.signal_id,
+            "symbol": self.symbol,
+            "profile": self.profile,
+            "status": self.status,
+            "entry_type": self.entry_type,
+            "qty": self.qty,
+            "entry_price": self.entry_price or None,
+            "entry_ts": self.entry_ts or None,
+            "slippage_bps": self.slippage_bps,
+            "exit_price": self.exit_price or None,
+            "exit_ts": self.exit_ts or None,
+            "exit_reason": self.exit_reason or None,
+            "pnl_usdt": self.pnl_usdt,
+            "pnl_pct": self.pnl_pct,
+        }
+
+
+class PaperTrader:
+    """Simulated entries and TP/SL exits for delivered signals."""
+
+    def __init__(
+        self,
+        levels_source: LevelsSource,
+        stake_usdt: float = 100.0,
+        entry: str = "market",
+        limit_offset_bps: float = 10.0,
+        limit_timeout_sec: float = 60.0,
+        take_profit: float = 0.05,
+        stop_loss: float = 0.03,
+        max_hold_sec: float = 3600.0,
+        fee_bps: float = 10.0,
+        auto: bool = True,
+        flush_interval: float = 5.0,
+        db_path: Path | str = _DB_PATH,
+        pin: Callable[[str, float], None] | None = None,
+    ) -> None:
+        if entry not in ("market", "limit"):
+            raise ValueError(f"Unknown paper entry type '{entry}'")
+        self.levels_source = levels_source
+        self.stake_usdt = stake_usdt
+        self.entry = entry
+        self.limit_offset_bps = limit_offset_bps
+        self.limit_timeout_sec = limit_timeout_sec
+        self.take_profit = take_profit
+        self.stop_loss = stop_loss
+        self.max_hold_sec = max_hold_sec
+        self.fee_bps = fee_bps
+        self.auto = auto
+        self.flush_interval = flush_interval
+        self.db_path = db_path
+        self.pin = pin
+        self.positions: Dict[int, Position] = {}
+        self._by_symbol: Dict[str, Dict[int, Position]] = {}
+        self._deadlines: List[Tuple[float, int]] = []
+        self._dirty: Dict[int, Position] = {}
+        # signals seen while ``auto`` is off, for the Buy button
+        self._recent: "OrderedDict[int, SignalEvent]" = OrderedDict()
+        self.realized_pnl = 0.0
+
+    @classmethod
+    def from_config(
+        cls,
+        cfg: Dict[str, Any],
+        levels_source: LevelsSource,
+        stake_usdt: float,
+        pin: Callable[[str, float], None] | None = None,
+    ) -> "PaperTrader":
+        return cls(
+            levels_source,
+            stake_usdt=float(cfg.get("stake_usdt", stake_usdt)),
+            entry=str(cfg.get("entry", "market")),
+            limit_offset_bps=float(cfg.get("limit_offset_bps", 10)),
+            limit_timeout_sec=float(cfg.get("limit_timeout_sec", 60)),
+            take_profit=float(cfg.get("take_profit", 0.05)),
+            stop_loss=float(cfg.get("stop_loss", 0.03)),
+            max_hold_sec=float(cfg.get("max_hold_sec", 3600)),
+            fee_bps=float(cfg.get("fee_bps", 10)),
+            auto=bool(cfg.get("auto", True)),
+            flush_interval=float(cfg.get("flush_interval", 5)),
+            pin=pin,
+        )
+
+    def __call__(self, batch: List[SignalEvent]) -> None:
+        """Bus sink: open a position per signal (or remember it for the Buy button)."""
+        for ev in batch:
+            if self.auto:
+                self.open(ev)
+            else:
+                self._recent[ev.id] = ev
+                while len(self._recent) > 1000:
+                    self._recent.popitem(last=False)
+
+    def buy(self, signal_id: int, now: float | None = None) -> Optional[Position]:
+        """Open a position for a signal on request; ``None`` if it is unknown."""
+        pos = self.positions.get(signal_id)
+        if pos is not None:
+            return pos
+        ev = self._recent.pop(signal_id, None)
+        return self.open(ev, now) if ev is not None else None
+
+    def open(self, ev: SignalEvent, now: float | None = None) -> Optional[Position]:
+        now = time.time() if now is None else now
+        if ev.id in self.positions:
+            return self.positions[ev.id]
+        levels = self.levels_source(ev.fv.symbol)
+        if not levels or not levels[0] or not levels[1]:
+            logger.warning("No book for paper entry on %s", ev.fv.symbol)
+            return None
+        bids, asks = levels
+        pos = Position(ev.id, ev.fv.symbol, ev.profile, self.entry, now, last_bid=bids[0][0])
+        self.positions[pos.signal_id] = pos
+        self._by_symbol.setdefault(pos.symbol, {})[pos.signal_id] = pos
+        if self.entry == "market":
+            if not self._fill_entry(pos, asks, now):
+                return pos
+        else:
+            pos.limit_price = asks[0][0] * (1 - self.limit_offset_bps / 1e4)
+            heapq.heappush(self._deadlines, (now + self.limit_timeout_sec, pos.signal_id))
+            self._dirty[pos.signal_id] = pos
+        if self.pin is not None:
+            self.pin(pos.symbol, self.limit_timeout_sec + self.max_hold_sec)
+        PAPER_OPEN.set(self.open_count)
+        return pos
+
+    @property
+    def open_count(self) -> int:
+        return sum(len(p) for p in self._by_symbol.values())
+
+    def _fill_entry(self, pos: Position, asks: Sequence[Level], now: float, limit: float | None = None) -> bool:
+        if limit is not None:
+            # a limit order only takes the asks at or below its price; the
+            # rest of the stake stays unfilled
+            asks = list(itertools.takewhile(lambda level: level[0] <= limit, asks))
+        qty, cost = walk_book(asks, quote=self.stake_usdt)
+        if qty <= 0:
+            self._finish(pos, "cancelled", "no_liquidity", now)
+            return False
+        price = cost / qty
+        pos.qty = qty
+        pos.entry_price = price
+        pos.entry_ts = now
+        pos.slippage_bps = (price / asks[0][0] - 1) * 1e4
+        pos.tp_price = price * (1 + self.take_profit)
+        pos.sl_price = price * (1 - self.stop_loss)
+        pos.status = "open"
+        heapq.heappush(self._deadlines, (now + self.max_hold_sec, pos.signal_id))
+        self._dirty[pos.signal_id] = pos
+        return True
+
+    def on_book(self, symbol: str, bids: Sequence[Level], asks: Sequence[Level], now: float | None = None) -> None:
+        """Check the symbol's positions against a new top of book."""
+        positions = self._by_symbol.get(symbol)
+        if not positions or not bids or not asks:
+            return
+        now = time.time() if now is None else now
+        best_bid, best_ask = bids[0][0], asks[0][0]
+        for pos in list(positions.values()):
+            pos.last_bid = best_bid
+            if pos.status == "pending":
+                if best_ask <= pos.limit_price:
+                    self._fill_entry(pos, asks, now, pos.limit_price)
+            elif best_bid >= pos.tp_price:
+                self._exit(pos, bids, "take_profit", now)
+            elif best_bid <= pos.sl_price:
+                self._exit(pos, bids, "stop_loss", now)
+
+    def _exit(self, pos: Position, bids: Sequence[Level], reason: str, now: float) -> None:
+        qty, proceeds = walk_book(bids, qty=pos.qty)
+        if qty < pos.qty:
+            # the rest leaves beyond the visible book, at its worst price
+            worst = bids[-1][0] if bids else pos.last_bid
+            proceeds += (pos.qty - qty) * worst
+        fees = (pos.qty * pos.entry_price + proceeds) * self.fee_bps / 1e4
+        pos.exit_price = proceeds / pos.qty
+        pos.pnl_usdt = proceeds - pos.qty * pos.entry_price - fees
+        pos.pnl_pct = pos.pnl_usdt / (pos.qty * pos.entry_price)
+        self.realized_pnl += pos.pnl_usdt
+        PAPER_PNL.set(self.realized_pnl)
+        self._finish(pos, "closed", reason, now)
+
+    def _finish(self, pos: Position, status: str, reason: str, now: float) -> None:
+        pos.status = status
+        pos.exit_reason = reason
+        pos.exit_ts = now
+        positions = self._by_symbol.get(pos.symbol)
+        if positions is not None:
+            positions.pop(pos.signal_id, None)
+            if not positions:
+                del self._by_symbol[pos.symbol]
+        self._dirty[pos.signal_id] = pos
+        PAPER_CLOSED.labels(reason).inc()
+        PAPER_OPEN.set(self.open_count)
+
+    def expire(self, now: float | None = None) -> int:
+        """Cancel stale limit orders and close positions held too long."""
+        now = time.time() if now is None else now
+        done = 0
+        while self._deadlines and self._deadlines[0][0] <= now:
+            _, signal_id = heapq.heappop(self._deadlines)
+            pos = self.positions.get(signal_id)
+            if pos is None:
+                continue
+            if pos.status == "pending":
+                self._finish(pos, "cancelled", "limit_timeout", now)
+            elif pos.status == "open" and pos.entry_ts + self.max_hold_sec <= now:
+                levels = self.levels_source(pos.symbol)
+                bids = levels[0] if levels and levels[0] else [(pos.last_bid, pos.qty)]
+                self._exit(pos, bids, "max_hold", now)
+            else:
+                continue
+            done += 1
+        return done
+
+    def _take_dirty(self) -> Tuple[Dict[int, Position], List[Dict[str, Any]]]:
+        dirty, self._dirty = self._dirty, {}
+        return dirty, [pos.row() for pos in dirty.values()]
+
+    def _written(self, dirty: Dict[int, Position], ok: bool) -> None:
+        if not ok:
+            # keep the changes for the next flush; newer ones win
+            self._dirty = {**dirty, **self._dirty}
+            return
+        for signal_id, pos in dirty.items():
+            if pos.status in ("closed", "cancelled"):
+                self.positions.pop(signal_id, None)
+
+    def flush(self) -> int:
+        """Write changed positions in one transaction and forget closed ones."""
+        if not self._dirty:
+            return 0
+        dirty, rows = self._take_dirty()
+        ok = False
+        try:
+            save_paper_trades(rows, self.db_path)
+            ok = True
+        finally:
+            self._written(dirty, ok)
+        return len(rows)
+
+    async def flush_async(self) -> int:
+        """:meth:`flush` with the SQLite write in a worker thread.
+
+        The rows are captured on the event loop, so book updates during the
+        write only mark positions for the next flush.
+        """
+        if not self._dirty:
+            return 0
+        dirty, rows = self._take_dirty()
+        ok = False
+        try:
+            await asyncio.to_thread(save_paper_trades, rows, self.db_path)
+            ok = True
+        finally:
+            self._written(dirty, ok)
+        return len(rows)
+
+    async def run(self) -> None:
+        try:
+            while True:
+                await asyncio.sleep(self.flush_interval)
+                try:
+                    self.expire()
+                    await self.flush_async()
+                except Exception as exc:  # pragma: no cover - runtime
+                    logger.error("Paper trader error: %s", exc)
+        finally:
+            await self.flush_async()
@@ -0,0 +1,75 @@
+"""Named strategy profiles evaluated against the shared feature stream.
+
+Every profile has its own thresholds, candidate rules, probability
+threshold, model and alert recipients. All profiles read the same
+:class:`~scanner.features.FeatureVector` per tick, so running several
+settings side by side costs one rule check per profile and one prediction
+per distinct model instead of another scanner with its own WebSocket
+connections.
+
+The ``scanner`` section itself is the ``default`` profile. Extra profiles
+live under ``scanner.profiles``::
+
+    profiles:
+      aggressive:
+        prob_threshold: 0.5
+        metrics: {vsr: 3}          # merged over scanner.metrics
+        rules: {default: "vsr > 3 and pm > 0.01"}
+        model: models/alt.json     # defaults to the shared model
+        chat_ids: [12345]          # defaults to telegram.allowed_ids
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional
+
+from .model import Model, load_model
+from .ruleset import RuleSet
+
+DEFAULT = "default"
+
+
+@dataclass
+class Profile:
+    name: str
+    thresholds: Dict[str, Any]
+    prob_threshold: float
+    rules: RuleSet
+    model: Model
+    chat_ids: Optional[List[int]] = None
+
+    @property
+    def settings(self) -> Dict[str, Any]:
+        """Thresholds stored with each signal of this profile."""
+        return {**self.thresholds, "prob_threshold": self.prob_threshold}
+
+
+def load_profiles(scanner_cfg: Mapping[str, Any], thresholds: Mapping[str, Any], model: Model) -> List[Profile]:
+    """Build the default profile and those under ``scanner.profiles``.
+
+    Raises :class:`~scanner.ruleset.RuleError` for an invalid rule.
+    """
+    profiles = [
+        Profile(
+            DEFAULT,
+            dict(thresholds),
+            float(scanner_cfg.get("prob_threshold", 0.5)),
+            RuleSet.from_config(scanner_cfg, thresholds),
+            model,
+        )
+    ]
+    for name, spec in (scanner_cfg.get("profiles") or {}).items():
+        if name == DEFAULT:
+            raise ValueError(f"profile name '{DEFAULT}' is reserved for the scanner section")
+        spec = spec or {}
+        merged = {**thresholds, **(spec.get("metrics") or {})}
+        profiles.append(
+            Profile(
+                name,
+                merged,
+                float(spec.get("prob_threshold", profiles[0].prob_threshold)),
+                RuleSet.from_config(spec, merged),
+                load_model(spec["model"]) if spec.get("model") else model,
+                [int(c) for c in spec["chat_ids"]] if spec.get("chat_ids") else None,
+            )
+        )
+    return profiles
@@ -0,0 +1,114 @@
+"""Universe-wide market state shared by every symbol's features.
+
+:class:`MarketState` keeps the latest VSR, PM and 5m momentum of every
+symbol in flat NumPy arrays. Storing a feature vector is O(1); once per
+``interval`` the whole universe is reduced in one vectorised pass to
+:class:`MarketStats` (median VSR, breadth of positive PM and the BTC/ETH
+5m returns). Each feature vector is then annotated with the market values
+and its VSR relative to the market, so a market-wide move shows up as a
+high ``market_breadth`` and a low ``vsr_rel`` instead of many isolated
+pumps.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict
+
+import numpy as np
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from .features import FeatureVector
+
+
+@dataclass
+class MarketStats:
+    median_vsr: float = 0.0
+    breadth: float = 0.0
+    btc_ret_5m: float = 0.0
+    eth_ret_5m: float = 0.0
+    symbols: int = 0
+    ts: float = 0.0
+
+
+class MarketState:
+    """Latest per-symbol features and their once-per-interval reductions."""
+
+    def __init__(
+        self,
+        btc: str = "BTCUSDT",
+        eth: str = "ETHUSDT",
+        interval: float = 1.0,
+        stale_sec: float = 10.0,
+        capacity: int = 256,
+    ) -> None:
+        self.btc = btc
+        self.eth = eth
+        self.interval = interval
+        self.stale_sec = stale_sec
+        self._index: Dict[str, int] = {}
+        self._vsr = np.zeros(capacity)
+        self._pm = np.zeros(capacity)
+        self._mom = np.zeros(capacity)
+        self._ts = np.full(capacity, -np.inf)
+        self._ready = np.zeros(capacity, dtype=bool)
+        self.stats = MarketStats()
+        self.refreshes = 0
+
+    @property
+    def reference(self) -> tuple[str, str]:
+        return self.btc, self.eth
+
+    def _slot(self, symbol: str) -> int:
+        idx = self._index.get(symbol)
+        if idx is None:
+            idx = self._index[symbol] = len(self._index)
+            if idx >= len(self._vsr):
+                grow = len(self._vsr)
+                self._vsr = np.concatenate([self._vsr, np.zeros(grow)])
+                self._pm = np.concatenate([self._pm, np.zeros(grow)])
+                self._mom = np.concatenate([self._mom, np.zeros(grow)])
+                self._ts = np.concatenate([self._ts, np.full(grow, -np.inf)])
+                self._ready = np.concatenate([self._ready, np.zeros(grow, dtype=bool)])
+        return idx
+
+    def observe(self, fv: "FeatureVector", now: float | None = None) -> None:
+        """Store ``fv`` and annotate it with the current market state."""
+        now = time.time() if now is None else now
+        i = self._slot(fv.symbol)
+        self._vsr[i] = fv.vsr
+        self._pm[i] = fv.pm
+        self._mom[i] = fv.mom_5m
+        self._ts[i] = now
+        self._ready[i] = fv.ready
+        if now - self.stats.ts >= self.interval:
+            self.refresh(now)
+        self.annotate(fv)
+
+    def refresh(self, now: float) -> MarketStats:
+        """Reduce all fresh symbols into :attr:`stats` (one pass)."""
+        n = len(self._index)
+        live = self._ts[:n] >= now - self.stale_sec
+        ready = live & self._ready[:n]
+        count = int(ready.sum())
+        self.stats = MarketStats(
+            median_vsr=float(np.median(self._vsr[:n][ready])) if count else 0.0,
+            breadth=float((self._pm[:n][ready] > 0).mean()) if count else 0.0,
+            btc_ret_5m=self._reference_return(self.btc, live),
+            eth_ret_5m=self._reference_return(self.eth, live),
+            symbols=count,
+            ts=now,
+        )
+        self.refreshes += 1
+        return self.stats
+
+    def _reference_return(self, symbol: str, live: np.ndarray) -> float:
+        idx = self._index.get(symbol)
+        return float(self._mom[idx]) if idx is not None and live[idx] else 0.0
+
+    def annotate(self, fv: "FeatureVector") -> None:
+        s = self.stats
+        fv.market_vsr = s.median_vsr
+        fv.vsr_rel = fv.vsr / s.median_vsr if s.median_vsr > 0 else 0.0
+        fv.market_breadth = s.breadth
+        fv.btc_ret_5m = s.btc_ret_5m
+        fv.eth_ret_5m = s.eth_ret_5m
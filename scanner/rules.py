@@ -1,15 +1,14 @@
 from typing import Dict
 from .features import FeatureVector
+from .ruleset import rule_from_thresholds
 from config import get_thresholds
 
 
 def is_candidate(fv: FeatureVector, cfg: Dict | None = None) -> bool:
-    """Check if a feature vector passes metric thresholds."""
-    cfg = cfg or get_thresholds()
-    return (
-        fv.vsr > cfg.get("vsr", 0)
-        and fv.pm > cfg.get("pm", 0)
-        and fv.obi > cfg.get("obi", 0)
-        and fv.spread < cfg.get("spread", float("inf"))
-        and fv.listing_age > cfg.get("listing_age_min", 0)
-    )
+    """Check if a feature vector passes metric thresholds.
+
+    The clauses come from :data:`scanner.ruleset.THRESHOLD_RULES`;
+    ``vsr_rel`` and ``max_breadth`` compare against the market regime and
+    only apply when configured.
+    """
+    return rule_from_thresholds(cfg or get_thresholds())(fv)
@@ -0,0 +1,209 @@
+"""Candidate rules written as expressions in the config.
+
+A rule is a boolean expression over :class:`~scanner.features.FeatureVector`
+fields, for example ``vsr > 3 and (pm > 0.02 or imbalance_5bp > 0.3)``.
+It is parsed once with :mod:`ast` (only ``and``/``or``/``not``, comparisons,
+feature names and numbers are accepted) and compiled into nested NumPy
+predicates. The same compiled rule evaluates a whole feature matrix in one
+vectorised pass or a single feature vector, and :meth:`Rule.explain`
+lists the clauses a vector failed.
+
+``scanner.rules`` in ``config.yaml`` holds a ``default`` rule and optional
+``classes``; each class has a ``rule`` and the ``symbols`` (fnmatch
+patterns) it applies to. Without ``scanner.rules`` the default rule is
+built from the ``scanner.metrics`` thresholds with :func:`rule_from_thresholds`.
+
+The scanner evaluates each profile's :class:`RuleSet` once per batch of
+ticks over the batch's feature columns.
+"""
+
+import ast
+import operator
+from dataclasses import fields
+from fnmatch import fnmatchcase
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .features import FeatureVector
+
+FEATURES = frozenset(f.name for f in fields(FeatureVector) if f.name != "symbol")
+
+_COMPARE = {
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+}
+
+Columns = Mapping[str, Any]
+Predicate = Callable[[Columns], Any]
+
+# threshold key -> (feature, comparison, default); the single table behind
+# ``rules.is_candidate``, the live rules and backtest masks. Keys without a
+# default only apply when configured.
+THRESHOLD_RULES: Dict[str, Tuple[str, str, Optional[float]]] = {
+    "vsr": ("vsr", ">", 0.0),
+    "pm": ("pm", ">", 0.0),
+    "obi": ("obi", ">", 0.0),
+    "spread": ("spread", "<", None),
+    "listing_age_min": ("listing_age", ">", 0.0),
+    "vsr_rel": ("vsr_rel", ">", None),
+    "max_breadth": ("market_breadth", "<", None),
+}
+
+
+class RuleError(ValueError):
+    """Raised for rule expressions that cannot be compiled."""
+
+
+class Rule:
+    """A compiled rule expression."""
+
+    def __init__(self, source: str) -> None:
+        self.source = source.strip()
+        try:
+            tree = ast.parse(self.source, mode="eval")
+        except SyntaxError as exc:
+            raise RuleError(f"invalid rule {source!r}: {exc.msg}") from None
+        self.features: set[str] = set()
+        self._root = tree.body
+        self._fn = self._compile(tree.body)
+
+    def _compile(self, node: ast.AST) -> Predicate:
+        if isinstance(node, ast.BoolOp):
+            parts = [self._compile(v) for v in node.values]
+            combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+            return lambda cols: combine.reduce([p(cols) for p in parts])
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            inner = self._compile(node.operand)
+            return lambda cols: np.logical_not(inner(cols))
+        if isinstance(node, ast.Compare):
+            operands = [self._value(v) for v in (node.left, *node.comparators)]
+            ops = []
+            for op in node.ops:
+                if type(op) not in _COMPARE:
+                    raise RuleError(f"unsupported comparison in {self.source!r}")
+                ops.append(_COMPARE[type(op)])
+            if len(ops) == 1:
+                left, right = operands
+                op = ops[0]
+                return lambda cols: op(left(cols), right(cols))
+            steps = list(zip(ops, operands, operands[1:]))
+            return lambda cols: np.logical_and.reduce([op(a(cols), b(cols)) for op, a, b in steps])
+        raise RuleError(f"unsupported expression {ast.unparse(node)!r} in {self.source!r}")
+
+    def _value(self, node: ast.AST) -> Callable[[Columns], Any]:
+        if isinstance(node, ast.Name):
+            if node.id not in FEATURES:
+                raise RuleError(f"unknown feature {node.id!r} in {self.source!r}")
+            self.features.add(node.id)
+            name = node.id
+            return lambda cols: cols[name]
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+            inner = self._value(node.operand)
+            return lambda cols: -inner(cols)
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+            value = float(node.value)
+            return lambda cols: value
+        raise RuleError(f"expected a feature or number, got {ast.unparse(node)!r} in {self.source!r}")
+
+    def mask(self, cols: Columns) -> np.ndarray:
+        """Evaluate over feature columns (name -> array) in one pass."""
+        return np.asarray(self._fn(cols), dtype=bool)
+
+    def __call__(self, fv: FeatureVector) -> bool:
+        return bool(self._fn(_fv_columns(fv)))
+
+    def explain(self, fv: FeatureVector) -> List[str]:
+        """Clauses ``fv`` fails; an ``or`` is reported as a whole."""
+        cols = _fv_columns(fv)
+        failed: List[str] = []
+
+        def walk(node: ast.AST) -> None:
+            if isinstance(node, ast.BoolOp) and isinstance(node.op, ast.And):
+                for v in node.values:
+                    walk(v)
+            elif not bool(self._compile(node)(cols)):
+                failed.append(ast.unparse(node))
+
+        walk(self._root)
+        return failed
+
+    def __repr__(self) -> str:
+        return f"Rule({self.source!r})"
+
+
+def _fv_columns(fv: FeatureVector) -> Dict[str, Any]:
+    return fv.__dict__
+
+
+def rule_from_thresholds(thresholds: Mapping[str, Any]) -> Rule:
+    """Rule of the :data:`THRESHOLD_RULES` clauses for ``thresholds``."""
+    clauses = []
+    for key, (feature, op, default) in THRESHOLD_RULES.items():
+        value = thresholds.get(key, default)
+        if value is not None:
+            clauses.append(f"{feature} {op} {float(value)!r}")
+    return _compiled(" and ".join(clauses))
+
+
+@lru_cache(maxsize=256)
+def _compiled(source: str) -> Rule:
+    return Rule(source)
+
+
+class RuleSet:
+    """Default rule plus per-symbol-class overrides."""
+
+    def __init__(self, default: Rule, classes: Sequence[Tuple[str, Rule, Sequence[str]]] = ()) -> None:
+        self.default = default
+        self.classes = list(classes)
+        self._class_of: Dict[str, Rule] = {}
+
+    @classmethod
+    def from_config(cls, scanner_cfg: Mapping[str, Any], thresholds: Mapping[str, Any]) -> "RuleSet":
+        rules_cfg = scanner_cfg.get("rules") or {}
+        default_src = rules_cfg.get("default")
+        default = Rule(default_src) if default_src else rule_from_thresholds(thresholds)
+        classes = [
+            (name, Rule(spec["rule"]), list(spec.get("symbols", [])))
+            for name, spec in (rules_cfg.get("classes") or {}).items()
+        ]
+        return cls(default, classes)
+
+    @property
+    def features(self) -> set[str]:
+        """Features read by the default and class rules."""
+        return self.default.features.union(*(rule.features for _, rule, _ in self.classes))
+
+    def rule_for(self, symbol: str) -> Rule:
+        rule = self._class_of.get(symbol)
+        if rule is None:
+            rule = self.default
+            for _, cls_rule, patterns in self.classes:
+                if any(fnmatchcase(symbol, p) for p in patterns):
+                    rule = cls_rule
+                    break
+            self._class_of[symbol] = rule
+        return rule
+
+    def check(self, fv: FeatureVector) -> bool:
+        return self.rule_for(fv.symbol)(fv)
+
+    def explain(self, fv: FeatureVector) -> List[str]:
+        return self.rule_for(fv.symbol).explain(fv)
+
+    def mask(self, cols: Columns, symbols: Sequence[str]) -> np.ndarray:
+        """Evaluate every row with the rule of its symbol's class."""
+        out = self.default.mask(cols)
+        if self.classes:
+            rules = [self.rule_for(s) for s in symbols]
+            for _, cls_rule, _ in self.classes:
+                rows = np.fromiter((r is cls_rule for r in rules), bool, len(rules))
+                if rows.any():
+                    out = np.where(rows, cls_rule.mask(cols), out)
+        return np.broadcast_to(out, (len(symbols),)).copy()
@@ -2,12 +2,23 @@ from typing import AsyncIterator, Dict, Any
 import asyncio
 import logging
 import contextlib
+import time
+import numpy as np
 from .collector import MexcWSClient
-from .features import FeatureEngine, FeatureVector
-from .rules import is_candidate
-from .model import load_model
-from .volume_scout import VolumeScout
+from .features import WARMUP_SEC, FeatureEngine, FeatureVector
+from .profiles import DEFAULT, Profile, load_profiles
+from .model import feature_matrix, load_model
+from .volume_scout import VolumeScout, AdaptivePollScheduler
 from .sub_manager import SubscriptionManager
+from .universe import UniverseScanner
+from .symbols import SymbolCache
+from .outcomes import OutcomeTracker
+from .paper import PaperTrader
+from .regime import MarketState
+from .backtest import FeatureRecorder
+from .bus import EventBus, SignalEvent
+from .sinks import OutcomeSink, StorageSink, metrics_sink
+from .storage import reserve_signal_ids
 import config
 
 
@@ -17,12 +28,40 @@ logger = logging.getLogger(__name__)
 class Scanner:
     """Realtime pump scanner using config-driven thresholds."""
 
-    def __init__(self, symbols: list[str]) -> None:
-        self.config = config.load_config()
-        self.symbols = list(symbols)
-        self.client = MexcWSClient(self.symbols, self.config['mexc']['ws_url'])
-        self.engine = FeatureEngine()
+    # signal ids reserved per database round-trip
+    ID_BLOCK = 100
+
+    def __init__(self, symbols: list[str], cfg: Dict[str, Any] | None = None) -> None:
+        self.config = cfg if cfg is not None else config.load_config()
+        regime_cfg = self.config.get('regime', {})
+        self.market: MarketState | None = None
+        if regime_cfg.get('enabled'):
+            self.market = MarketState(
+                btc=regime_cfg.get('btc', 'BTCUSDT'),
+                eth=regime_cfg.get('eth', 'ETHUSDT'),
+                interval=float(regime_cfg.get('interval', 1)),
+                stale_sec=float(regime_cfg.get('stale_sec', 10)),
+            )
+            # the reference pairs are always streamed
+            symbols = [*symbols, *self.market.reference]
+        self.symbols = list(dict.fromkeys(symbols))
+        trades_cfg = self.config.get('trades', {})
+        if trades_cfg.get('enabled'):
+            self.client = MexcWSClient(
+                self.symbols,
+                self.config['mexc']['ws_url'],
+                trades=True,
+                large_trade_usd=float(trades_cfg.get('large_trade_usd', 10000)),
+            )
+        else:
+            self.client = MexcWSClient(self.symbols, self.config['mexc']['ws_url'])
+        symbols_cfg = self.config.get('symbols', {})
+        self.symbol_cache: SymbolCache | None = None
+        if symbols_cfg.get('enabled'):
+            self.symbol_cache = SymbolCache.from_config(symbols_cfg)
+        self.engine = FeatureEngine(self.symbol_cache)
         self.model = load_model()
+        self.profiles: list[Profile] = load_profiles(self.config.get('scanner', {}), self.thresholds, self.model)
         scout_cfg = self.config.get('scout', {})
         self.scout = VolumeScout(self.config['mexc'].get('rest_url', ''), scout_cfg)
         sub_cfg = self.config.get('subscriptions', {})
@@ -31,53 +70,255 @@ class Scanner:
             sub_cfg.get('top_n', 200),
             sub_cfg.get('lru_ttl_sec', 900),
         )
+        if self.market is not None:
+            for symbol in self.market.reference:
+                self.sub_manager.pin(symbol, float('inf'))
         self.poll_interval = float(sub_cfg.get('poll_interval', 60))
+        self.sub_manager.remove_listeners.append(self._forget)
+        self.scheduler = AdaptivePollScheduler(sub_cfg.get('adaptive', {}), self.poll_interval)
+        if self.symbol_cache is not None:
+            self.symbol_cache.acquire = self.scheduler.acquire
         self._poll_task: asyncio.Task | None = None
+        self.ticks_processed = 0
+        # newest feature vector per symbol, for snapshot queries
+        self.latest: Dict[str, FeatureVector] = {}
+        universe_cfg = self.config.get('universe', {})
+        self.universe: UniverseScanner | None = None
+        if universe_cfg.get('enabled'):
+            self.universe = UniverseScanner(self.config['mexc'].get('rest_url', ''), universe_cfg)
+        self._universe_task: asyncio.Task | None = None
+        self._symbols_task: asyncio.Task | None = None
+        outcomes_cfg = self.config.get('outcomes', {})
+        self.outcomes: OutcomeTracker | None = None
+        if outcomes_cfg.get('enabled'):
+            self.outcomes = OutcomeTracker(
+                self.client.get_mid,
+                flush_interval=float(outcomes_cfg.get('flush_interval', 5)),
+                grace_sec=float(outcomes_cfg.get('grace_sec', 30)),
+            )
+        self._outcomes_task: asyncio.Task | None = None
+        recorder_cfg = self.config.get('recorder', {})
+        self.recorder: FeatureRecorder | None = None
+        if recorder_cfg.get('enabled'):
+            self.recorder = FeatureRecorder(
+                recorder_cfg.get('path', 'data/features'),
+                flush_rows=int(recorder_cfg.get('flush_rows', 10000)),
+            )
+        self.bus = EventBus(self.config.get('bus', {}))
+        self.bus.subscribe('storage', StorageSink(), queue_size=10000)
+        self.bus.subscribe('metrics', metrics_sink)
+        if self.outcomes is not None:
+            self.bus.subscribe('outcomes', OutcomeSink(self.outcomes, self.sub_manager.pin))
+        paper_cfg = self.config.get('paper', {})
+        self.paper: PaperTrader | None = None
+        if paper_cfg.get('enabled'):
+            self.paper = PaperTrader.from_config(
+                paper_cfg,
+                self.client.get_levels,
+                float(self.config['scanner'].get('stake_usdt') or 100),
+                pin=self.sub_manager.pin,
+            )
+            self.client.book_listeners.append(self.paper.on_book)
+            self.bus.subscribe('paper', self.paper)
+        self._paper_task: asyncio.Task | None = None
+        # reserved, not yet used signal ids: [_next_id, _id_end)
+        self._next_id = 0
+        self._id_end = 0
+
+    def _forget(self, symbols: list[str]) -> None:
+        """Drop the snapshots and feature state of unsubscribed symbols."""
+        for symbol in symbols:
+            self.latest.pop(symbol, None)
+            self.engine.forget(symbol)
 
     @property
     def thresholds(self) -> Dict[str, Any]:
-        return config.get_thresholds()
+        return self.config.get('scanner', {}).get('metrics', {})
 
     async def _poll_loop(self) -> None:
         while True:
+            delay = self.scheduler.interval
             try:
                 stats = await self.scout.poll()
                 symbols = [s.symbol for s in stats]
                 await self.sub_manager.ensure_subscribed(symbols)
+                delay = self.scheduler.next_interval(stats, getattr(self.scout, 'request_count', 0))
             except asyncio.CancelledError:
                 break
             except Exception as exc:  # pragma: no cover - runtime
                 logger.error("Volume scout error: %s", exc)
-            await asyncio.sleep(self.poll_interval)
+            await asyncio.sleep(delay)
+
+    async def _universe_loop(self) -> None:
+        while True:
+            try:
+                await self.scheduler.acquire(float(self.universe.cfg.get('weight_per_poll', 40)))
+                promoted = await self.universe.poll()
+                if promoted:
+                    # keep them through the feature warm-up despite scout polls
+                    pin_sec = float(self.universe.cfg.get('pin_sec', WARMUP_SEC))
+                    for symbol in promoted:
+                        self.sub_manager.pin(symbol, pin_sec)
+                    await self.sub_manager.ensure_subscribed(promoted)
+            except asyncio.CancelledError:
+                break
+            except Exception as exc:  # pragma: no cover - runtime
+                logger.error("Universe scan error: %s", exc)
+            await asyncio.sleep(float(self.universe.cfg.get('poll_interval', 5)))
+
+    def evaluate(self, fv: FeatureVector) -> list[tuple[Profile, float]]:
+        """Profiles ``fv`` signals for, with their probabilities."""
+        return self.evaluate_batch([fv])[0]
+
+    def evaluate_batch(self, fvs: list[FeatureVector]) -> list[list[tuple[Profile, float]]]:
+        """Profile hits for each of ``fvs``.
 
-    async def run(self) -> AsyncIterator[tuple[FeatureVector, float, float]]:
+        Every profile's rules run once over the batch's feature columns, and
+        each distinct model predicts once for the rows any of its profiles
+        passed.
+        """
+        hits: list[list[tuple[Profile, float]]] = [[] for _ in fvs]
+        if not fvs or not self.profiles:
+            return hits
+        names = sorted(set().union(*(p.rules.features for p in self.profiles)))
+        matrix = feature_matrix(fvs, names)
+        cols = {name: matrix[:, i] for i, name in enumerate(names)}
+        symbols = [fv.symbol for fv in fvs]
+        passed = [profile.rules.mask(cols, symbols) for profile in self.profiles]
+        if logger.isEnabledFor(logging.DEBUG):
+            for profile, mask in zip(self.profiles, passed):
+                for fv in (fv for fv, ok in zip(fvs, mask) if not ok):
+                    logger.debug(
+                        "%s rejected by %s: %s", fv.symbol, profile.name, "; ".join(profile.rules.explain(fv))
+                    )
+        probs: Dict[int, np.ndarray] = {}
+        for profile, mask in zip(self.profiles, passed):
+            key = id(profile.model)
+            if key in probs:
+                continue
+            rows = np.zeros(len(fvs), dtype=bool)
+            for other, other_mask in zip(self.profiles, passed):
+                if other.model is profile.model:
+                    rows |= other_mask
+            prob = np.zeros(len(fvs))
+            if rows.any():
+                idx = np.flatnonzero(rows)
+                model = profile.model
+                prob[idx] = model.predict_batch(feature_matrix([fvs[i] for i in idx], model.feature_names))
+            probs[key] = prob
+        for profile, mask in zip(self.profiles, passed):
+            prob = probs[id(profile.model)]
+            for i in np.flatnonzero(mask & (prob >= profile.prob_threshold)):
+                hits[i].append((profile, float(prob[i])))
+        return hits
+
+    async def run(self) -> AsyncIterator[tuple[FeatureVector, float, float, str]]:
         logger.info("Scanner starting with %d symbols", len(self.symbols))
         await self.client.connect()
         self._poll_task = asyncio.create_task(self._poll_loop())
+        if self.universe is not None:
+            self._universe_task = asyncio.create_task(self._universe_loop())
+        if self.symbol_cache is not None:
+            self._symbols_task = asyncio.create_task(
+                self.symbol_cache.run_refresh(self.config['mexc'].get('rest_url', ''))
+            )
+        if self.outcomes is not None:
+            self._outcomes_task = asyncio.create_task(self.outcomes.run())
+        if self.paper is not None:
+            self._paper_task = asyncio.create_task(self.paper.run())
         try:
-            async for tick in self.client.yield_ticks():
-                start_ts = tick.ts
-                fv = self.engine.update(tick, self.client)
-                if not fv.ready:
-                    continue
-                if not is_candidate(fv, self.thresholds):
+            async for batch in self.client.yield_batches():
+                ready = []
+                for tick in batch:
+                    self.ticks_processed += 1
+                    fv = self.engine.update(tick, self.client)
+                    if self.market is not None:
+                        self.market.observe(fv)
+                    self.latest[fv.symbol] = fv
+                    if not fv.ready:
+                        continue
+                    if self.recorder is not None:
+                        self.recorder.append(fv, self.client.get_mid(fv.symbol))
+                    ready.append((fv, tick.ts))
+                if not ready:
                     continue
-                prob = self.model.predict_proba(fv)
-                if prob >= self.config['scanner']['prob_threshold']:
-                    logger.info(
-                        "Signal %s prob %.2f", fv.symbol, prob
-                    )
-                    yield fv, prob, start_ts
+                for (fv, start_ts), hits in zip(ready, self.evaluate_batch([fv for fv, _ in ready])):
+                    if hits:
+                        self.sub_manager.pin(fv.symbol)
+                    for profile, prob in hits:
+                        logger.info(
+                            "Signal %s [%s] prob %.2f", fv.symbol, profile.name, prob
+                        )
+                        yield fv, prob, start_ts, profile.name
         finally:
-            if self._poll_task:
-                self._poll_task.cancel()
-                with contextlib.suppress(Exception, asyncio.CancelledError):
-                    await self._poll_task
+            if self.recorder is not None:
+                self.recorder.flush()
+            for task in (self._poll_task, self._universe_task, self._symbols_task, self._outcomes_task, self._paper_task):
+                if task:
+                    task.cancel()
+                    with contextlib.suppress(Exception, asyncio.CancelledError):
+                        await task
+
+    def profile(self, name: str) -> Profile:
+        for profile in self.profiles:
+            if profile.name == name:
+                return profile
+        raise KeyError(name)
+
+    def signal_event(
+        self, signal_id: int, fv: FeatureVector, prob: float, start_ts: float, profile: str = DEFAULT
+    ) -> SignalEvent:
+        """Capture a delivered signal under its reserved id for the sinks."""
+        prof = self.profile(profile)
+        return SignalEvent(
+            signal_id,
+            fv,
+            prob,
+            start_ts,
+            prof.name,
+            time.time(),
+            price=self.client.get_mid(fv.symbol),
+            config_hash=config.config_hash(self.config),
+            model_version=getattr(prof.model, 'version', None),
+            thresholds=prof.settings,
+        )
+
+    async def publish(self, batch: list[tuple[FeatureVector, float, float, str]]) -> list[SignalEvent]:
+        """Turn a batch of signals into events and publish them on the bus."""
+        if not batch:
+            return []
+        if self._id_end - self._next_id < len(batch):
+            count = max(self.ID_BLOCK, len(batch))
+            self._next_id = await asyncio.to_thread(reserve_signal_ids, count)
+            self._id_end = self._next_id + count
+        first = self._next_id
+        self._next_id += len(batch)
+        events = [self.signal_event(first + i, *sig) for i, sig in enumerate(batch)]
+        await self.bus.publish(events)
+        return events
+
+    def reload_profiles(self) -> None:
+        """Rebuild the profiles; the old ones stay if the config is invalid."""
+        self.profiles = load_profiles(self.config.get('scanner', {}), self.thresholds, self.model)
 
     def reload_thresholds(self) -> None:
-        config.reload_config()
-        self.config = config.load_config()
+        """Re-read the config file and apply it.
+
+        The new profiles are built before anything is replaced, so an
+        invalid file leaves both the global config and the scanner as they
+        were.
+        """
+        cfg = config.read_config()
+        scanner_cfg = cfg.get('scanner', {})
+        profiles = load_profiles(scanner_cfg, scanner_cfg.get('metrics', {}), self.model)
+        config.set_config(cfg)
+        self.config = cfg
+        self.profiles = profiles
         scout_cfg = self.config.get('scout', {})
         self.scout.cfg = scout_cfg
         sub_cfg = self.config.get('subscriptions', {})
         self.poll_interval = float(sub_cfg.get('poll_interval', 60))
+        self.scheduler.cfg = sub_cfg.get('adaptive', {})
+        self.scheduler.base_interval = self.poll_interval
+        if self.universe is not None:
+            self.universe.cfg = self.config.get('universe', {})
@@ -0,0 +1,338 @@
+"""Headless scanner with a local streaming and query API.
+
+``python -m scanner.service [SYMBOL ...]`` runs :class:`~scanner.scanner.Scanner`
+without Telegram. Signals still go through the alert suppressor and the
+storage, metrics and outcome sinks, and :class:`ScannerService` serves them
+together with the live features over aiohttp:
+
+* ``GET /ws`` – WebSocket stream of ``{"type": "signal" | "features", ...}``
+  messages; ``?features=0`` subscribes to signals only;
+* ``GET /events`` – the same stream as Server-Sent Events;
+* ``GET /features/{symbol}`` – newest feature vector of a symbol;
+* ``GET /top?n=10&by=vsr`` – ready symbols ranked by a feature;
+* ``GET /signals?limit=50`` – most recent signals;
+* ``GET /health`` – symbol, tick and client counts.
+
+Queries read the feature vectors the scanner already keeps in memory.
+Feature updates are pushed once per ``stream_interval`` for the symbols
+that changed since the previous push. Every client has its own bounded
+queue on an :class:`~scanner.bus.EventBus`, so a slow client loses its
+oldest messages instead of holding up the scanner or other clients.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import heapq
+import json
+import logging
+import math
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from aiohttp import web
+
+from config import load_config
+from .bus import EventBus, SignalEvent, Subscriber
+from .features import FeatureVector
+from .logging_setup import setup_logging
+from .metrics import start_metrics_server
+from .ruleset import FEATURES
+from .scanner import Scanner
+from .suppress import SignalSuppressor
+from .symbols import select_pairs
+
+
+logger = logging.getLogger(__name__)
+
+# (message type, serialised JSON)
+Message = Tuple[str, str]
+
+
+def feature_dict(fv: FeatureVector) -> Dict[str, Any]:
+    """JSON-safe feature values; non-finite numbers become ``None``."""
+    return {
+        k: None if isinstance(v, float) and not math.isfinite(v) else v
+        for k, v in fv.__dict__.items()
+    }
+
+
+def signal_dict(ev: SignalEvent) -> Dict[str, Any]:
+    return {
+        "id": ev.id,
+        "symbol": ev.fv.symbol,
+        "profile": ev.profile,
+        "prob": ev.prob,
+        "price": ev.price,
+        "ts": ev.ts,
+        "features": feature_dict(ev.fv),
+    }
+
+
+def _features_message(vectors: List[FeatureVector]) -> str:
+    return json.dumps({"type": "features", "data": [feature_dict(fv) for fv in vectors]})
+
+
+class ScannerService:
+    """Local HTTP, WebSocket and SSE front end for a running scanner."""
+
+    def __init__(
+        self,
+        scanner: Scanner,
+        host: str = "127.0.0.1",
+        port: int = 8081,
+        stream_interval: float = 1.0,
+        client_queue: int = 100,
+        signal_history: int = 100,
+    ) -> None:
+        self.scanner = scanner
+        self.host = host
+        self.port = port
+        self.stream_interval = stream_interval
+        self.signals: Deque[Dict[str, Any]] = deque(maxlen=signal_history)
+        self.stream = EventBus({"queue_size": client_queue, "policy": "drop_oldest"})
+        self._sent: Dict[str, FeatureVector] = {}
+        self._runner: Optional[web.AppRunner] = None
+        self._tasks: List[asyncio.Task] = []
+        self._sse_closed: Set[asyncio.Event] = set()
+        scanner.bus.subscribe("service", self._on_signals)
+
+    @classmethod
+    def from_config(cls, scanner: Scanner, cfg: Dict[str, Any]) -> "ScannerService":
+        return cls(
+            scanner,
+            host=str(cfg.get("host", "127.0.0.1")),
+            port=int(cfg.get("port", 8081)),
+            stream_interval=float(cfg.get("stream_interval", 1)),
+            client_queue=int(cfg.get("client_queue", 100)),
+            signal_history=int(cfg.get("signal_history", 100)),
+        )
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def clients(self) -> int:
+        return len(self.stream.subscribers)
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/ws", self._ws_handler)
+        app.router.add_get("/events", self._sse_handler)
+        app.router.add_get("/features/{symbol}", self._features)
+        app.router.add_get("/top", self._top)
+        app.router.add_get("/signals", self._signals)
+        app.router.add_get("/health", self._health)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        self._tasks.append(asyncio.create_task(self._push_features()))
+        logger.info("Scanner service on %s", self.url)
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        for closed in self._sse_closed:
+            closed.set()
+        for sub in list(self.stream.subscribers):
+            await self.stream.unsubscribe(sub)
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def __aenter__(self) -> "ScannerService":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.stop()
+
+    async def run(self, suppressor: SignalSuppressor) -> None:
+        """Serve the API while publishing the scanner's suppressed signals."""
+        await self.start()
+        self.scanner.bus.start()
+        try:
+            async for batch in suppressor.batches(self.scanner.run()):
+                await self.scanner.publish(batch)
+        finally:
+            await self.scanner.bus.stop()
+            await self.stop()
+
+    async def _on_signals(self, batch: List[SignalEvent]) -> None:
+        for ev in batch:
+            data = signal_dict(ev)
+            self.signals.append(data)
+            if self.stream.subscribers:
+                await self.stream.publish(("signal", json.dumps({"type": "signal", **data})))
+
+    def changed_features(self) -> List[FeatureVector]:
+        """Ready feature vectors replaced since the previous call."""
+        changed = [
+            fv for symbol, fv in self.scanner.latest.items() if fv.ready and self._sent.get(symbol) is not fv
+        ]
+        for fv in changed:
+            self._sent[fv.symbol] = fv
+        if len(self._sent) > len(self.scanner.latest):
+            # the scanner forgot unsubscribed symbols
+            for symbol in self._sent.keys() - self.scanner.latest.keys():
+                del self._sent[symbol]
+        return changed
+
+    async def _push_features(self) -> None:
+        while True:
+            await asyncio.sleep(self.stream_interval)
+            if not self.stream.subscribers:
+                continue
+            changed = self.changed_features()
+            if changed:
+                await self.stream.publish(("features", _features_message(changed)))
+
+    async def _subscribe(
+        self, name: str, send: Callable[[str, str], Awaitable[None]], request: web.Request
+    ) -> Subscriber:
+        """Add a client; it starts with a snapshot of every ready symbol."""
+        with_features = request.query.get("features", "1") not in ("0", "false")
+        # flush pending changes so the snapshot below is the new client's baseline
+        changed = self.changed_features()
+        if changed and self.stream.subscribers:
+            await self.stream.publish(("features", _features_message(changed)))
+
+        async def deliver(msg: Message) -> None:
+            kind, text = msg
+            if kind == "features" and not with_features:
+                return
+            await send(kind, text)
+
+        sub = self.stream.subscribe(name, deliver)
+        self.stream.start()
+        if with_features:
+            snapshot = [fv for fv in self.scanner.latest.values() if fv.ready]
+            await sub.put(("features", _features_message(snapshot)))
+        return sub
+
+    async def _ws_handler(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse(heartbeat=30)
+        await ws.prepare(request)
+
+        async def send(kind: str, text: str) -> None:
+            if not ws.closed:
+                await ws.send_str(text)
+
+        sub = await self._subscribe("ws", send, request)
+        try:
+            async for _ in ws:
+                pass  # the stream is one-way; incoming messages are ignored
+        finally:
+            await self.stream.unsubscribe(sub)
+        return ws
+
+    async def _sse_handler(self, request: web.Request) -> web.StreamResponse:
+        resp = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+        await resp.prepare(request)
+        closed = asyncio.Event()
+        self._sse_closed.add(closed)
+
+        async def send(kind: str, text: str) -> None:
+            try:
+                await resp.write(f"event: {kind}\ndata: {text}\n\n".encode())
+            except (ConnectionError, RuntimeError):
+                closed.set()
+
+        sub = await self._subscribe("sse", send, request)
+        try:
+            while not closed.is_set():
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(closed.wait(), 15)
+                if request.transport is None or request.transport.is_closing():
+                    break
+                if not closed.is_set():
+                    with contextlib.suppress(ConnectionError, RuntimeError):
+                        await resp.write(b": keepalive\n\n")
+        finally:
+            self._sse_closed.discard(closed)
+            await self.stream.unsubscribe(sub)
+        return resp
+
+    async def _features(self, request: web.Request) -> web.Response:
+        symbol = request.match_info["symbol"].upper()
+        fv = self.scanner.latest.get(symbol)
+        if fv is None:
+            raise web.HTTPNotFound(
+                text=json.dumps({"error": f"no features for {symbol}"}), content_type="application/json"
+            )
+        return web.json_response(feature_dict(fv))
+
+    async def _top(self, request: web.Request) -> web.Response:
+        by = request.query.get("by", "vsr")
+        if by not in FEATURES or by == "ready":
+            raise web.HTTPBadRequest(
+                text=json.dumps({"error": f"unknown feature {by!r}"}), content_type="application/json"
+            )
+        try:
+            n = max(0, int(request.query.get("n", 10)))
+        except ValueError:
+            raise web.HTTPBadRequest(
+                text=json.dumps({"error": "n must be an integer"}), content_type="application/json"
+            )
+        ready = (fv for fv in self.scanner.latest.values() if fv.ready)
+        top = heapq.nlargest(n, ready, key=lambda fv: getattr(fv, by))
+        return web.json_response([feature_dict(fv) for fv in top])
+
+    async def _signals(self, request: web.Request) -> web.Response:
+        try:
+            limit = max(0, int(request.query.get("limit", 50)))
+        except ValueError:
+            raise web.HTTPBadRequest(
+                text=json.dumps({"error": "limit must be an integer"}), content_type="application/json"
+            )
+        recent = list(self.signals)[-limit:] if limit else []
+        return web.json_response(recent[::-1])
+
+    async def _health(self, request: web.Request) -> web.Response:
+        return web.json_response(
+            {
+                "symbols": len(self.scanner.latest),
+                "ticks": self.scanner.ticks_processed,
+                "clients": self.clients,
+                "signals": len(self.signals),
+            }
+        )
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Run the scanner headless with a local streaming API")
+    parser.add_argument("symbols", nargs="*", help="pairs to scan (default: Volume Scout selection)")
+    parser.add_argument("--host", help="bind address (default: service.host)")
+    parser.add_argument("--port", type=int, help="port (default: service.port)")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    cfg = load_config()
+    service_cfg = dict(cfg.get("service", {}))
+    if args.host:
+        service_cfg["host"] = args.host
+    if args.port is not None:
+        service_cfg["port"] = args.port
+    symbols = args.symbols
+    if not symbols:
+        try:
+            symbols = asyncio.run(select_pairs(cfg))
+        except Exception as exc:  # pragma: no cover - network
+            logger.error("Failed to fetch symbols: %s", exc)
+            raise SystemExit(1)
+    logger.info("Starting headless scanner with %d symbols", len(symbols))
+    start_metrics_server()
+    service = ScannerService.from_config(Scanner(symbols, cfg), service_cfg)
+    suppressor = SignalSuppressor.from_config(cfg.get("alerts", {}))
+    try:
+        asyncio.run(service.run(suppressor))
+    except KeyboardInterrupt:  # pragma: no cover - interactive
+        pass
+
+
+if __name__ == "__main__":
+    main()
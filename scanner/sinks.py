@@ -0,0 +1,63 @@
+"""Built-in subscribers of the signal :class:`~scanner.bus.EventBus`.
+
+Each handler takes one published batch (a list of
+:class:`~scanner.bus.SignalEvent`). Blocking work such as SQLite and
+Parquet writes runs in a worker thread so it never stalls the event loop.
+"""
+
+import asyncio
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from .bus import SignalEvent
+from .metrics import LATENCY, record_signal
+from .outcomes import OutcomeTracker
+from .storage import _DB_PATH, save_signal
+
+
+class StorageSink:
+    """Write every signal to SQLite and Parquet under its pre-assigned id."""
+
+    def __init__(self, db_path: Path | str = _DB_PATH) -> None:
+        self.db_path = db_path
+
+    async def __call__(self, batch: List[SignalEvent]) -> None:
+        await asyncio.to_thread(self.write, batch)
+
+    def write(self, batch: List[SignalEvent]) -> None:
+        for ev in batch:
+            save_signal(
+                ev.fv,
+                ev.prob,
+                self.db_path,
+                price=ev.price,
+                config_hash=ev.config_hash,
+                model_version=ev.model_version,
+                thresholds=ev.thresholds,
+                profile=ev.profile,
+                signal_id=ev.id,
+                ts=ev.ts,
+            )
+
+
+def metrics_sink(batch: List[SignalEvent]) -> None:
+    """Tick-to-alert latency and signal counters."""
+    now = time.time()
+    for ev in batch:
+        LATENCY.observe((now - ev.start_ts) * 1000)
+        record_signal(ev.profile)
+
+
+class OutcomeSink:
+    """Start post-signal price sampling and keep the book subscribed."""
+
+    def __init__(self, tracker: OutcomeTracker, pin: Callable[[str, float], None]) -> None:
+        self.tracker = tracker
+        self.pin = pin
+
+    def __call__(self, batch: List[SignalEvent]) -> None:
+        for ev in batch:
+            self.tracker.track(ev.id, ev.fv.symbol, ev.ts)
+            # keep the book alive until the last horizon is sampled
+            self.pin(ev.fv.symbol, self.tracker.max_horizon + self.tracker.grace_sec)
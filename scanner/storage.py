@@ -1,11 +1,13 @@
+import json
 import sqlite3
 import time
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional, Dict, Any, Tuple
 
-import pandas as pd
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    import pandas as pd
 
-from .features import FeatureVector
+    from .features import FeatureVector
 
 _DATA_DIR = Path('data')
 _DB_PATH = _DATA_DIR / 'pump.db'
@@ -38,15 +40,100 @@ def init_db(path: Path | str = _DB_PATH) -> None:
         )
         """
     )
+    migrate(conn)
     conn.commit()
     conn.close()
 
 
+# Ordered schema migrations; ``PRAGMA user_version`` records the last applied.
+MIGRATIONS: List[List[str]] = [
+    [
+        "CREATE INDEX IF NOT EXISTS idx_signals_ts ON signals(ts)",
+        "CREATE INDEX IF NOT EXISTS idx_signals_symbol_ts ON signals(symbol, ts)",
+        "CREATE INDEX IF NOT EXISTS idx_actions_signal ON actions(signal_id, ts)",
+    ],
+    [
+        "ALTER TABLE signals ADD COLUMN obi REAL",
+        "ALTER TABLE signals ADD COLUMN cum_depth_delta REAL",
+        "ALTER TABLE signals ADD COLUMN spread REAL",
+        "ALTER TABLE signals ADD COLUMN listing_age REAL",
+        "ALTER TABLE signals ADD COLUMN price REAL",
+        "ALTER TABLE signals ADD COLUMN config_hash TEXT",
+        "ALTER TABLE signals ADD COLUMN model_version TEXT",
+        "ALTER TABLE signals ADD COLUMN thresholds TEXT",
+        "ALTER TABLE signals ADD COLUMN price_1m REAL",
+        "ALTER TABLE signals ADD COLUMN price_5m REAL",
+        "ALTER TABLE signals ADD COLUMN price_15m REAL",
+    ],
+    ["ALTER TABLE signals ADD COLUMN profile TEXT"],
+    [
+        """
+        CREATE TABLE IF NOT EXISTS paper_trades (
+            signal_id INTEGER PRIMARY KEY,
+            symbol TEXT,
+            profile TEXT,
+            status TEXT,
+            entry_type TEXT,
+            qty REAL,
+            entry_price REAL,
+            entry_ts REAL,
+            slippage_bps REAL,
+            exit_price REAL,
+            exit_ts REAL,
+            exit_reason TEXT,
+            pnl_usdt REAL,
+            pnl_pct REAL
+        )
+        """,
+    ],
+]
+
+# Post-signal price columns and their offset in seconds.
+OUTCOME_HORIZONS: Dict[str, int] = {"price_1m": 60, "price_5m": 300, "price_15m": 900}
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def feature_columns() -> Dict[str, str]:
+    """SQLite type of the ``signals`` column of every FeatureVector field."""
+    from dataclasses import fields
+
+    from .features import FeatureVector
+
+    types = {str: "TEXT", bool: "INTEGER"}
+    return {f.name: types.get(f.type, "REAL") for f in fields(FeatureVector)}
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """Apply pending migrations and return the resulting schema version.
+
+    ``signals`` then gets a column for every FeatureVector field it lacks,
+    so new features are stored without a numbered migration.
+    """
+    version = schema_version(conn)
+    for target, statements in enumerate(MIGRATIONS[version:], start=version + 1):
+        for sql in statements:
+            conn.execute(sql)
+        conn.execute(f"PRAGMA user_version = {target}")
+        conn.commit()
+    existing = {r[1] for r in conn.execute("PRAGMA table_info(signals)")}
+    missing = {name: kind for name, kind in feature_columns().items() if name not in existing}
+    for name, kind in missing.items():
+        conn.execute(f"ALTER TABLE signals ADD COLUMN {name} {kind}")
+    if missing:
+        conn.commit()
+    return max(version, len(MIGRATIONS))
+
+
 def _parquet_path() -> Path:
     return _DATA_DIR / f"signals_{time.strftime('%Y%m')}.parquet"
 
 
-def _append_parquet(df: pd.DataFrame) -> None:
+def _append_parquet(df: "pd.DataFrame") -> None:
+    import pandas as pd
+
     path = _parquet_path()
     if path.exists():
         existing = pd.read_parquet(path)
@@ -54,34 +141,140 @@ def _append_parquet(df: pd.DataFrame) -> None:
     df.to_parquet(path, index=False)
 
 
-def save_signal(fv: FeatureVector, prob: float, db_path: Path | str = _DB_PATH) -> int:
-    """Insert signal and duplicate to Parquet. Returns row id."""
+def save_signal(
+    fv: "FeatureVector",
+    prob: float,
+    db_path: Path | str = _DB_PATH,
+    price: Optional[float] = None,
+    config_hash: Optional[str] = None,
+    model_version: Optional[str] = None,
+    thresholds: Optional[Dict[str, Any]] = None,
+    profile: Optional[str] = None,
+    signal_id: Optional[int] = None,
+    ts: Optional[float] = None,
+) -> int:
+    """Insert signal and duplicate to Parquet. Returns row id.
+
+    Every FeatureVector field is stored together with the price at signal
+    time, the config hash, model version and thresholds in effect and the
+    strategy profile that fired, so the record can be replayed for training
+    and threshold tuning. ``signal_id`` and ``ts`` are set by callers that
+    hand the id out before the row is written.
+    """
     init_db(db_path)
-    ts = int(time.time())
+    record: Dict[str, Any] = {"id": signal_id} if signal_id is not None else {}
+    record.update({name: getattr(fv, name) for name in feature_columns()})
+    record.update({
+        "probability": prob,
+        "price": price,
+        "config_hash": config_hash,
+        "model_version": model_version,
+        "thresholds": json.dumps(thresholds, sort_keys=True) if thresholds is not None else None,
+        "profile": profile,
+        "ts": int(time.time() if ts is None else ts),
+    })
     conn = sqlite3.connect(db_path)
     cur = conn.cursor()
     cur.execute(
-        "INSERT INTO signals(symbol, vsr, pm, probability, ts) VALUES(?,?,?,?,?)",
-        (fv.symbol, fv.vsr, fv.pm, prob, ts),
+        f"INSERT INTO signals({', '.join(record)}) VALUES({', '.join('?' * len(record))})",
+        tuple(record.values()),
     )
     signal_id = cur.lastrowid
     conn.commit()
     conn.close()
 
-    df = pd.DataFrame([
-        {
-            "id": signal_id,
-            "symbol": fv.symbol,
-            "vsr": fv.vsr,
-            "pm": fv.pm,
-            "probability": prob,
-            "ts": ts,
-        }
-    ])
+    import pandas as pd
+
+    df = pd.DataFrame([{"id": signal_id, **record}])
     _append_parquet(df)
     return signal_id
 
 
+def max_signal_id(db_path: Path | str = _DB_PATH) -> int:
+    """Largest signal id in use (``0`` for an empty table)."""
+    init_db(db_path)
+    conn = sqlite3.connect(db_path)
+    value = conn.execute("SELECT COALESCE(MAX(id), 0) FROM signals").fetchone()[0]
+    conn.close()
+    return int(value)
+
+
+def reserve_signal_ids(count: int = 1, db_path: Path | str = _DB_PATH) -> int:
+    """Reserve ``count`` consecutive signal ids and return the first one.
+
+    The ids come from the ``signals`` AUTOINCREMENT counter, advanced in an
+    immediate transaction, so processes sharing the database never hand out
+    the same id and rows inserted without one are numbered after it.
+    """
+    init_db(db_path)
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'signals'").fetchone()
+        top = conn.execute("SELECT COALESCE(MAX(id), 0) FROM signals").fetchone()[0]
+        first = max(row[0] if row else 0, top) + 1
+        if row is None:
+            conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('signals', ?)", (first + count - 1,))
+        else:
+            conn.execute("UPDATE sqlite_sequence SET seq = ? WHERE name = 'signals'", (first + count - 1,))
+        conn.execute("COMMIT")
+    except BaseException:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+    return int(first)
+
+
+def save_outcomes(
+    updates: Iterable[Tuple[int, str, float]],
+    db_path: Path | str = _DB_PATH,
+) -> int:
+    """Write ``(signal_id, column, price)`` outcome samples in one transaction."""
+    by_column: Dict[str, List[Tuple[float, int]]] = {}
+    for signal_id, column, price in updates:
+        if column not in OUTCOME_HORIZONS:
+            raise ValueError(f"Unknown outcome column '{column}'")
+        by_column.setdefault(column, []).append((price, signal_id))
+    if not by_column:
+        return 0
+    init_db(db_path)
+    conn = sqlite3.connect(db_path)
+    with conn:
+        for column, rows in by_column.items():
+            conn.executemany(f"UPDATE signals SET {column}=? WHERE id=?", rows)
+    conn.close()
+    return sum(len(rows) for rows in by_column.values())
+
+
+def save_paper_trades(rows: Iterable[Dict[str, Any]], db_path: Path | str = _DB_PATH) -> int:
+    """Upsert paper positions (one dict per ``paper_trades`` row) in one transaction."""
+    rows = list(rows)
+    if not rows:
+        return 0
+    init_db(db_path)
+    cols = list(rows[0])
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.executemany(
+            f"INSERT OR REPLACE INTO paper_trades({', '.join(cols)}) VALUES({', '.join('?' * len(cols))})",
+            [tuple(r[c] for c in cols) for r in rows],
+        )
+    conn.close()
+    return len(rows)
+
+
+def fetch_paper_trades(db_path: Path | str = _DB_PATH) -> List[Dict[str, Any]]:
+    """Return paper positions, newest first."""
+    init_db(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    rows = [dict(r) for r in conn.execute("SELECT * FROM paper_trades ORDER BY signal_id DESC")]
+    conn.close()
+    return rows
+
+
 def save_action(signal_id: int, action: str, db_path: Path | str = _DB_PATH) -> None:
     """Insert user action linked to a signal."""
     init_db(db_path)
@@ -101,7 +294,7 @@ def fetch_signals(limit: Optional[int] = None, db_path: Path | str = _DB_PATH) -
     init_db(db_path)
     conn = sqlite3.connect(db_path)
     cur = conn.cursor()
-    sql = "SELECT id, symbol, vsr, pm, probability, ts FROM signals ORDER BY ts DESC"
+    sql = "SELECT id, symbol, vsr, pm, probability, profile, ts FROM signals ORDER BY ts DESC"
     if limit:
         cur.execute(sql + " LIMIT ?", (limit,))
     else:
@@ -125,3 +318,72 @@ def fetch_actions(signal_id: int, db_path: Path | str = _DB_PATH) -> List[Dict[s
     rows = [dict(zip(cols, r)) for r in cur.fetchall()]
     conn.close()
     return rows
+
+
+def signal_columns(db_path: Path | str = _DB_PATH) -> List[str]:
+    """Return column names of the ``signals`` table."""
+    init_db(db_path)
+    conn = sqlite3.connect(db_path)
+    cols = [r[1] for r in conn.execute("PRAGMA table_info(signals)")]
+    conn.close()
+    return cols
+
+
+def recorded_columns(db_path: Path | str = _DB_PATH) -> List[str]:
+    """Return ``signals`` columns holding at least one non-NULL value.
+
+    Columns added by later migrations stay NULL on older rows and are only
+    reported once a signal has been recorded with them.
+    """
+    cols = signal_columns(db_path)
+    conn = sqlite3.connect(db_path)
+    present = [
+        c for c in cols
+        if conn.execute(f"SELECT 1 FROM signals WHERE {c} IS NOT NULL LIMIT 1").fetchone()
+    ]
+    conn.close()
+    return present
+
+
+def iter_labeled_signals(
+    columns: List[str],
+    chunk_size: int = 10000,
+    db_path: Path | str = _DB_PATH,
+) -> Iterator[List[tuple]]:
+    """Yield ``(id, *columns, action)`` rows of signals with a user action.
+
+    Rows are streamed in chunks of ``chunk_size`` so the full history never
+    has to fit in memory. The latest action of each signal is used.
+    """
+    init_db(db_path)
+    conn = sqlite3.connect(db_path)
+    cols = ", ".join(f"s.{c}" for c in columns)
+    cur = conn.execute(
+        f"""
+        WITH last AS (
+            SELECT signal_id, action, MAX(ts) FROM actions GROUP BY signal_id
+        )
+        SELECT s.id, {cols}, last.action FROM signals s
+        JOIN last ON last.signal_id = s.id
+        ORDER BY s.id
+        """
+    )
+    try:
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield rows
+    finally:
+        conn.close()
+
+
+def fetch_action_labels(db_path: Path | str = _DB_PATH) -> Dict[int, str]:
+    """Return the latest action for every signal that has one."""
+    init_db(db_path)
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute(
+        "SELECT signal_id, action, MAX(ts) FROM actions GROUP BY signal_id"
+    ).fetchall()
+    conn.close()
+    return {sid: action for sid, action, _ in rows}
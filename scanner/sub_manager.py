@@ -1,39 +1,139 @@
 import time
-from typing import Dict, List
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List
 
 from .collector import MexcWSClient
 from .metrics import ACTIVE_STREAMS
 
 
+@dataclass
+class SubscriptionPlan:
+    """Symbols to subscribe and unsubscribe in one batch."""
+
+    add: List[str] = field(default_factory=list)
+    remove: List[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.add or self.remove)
+
+
 class SubscriptionManager:
-    """Manage dynamic subscriptions with LRU eviction."""
+    """Manage dynamic subscriptions with LRU eviction.
+
+    ``active_pairs`` is an ``OrderedDict`` kept in last-seen order, so TTL
+    expiry and capacity eviction pop from the front in O(1) per symbol.
+    Pinned symbols (e.g. with an open signal) are refreshed on every plan and
+    therefore never evicted while the pin lasts.
+    """
 
     def __init__(self, client: MexcWSClient, top_n: int, lru_ttl_sec: float) -> None:
         self.client = client
         self.top_n = top_n
         self.lru_ttl_sec = lru_ttl_sec
-        self.active_pairs: Dict[str, float] = {}
+        self.active_pairs: "OrderedDict[str, float]" = OrderedDict()
+        self.pinned: Dict[str, float] = {}
         self.stream_count = 0
         self.last_subscribed: Dict[str, float] = {}
+        # called with the symbols of every applied unsubscribe
+        self.remove_listeners: List[Callable[[List[str]], None]] = []
+        drop_listeners = getattr(client, "drop_listeners", None)
+        if drop_listeners is not None:
+            drop_listeners.append(self.dropped)
         ACTIVE_STREAMS.set(0)
 
-    async def ensure_subscribed(self, pairs: List[str]) -> None:
-        """Subscribe to new pairs and evict stale ones."""
-        now = time.time()
+    def pin(self, symbol: str, ttl_sec: float | None = None) -> None:
+        """Protect ``symbol`` from eviction for ``ttl_sec`` (default: LRU TTL)."""
+        ttl = self.lru_ttl_sec if ttl_sec is None else ttl_sec
+        self.pinned[symbol] = time.time() + ttl
+
+    def unpin(self, symbol: str) -> None:
+        self.pinned.pop(symbol, None)
+
+    def _is_subscribed(self, symbol: str) -> bool:
+        check = getattr(self.client, "is_subscribed", None)
+        if check is not None:
+            return check(symbol)
+        return symbol in self.client._symbols
+
+    def _touch(self, symbol: str, now: float) -> bool:
+        """Mark ``symbol`` as seen; return ``True`` if it was not active."""
+        new = symbol not in self.active_pairs
+        self.active_pairs[symbol] = now
+        self.active_pairs.move_to_end(symbol)
+        return new
+
+    def plan(self, pairs: Iterable[str], now: float | None = None) -> SubscriptionPlan:
+        """Update LRU state for ``pairs`` and return the resulting diff."""
+        now = time.time() if now is None else now
+        added: Dict[str, None] = {}
         for p in pairs:
-            self.active_pairs[p] = now
-            if p not in self.client._symbols and hasattr(self.client, "subscribe"):
-                await self.client.subscribe(p)
-                self.last_subscribed[p] = time.time()
+            if self._touch(p, now) and not self._is_subscribed(p):
+                added[p] = None
+        for symbol, until in list(self.pinned.items()):
+            if until < now:
+                del self.pinned[symbol]
+            elif symbol in self.active_pairs:
+                self._touch(symbol, now)
+
+        removed: List[str] = []
+
+        def drop(symbol: str) -> None:
+            self.active_pairs.popitem(last=False)
+            if symbol in added:
+                del added[symbol]
+            else:
+                removed.append(symbol)
+
         # remove expired
-        for symbol, ts in list(self.active_pairs.items()):
-            if now - ts > self.lru_ttl_sec:
-                await self.client.unsubscribe(symbol)
-                self.active_pairs.pop(symbol, None)
+        while self.active_pairs:
+            symbol, ts = next(iter(self.active_pairs.items()))
+            if now - ts <= self.lru_ttl_sec:
+                break
+            drop(symbol)
         # evict LRU if over limit
         while len(self.active_pairs) > self.top_n:
-            oldest = min(self.active_pairs.items(), key=lambda x: x[1])[0]
-            await self.client.unsubscribe(oldest)
-            self.active_pairs.pop(oldest, None)
-        ACTIVE_STREAMS.set(len(self.active_pairs) * 2)
-        self.stream_count = len(self.active_pairs) * 2
+            symbol = next(iter(self.active_pairs))
+            if symbol in self.pinned:
+                break
+            drop(symbol)
+        return SubscriptionPlan(list(added), removed)
+
+    async def apply(self, plan: SubscriptionPlan) -> None:
+        """Hand a plan to the collector, batched when supported."""
+        if plan.add:
+            if hasattr(self.client, "subscribe_many"):
+                await self.client.subscribe_many(plan.add)
+            else:
+                for p in plan.add:
+                    await self.client.subscribe(p)
+            ts = time.time()
+            for p in plan.add:
+                self.last_subscribed[p] = ts
+        if plan.remove:
+            if hasattr(self.client, "unsubscribe_many"):
+                await self.client.unsubscribe_many(plan.remove)
+            else:
+                for p in plan.remove:
+                    await self.client.unsubscribe(p)
+            for listener in self.remove_listeners:
+                listener(plan.remove)
+        # the client knows how many streams each pair takes (deals included)
+        streams = getattr(self.client, "active_streams", None)
+        self.stream_count = streams if streams is not None else len(self.active_pairs) * 2
+        ACTIVE_STREAMS.set(self.stream_count)
+
+    def dropped(self, symbols: List[str]) -> None:
+        """Forget symbols the client unsubscribed by itself."""
+        for symbol in symbols:
+            self.active_pairs.pop(symbol, None)
+        for listener in self.remove_listeners:
+            listener(symbols)
+        streams = getattr(self.client, "active_streams", None)
+        if streams is not None:
+            self.stream_count = streams
+            ACTIVE_STREAMS.set(streams)
+
+    async def ensure_subscribed(self, pairs: List[str]) -> None:
+        """Subscribe to new pairs and evict stale ones."""
+        await self.apply(self.plan(pairs))
@@ -0,0 +1,134 @@
+import asyncio
+import contextlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Tuple
+
+from .features import FeatureVector
+from .metrics import SIGNALS_SUPPRESSED
+
+
+# (features, probability, tick timestamp, profile name)
+Signal = Tuple[FeatureVector, float, float, str]
+
+
+@dataclass
+class _LastAlert:
+    ts: float
+    prob: float
+    vsr: float
+
+
+class SignalSuppressor:
+    """Per-symbol cooldown with escalation and batching of signals.
+
+    Cooldowns are kept per strategy profile. A symbol that alerted less
+    than ``cooldown_sec`` ago is suppressed unless its probability grew by
+    ``prob_delta`` or its VSR by ``vsr_delta``.
+    Entries are kept in alert order so expired ones are evicted from the
+    front in amortized O(1).
+    """
+
+    # signals waiting for the batch consumer before the source is paused
+    MAX_PENDING = 1000
+
+    def __init__(
+        self,
+        cooldown_sec: float = 300.0,
+        prob_delta: float = 0.1,
+        vsr_delta: float = 2.0,
+        batch_window_sec: float = 0.5,
+    ) -> None:
+        self.cooldown_sec = cooldown_sec
+        self.prob_delta = prob_delta
+        self.vsr_delta = vsr_delta
+        self.batch_window_sec = batch_window_sec
+        self._last: "OrderedDict[Tuple[str, str], _LastAlert]" = OrderedDict()
+
+    @classmethod
+    def from_config(cls, cfg: Dict) -> "SignalSuppressor":
+        return cls(
+            float(cfg.get("cooldown_sec", 300)),
+            float(cfg.get("prob_delta", 0.1)),
+            float(cfg.get("vsr_delta", 2.0)),
+            float(cfg.get("batch_window_sec", 0.5)),
+        )
+
+    def _evict(self, now: float) -> None:
+        while self._last:
+            last = next(iter(self._last.values()))
+            if now - last.ts <= self.cooldown_sec:
+                break
+            self._last.popitem(last=False)
+
+    def allow(self, fv: FeatureVector, prob: float, now: float | None = None, profile: str = "default") -> bool:
+        """Return ``True`` if the signal should be delivered."""
+        now = time.time() if now is None else now
+        self._evict(now)
+        key = (profile, fv.symbol)
+        last = self._last.get(key)
+        if last is not None and not (
+            prob >= last.prob + self.prob_delta or fv.vsr >= last.vsr + self.vsr_delta
+        ):
+            SIGNALS_SUPPRESSED.inc()
+            return False
+        self._last[key] = _LastAlert(now, prob, fv.vsr)
+        self._last.move_to_end(key)
+        return True
+
+    async def batches(self, signals: AsyncIterator[Signal]) -> AsyncIterator[List[Signal]]:
+        """Filter ``signals`` and group those arriving within the batch window.
+
+        An error raised by ``signals`` reaches the consumer after the
+        signals that preceded it have been yielded.
+        """
+        queue: asyncio.Queue[Signal | None] = asyncio.Queue(self.MAX_PENDING)
+
+        async def pump() -> None:
+            try:
+                async for sig in signals:
+                    if self.allow(sig[0], sig[1], profile=sig[3]):
+                        await queue.put(sig)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                await queue.put(None)
+                raise
+            await queue.put(None)
+
+        task = asyncio.create_task(pump())
+        try:
+            while True:
+                first = await queue.get()
+                if first is None:
+                    break
+                batch = [first]
+                done = False
+                loop = asyncio.get_running_loop()
+                deadline = loop.time() + self.batch_window_sec
+                while True:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        sig = await asyncio.wait_for(queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                    if sig is None:
+                        done = True
+                        break
+                    batch.append(sig)
+                yield batch
+                if done:
+                    break
+            # the source ended; re-raise its error, if any
+            await task
+        finally:
+            if not task.done():
+                task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+    def __len__(self) -> int:
+        return len(self._last)
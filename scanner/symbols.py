@@ -1,9 +1,20 @@
+import asyncio
+import json
+import os
+import time
 import aiohttp
 import logging
-from typing import List
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 
 logger = logging.getLogger(__name__)
 
+_CACHE_PATH = Path('data') / 'symbols.json'
+# MEXC request weights of the refresh calls
+_EXCHANGE_INFO_WEIGHT = 10
+_KLINES_WEIGHT = 1
+
 
 async def fetch_all_pairs(rest_url: str) -> List[str]:
     """Fetch list of all trading pairs from MEXC REST API."""
@@ -26,3 +37,219 @@ async def fetch_all_pairs(rest_url: str) -> List[str]:
                 logger.error("Failed fetching %s: %s", path, exc)
                 continue
     raise RuntimeError("Unable to fetch symbol list from MEXC")
+
+
+@dataclass
+class SymbolMeta:
+    """Exchange metadata of one trading pair."""
+
+    symbol: str
+    status: str = ""
+    base_asset: str = ""
+    quote_asset: str = ""
+    tick_size: float = 0.0
+    listing_ts: Optional[float] = None
+    # last failed listing-time lookup, retried after ``SymbolCache.retry_sec``
+    lookup_failed_ts: Optional[float] = None
+
+
+def _parse_symbol(item: Dict[str, Any]) -> SymbolMeta:
+    tick = 0.0
+    for f in item.get("filters") or []:
+        if f.get("filterType") == "PRICE_FILTER" and f.get("tickSize"):
+            tick = float(f["tickSize"])
+    if not tick:
+        precision = item.get("quotePrecision", item.get("quoteAssetPrecision"))
+        if precision is not None:
+            tick = 10.0 ** -int(precision)
+    return SymbolMeta(
+        symbol=item.get("symbol", ""),
+        status=str(item.get("status", "")),
+        base_asset=item.get("baseAsset", ""),
+        quote_asset=item.get("quoteAsset", ""),
+        tick_size=tick,
+    )
+
+
+class SymbolCache:
+    """On-disk cache of exchange info and true listing times.
+
+    Startup reads the JSON file and works offline; :meth:`refresh` revalidates
+    exchange info once the cache is older than ``ttl_sec`` and fills in
+    missing listing times from each pair's first 1m kline. Listing times
+    never change, so they survive every refresh. A failed lookup is retried
+    after ``retry_sec`` without revalidating exchange info. ``acquire`` (e.g.
+    :meth:`~scanner.volume_scout.AdaptivePollScheduler.acquire`) is awaited
+    with each request's weight to share the scanner's REST budget.
+    """
+
+    def __init__(
+        self,
+        path: Path | str = _CACHE_PATH,
+        ttl_sec: float = 86400.0,
+        max_listing_lookups: int = 50,
+        acquire: Callable[[float], Awaitable[None]] | None = None,
+        retry_sec: float = 3600.0,
+    ) -> None:
+        self.path = Path(path)
+        self.ttl_sec = ttl_sec
+        self.max_listing_lookups = max_listing_lookups
+        self.retry_sec = retry_sec
+        self.acquire = acquire
+        self.meta: Dict[str, SymbolMeta] = {}
+        self.fetched_at = 0.0
+        self.load()
+
+    @classmethod
+    def from_config(cls, cfg: Dict[str, Any]) -> "SymbolCache":
+        return cls(
+            cfg.get("cache_path", _CACHE_PATH),
+            float(cfg.get("ttl_sec", 86400)),
+            int(cfg.get("max_listing_lookups", 50)),
+            retry_sec=float(cfg.get("retry_sec", 3600)),
+        )
+
+    def load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text())
+            fetched_at = float(data.get("fetched_at", 0.0))
+            meta = {m["symbol"]: SymbolMeta(**m) for m in data.get("symbols", [])}
+        except (OSError, ValueError, TypeError, KeyError, AttributeError) as exc:
+            # unreadable, or written by a version with other SymbolMeta fields
+            logger.warning("Ignoring unreadable symbol cache %s: %s", self.path, exc)
+            return
+        self.fetched_at = fetched_at
+        self.meta = meta
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(
+            json.dumps({"fetched_at": self.fetched_at, "symbols": [asdict(m) for m in self.meta.values()]})
+        )
+        os.replace(tmp, self.path)
+
+    @property
+    def symbols(self) -> List[str]:
+        return list(self.meta)
+
+    def is_stale(self, now: float | None = None) -> bool:
+        now = time.time() if now is None else now
+        return not self.meta or now - self.fetched_at > self.ttl_sec
+
+    def listing_ts(self, symbol: str) -> Optional[float]:
+        meta = self.meta.get(symbol)
+        return meta.listing_ts if meta else None
+
+    async def _spend(self, weight: float) -> None:
+        if self.acquire is not None:
+            await self.acquire(weight)
+
+    def missing_listings(self, now: float | None = None) -> List[SymbolMeta]:
+        """Pairs whose listing time should be looked up now."""
+        now = time.time() if now is None else now
+        return [
+            m
+            for m in self.meta.values()
+            if m.listing_ts is None and (m.lookup_failed_ts is None or now - m.lookup_failed_ts >= self.retry_sec)
+        ][: self.max_listing_lookups]
+
+    async def _lookup(self, session: aiohttp.ClientSession, url_base: str, missing: List[SymbolMeta]) -> None:
+        for meta in missing:
+            await self._spend(_KLINES_WEIGHT)
+            try:
+                async with session.get(
+                    # the first 1m bar opens within a minute of the listing; a 1d
+                    # bar would open at the start of the UTC day
+                    f"{url_base}/api/v3/klines?symbol={meta.symbol}&interval=1m&startTime=0&limit=1"
+                ) as resp:
+                    resp.raise_for_status()
+                    rows = await resp.json()
+                if not rows:
+                    raise ValueError("no klines")
+                meta.listing_ts = float(rows[0][0]) / 1000.0
+                meta.lookup_failed_ts = None
+            except Exception as exc:
+                meta.lookup_failed_ts = time.time()
+                logger.warning("Listing time lookup failed for %s: %s", meta.symbol, exc)
+
+    async def refresh(self, rest_url: str) -> None:
+        """Revalidate exchange info and look up missing listing times."""
+        url_base = rest_url.rstrip('/')
+        async with aiohttp.ClientSession() as session:
+            await self._spend(_EXCHANGE_INFO_WEIGHT)
+            async with session.get(f"{url_base}/api/v3/exchangeInfo") as resp:
+                resp.raise_for_status()
+                data = await resp.json()
+            fresh = {}
+            for item in data.get("symbols", []):
+                meta = _parse_symbol(item)
+                if not meta.symbol:
+                    continue
+                old = self.meta.get(meta.symbol)
+                if old is not None:
+                    meta.listing_ts = old.listing_ts
+                    meta.lookup_failed_ts = old.lookup_failed_ts
+                fresh[meta.symbol] = meta
+            self.meta = fresh
+            missing = self.missing_listings()
+            await self._lookup(session, url_base, missing)
+        self.fetched_at = time.time()
+        self.save()
+        logger.info("Symbol cache refreshed: %d pairs, %d lookups", len(fresh), len(missing))
+
+    async def lookup_missing(self, rest_url: str) -> int:
+        """Look up listing times that are due without revalidating exchange info."""
+        missing = self.missing_listings()
+        if not missing:
+            return 0
+        async with aiohttp.ClientSession() as session:
+            await self._lookup(session, rest_url.rstrip('/'), missing)
+        self.save()
+        return len(missing)
+
+    async def run_refresh(self, rest_url: str, check_interval: float = 300.0) -> None:
+        """Background loop refreshing the cache whenever it becomes stale.
+
+        Between refreshes only listing-time lookups whose retry is due run.
+        """
+        while True:
+            try:
+                if self.is_stale():
+                    await self.refresh(rest_url)
+                else:
+                    await self.lookup_missing(rest_url)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:  # pragma: no cover - network
+                logger.error("Symbol cache refresh failed: %s", exc)
+            await asyncio.sleep(check_interval)
+
+
+async def load_pairs(rest_url: str, cache: SymbolCache) -> List[str]:
+    """Return cached symbols, fetching from the exchange only on a cold cache."""
+    if cache.meta:
+        return cache.symbols
+    await cache.refresh(rest_url)
+    return cache.symbols
+
+
+async def select_pairs(cfg: Dict[str, Any]) -> List[str]:
+    """Startup pairs: the Volume Scout's hot pairs, else every listed pair."""
+    from .volume_scout import VolumeScout
+
+    rest_url = cfg["mexc"]["rest_url"]
+    logger.info("Selecting hot pairs using Volume Scout")
+    try:
+        pairs = await VolumeScout(rest_url, cfg.get("scout", {})).poll()
+        logger.info("Volume Scout returned %d pairs", len(pairs))
+        return [p.symbol for p in pairs]
+    except Exception as exc:  # pragma: no cover - network
+        logger.error("Volume Scout failed: %s", exc)
+    logger.info("Fetching full symbol list from MEXC")
+    symbols_cfg = cfg.get("symbols", {})
+    if symbols_cfg.get("enabled"):
+        return await load_pairs(rest_url, SymbolCache.from_config(symbols_cfg))
+    return await fetch_all_pairs(rest_url)
@@ -0,0 +1,110 @@
+"""Per-second aggregation of the MEXC deals (trade) stream.
+
+A deals push carries a batch of trades ``{"p": price, "v": quantity,
+"S": 1 (buy) | 2 (sell), "t": ms}``. :class:`TradeAggregator` folds each
+batch with a few vectorised NumPy operations into a fixed accumulator row
+for the current second. Trades are never stored individually, so a burst of
+thousands of trades costs the same handful of array operations as one.
+Closed seconds are kept in a small ring buffer until the feature engine
+drains them into its rolling windows.
+"""
+
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+# quote-notional edges of the trade-size histogram
+SIZE_EDGES = np.array([100.0, 1_000.0, 10_000.0, 100_000.0])
+
+# layout of one aggregated second
+BUY_VOL, SELL_VOL, BUY_COUNT, SELL_COUNT, PRICE_QTY, QTY, LARGE = range(7)
+HIST = 7
+ROW_SIZE = HIST + len(SIZE_EDGES) + 1
+
+
+class TradeAggregator:
+    """Buyer/seller quote volume, VWAP inputs and trade sizes per second."""
+
+    def __init__(self, large_trade_usd: float = 10_000.0, capacity: int = 600) -> None:
+        self.large_trade_usd = large_trade_usd
+        self._rows = np.zeros((capacity, ROW_SIZE))
+        self._secs = np.zeros(capacity)
+        self._head = 0  # next slot to write
+        self._size = 0
+        self._second: Optional[int] = None
+        self._acc = np.zeros(ROW_SIZE)
+        self.trades = 0
+
+    def add_deals(self, deals: Sequence[Dict[str, Any]], now: float) -> None:
+        """Fold one deals push; trades without a timestamp count at ``now``."""
+        n = len(deals)
+        if not n:
+            return
+        price = np.fromiter((float(d.get("p", 0.0)) for d in deals), float, n)
+        qty = np.fromiter((float(d.get("v", 0.0)) for d in deals), float, n)
+        buy = np.fromiter((int(d.get("S", 1)) == 1 for d in deals), bool, n)
+        ms = np.fromiter((float(d.get("t") or now * 1000) for d in deals), float, n)
+        secs = (ms // 1000).astype(np.int64)
+        if secs.min() == secs.max():
+            self._fold(int(secs[0]), price, qty, buy)
+        else:
+            for sec in np.unique(secs):
+                m = secs == sec
+                self._fold(int(sec), price[m], qty[m], buy[m])
+        self.trades += n
+
+    def _fold(self, sec: int, price: np.ndarray, qty: np.ndarray, buy: np.ndarray) -> None:
+        if self._second is None:
+            self._second = sec
+        elif sec > self._second:
+            self._close()
+            self._second = sec
+        # trades for an already closed second count towards the open one
+        notional = price * qty
+        acc = self._acc
+        buy_vol = notional[buy].sum()
+        acc[BUY_VOL] += buy_vol
+        acc[SELL_VOL] += notional.sum() - buy_vol
+        n_buy = int(buy.sum())
+        acc[BUY_COUNT] += n_buy
+        acc[SELL_COUNT] += len(buy) - n_buy
+        acc[PRICE_QTY] += notional.sum()
+        acc[QTY] += qty.sum()
+        acc[LARGE] += int((notional >= self.large_trade_usd).sum())
+        acc[HIST:] += np.bincount(np.searchsorted(SIZE_EDGES, notional, side="right"), minlength=len(SIZE_EDGES) + 1)
+
+    def _close(self) -> None:
+        self._rows[self._head] = self._acc
+        self._secs[self._head] = self._second
+        self._head = (self._head + 1) % len(self._rows)
+        self._size = min(self._size + 1, len(self._rows))
+        self._acc[:] = 0.0
+
+    def roll(self, now: float) -> None:
+        """Close the open second once the clock has moved past it."""
+        if self._second is not None and int(now) > self._second:
+            self._close()
+            self._second = None
+
+    def drain(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Return and forget the closed seconds as ``(secs, rows)``, oldest first."""
+        if not self._size:
+            return self._secs[:0], self._rows[:0]
+        idx = (self._head - self._size + np.arange(self._size)) % len(self._rows)
+        self._size = 0
+        return self._secs[idx], self._rows[idx]
+
+
+def summarize(rows: np.ndarray) -> Dict[str, float]:
+    """Trade features over aggregated ``rows`` (one per second)."""
+    total = rows.sum(axis=0) if len(rows) else np.zeros(ROW_SIZE)
+    volume = total[BUY_VOL] + total[SELL_VOL]
+    count = total[BUY_COUNT] + total[SELL_COUNT]
+    return {
+        "buy_ratio": float(total[BUY_VOL] / volume) if volume > 0 else 0.0,
+        "trade_count": float(count),
+        "large_trades": float(total[LARGE]),
+        "avg_trade_usd": float(volume / count) if count > 0 else 0.0,
+        "small_share": float(total[HIST] / count) if count > 0 else 0.0,
+        "vwap": float(total[PRICE_QTY] / total[QTY]) if total[QTY] > 0 else 0.0,
+    }
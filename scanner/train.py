@@ -0,0 +1,420 @@
+"""Offline training of ``model.json`` from recorded signals and actions.
+
+Signals are streamed from SQLite (or the monthly Parquet dumps) in chunks
+and labelled with the user's latest action (``buy`` = 1, ``skip`` = 0).
+Every pass over the data holds only one chunk in memory, so months of
+history train on a laptop CPU::
+
+    python -m scanner.train --out model.json --model-type logistic
+"""
+
+import argparse
+import glob
+import json
+import logging
+import math
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from . import storage
+from .model import FEATURE_NAMES, OPTIONAL_FEATURE_NAMES
+
+logger = logging.getLogger(__name__)
+
+LABELS = {"buy": 1.0, "skip": 0.0}
+
+# numeric FeatureVector fields a model can be trained on
+TRAINABLE_FEATURES = (*FEATURE_NAMES, *OPTIONAL_FEATURE_NAMES)
+
+Chunk = Tuple[np.ndarray, np.ndarray, np.ndarray]
+ChunkSource = Callable[[], Iterator[Chunk]]
+
+
+def sqlite_chunks(features: Sequence[str], chunk_size: int, db_path: Path | str) -> ChunkSource:
+    """Return a factory of ``(ids, X, y)`` chunks read from SQLite."""
+
+    def factory() -> Iterator[Chunk]:
+        for rows in storage.iter_labeled_signals(list(features), chunk_size, db_path):
+            rows = [r for r in rows if r[-1] in LABELS]
+            if not rows:
+                continue
+            ids = np.array([r[0] for r in rows], dtype=np.int64)
+            X = np.array([r[1:-1] for r in rows], dtype=float)
+            y = np.array([LABELS[r[-1]] for r in rows], dtype=float)
+            yield ids, np.nan_to_num(X), y
+
+    return factory
+
+
+def parquet_chunks(
+    paths: Sequence[str], features: Sequence[str], chunk_size: int, db_path: Path | str
+) -> ChunkSource:
+    """Return a factory of ``(ids, X, y)`` chunks read from Parquet dumps."""
+    import pyarrow.parquet as pq
+
+    labels = {
+        sid: LABELS[a] for sid, a in storage.fetch_action_labels(db_path).items() if a in LABELS
+    }
+
+    def factory() -> Iterator[Chunk]:
+        for path in paths:
+            pf = pq.ParquetFile(path)
+            for batch in pf.iter_batches(batch_size=chunk_size, columns=["id", *features]):
+                ids = batch.column("id").to_numpy(zero_copy_only=False).astype(np.int64)
+                keep = np.array([i in labels for i in ids], dtype=bool)
+                if not keep.any():
+                    continue
+                X = np.column_stack(
+                    [batch.column(f).to_numpy(zero_copy_only=False).astype(float) for f in features]
+                )
+                y = np.array([labels[i] for i in ids[keep]], dtype=float)
+                yield ids[keep], np.nan_to_num(X[keep]), y
+
+    return factory
+
+
+def _split(ids: np.ndarray, holdout: int) -> np.ndarray:
+    """Deterministic holdout mask: every ``holdout``-th signal id."""
+    if holdout <= 1:
+        return np.zeros(len(ids), dtype=bool)
+    return ids % holdout == 0
+
+
+class RunningStats:
+    """Streaming mean/variance (Chan's parallel update) and label rate."""
+
+    def __init__(self, n_features: int) -> None:
+        self.n = 0
+        self.mean = np.zeros(n_features)
+        self.m2 = np.zeros(n_features)
+        self.positives = 0.0
+
+    def update(self, X: np.ndarray, y: np.ndarray) -> None:
+        if not len(X):
+            return
+        n_b = len(X)
+        mean_b = X.mean(axis=0)
+        m2_b = ((X - mean_b) ** 2).sum(axis=0)
+        delta = mean_b - self.mean
+        total = self.n + n_b
+        self.mean = self.mean + delta * n_b / total
+        self.m2 = self.m2 + m2_b + delta ** 2 * self.n * n_b / total
+        self.n = total
+        self.positives += float(y.sum())
+
+    @property
+    def std(self) -> np.ndarray:
+        if self.n < 2:
+            return np.ones_like(self.mean)
+        std = np.sqrt(self.m2 / (self.n - 1))
+        return np.where(std > 0, std, 1.0)
+
+    @property
+    def base_rate(self) -> float:
+        rate = self.positives / self.n if self.n else 0.5
+        return min(max(rate, 1e-6), 1 - 1e-6)
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-np.clip(x, -500, 500)))
+
+
+_TRAINERS: Dict[str, Callable[..., Dict[str, Any]]] = {}
+
+
+def register_trainer(kind: str) -> Callable:
+    """Register a trainer producing a ``model.json`` dict of type ``kind``."""
+
+    def wrap(fn: Callable[..., Dict[str, Any]]) -> Callable[..., Dict[str, Any]]:
+        _TRAINERS[kind] = fn
+        return fn
+
+    return wrap
+
+
+@register_trainer("logistic")
+def train_logistic(
+    source: ChunkSource,
+    features: Sequence[str],
+    holdout: int = 10,
+    epochs: int = 5,
+    lr: float = 0.1,
+    l2: float = 1e-4,
+    batch_size: int = 256,
+    seed: int = 0,
+    **_: Any,
+) -> Dict[str, Any]:
+    """Minibatch SGD on standardised features, exported in raw feature units."""
+    stats = RunningStats(len(features))
+    for ids, X, y in source():
+        train = ~_split(ids, holdout)
+        stats.update(X[train], y[train])
+    if not stats.n:
+        raise ValueError("No labelled signals to train on")
+    mean, std = stats.mean, stats.std
+    w = np.zeros(len(features))
+    b = math.log(stats.base_rate / (1 - stats.base_rate))
+    rng = np.random.default_rng(seed)
+    step = 0
+    for epoch in range(epochs):
+        for ids, X, y in source():
+            train = ~_split(ids, holdout)
+            Xs = (X[train] - mean) / std
+            ys = y[train]
+            order = rng.permutation(len(ys))
+            for start in range(0, len(order), batch_size):
+                idx = order[start : start + batch_size]
+                err = _sigmoid(Xs[idx] @ w + b) - ys[idx]
+                rate = lr / math.sqrt(1 + step / 100)
+                w -= rate * (Xs[idx].T @ err / len(idx) + l2 * w)
+                b -= rate * float(err.mean())
+                step += 1
+        logger.info("Epoch %d/%d done (%d steps)", epoch + 1, epochs, step)
+    w_raw = w / std
+    return {
+        "type": "logistic",
+        "normalize": False,
+        "intercept": float(b - (w_raw * mean).sum()),
+        "coefficients": {f: float(c) for f, c in zip(features, w_raw)},
+        "n_samples": stats.n,
+    }
+
+
+def _reservoir(source: ChunkSource, holdout: int, size: int, seed: int) -> Tuple[np.ndarray, RunningStats]:
+    rng = np.random.default_rng(seed)
+    sample: np.ndarray | None = None
+    stats: RunningStats | None = None
+    seen = 0
+    for ids, X, y in source():
+        train = ~_split(ids, holdout)
+        X = X[train]
+        if stats is None:
+            stats = RunningStats(X.shape[1])
+            sample = np.empty((0, X.shape[1]))
+        stats.update(X, y[train])
+        if len(sample) < size:
+            take = min(size - len(sample), len(X))
+            sample = np.vstack([sample, X[:take]])
+            X = X[take:]
+            seen += take
+        if len(X):
+            slots = rng.integers(0, seen + np.arange(1, len(X) + 1))
+            keep = slots < size
+            sample[slots[keep]] = X[keep]
+            seen += len(X)
+    if stats is None or not stats.n:
+        raise ValueError("No labelled signals to train on")
+    return sample, stats
+
+
+@register_trainer("tree_ensemble")
+def train_tree_ensemble(
+    source: ChunkSource,
+    features: Sequence[str],
+    holdout: int = 10,
+    rounds: int = 50,
+    learning_rate: float = 0.3,
+    bins: int = 32,
+    l2: float = 1.0,
+    sample_size: int = 100000,
+    seed: int = 0,
+    **_: Any,
+) -> Dict[str, Any]:
+    """Histogram gradient boosting of depth-1 trees, one data pass per round.
+
+    Candidate split points are quantiles of a bounded reservoir sample and
+    each round only accumulates per-bin gradient sums, so memory is
+    ``O(features * bins)`` regardless of history length.
+    """
+    sample, stats = _reservoir(source, holdout, sample_size, seed)
+    n_features = len(features)
+    qs = np.linspace(0, 1, bins + 1)[1:-1]
+    edges = [np.unique(np.quantile(sample[:, f], qs)) for f in range(n_features)]
+    base = math.log(stats.base_rate / (1 - stats.base_rate))
+    stumps: List[Tuple[int, float, float, float]] = []
+
+    def margin(X: np.ndarray) -> np.ndarray:
+        out = np.full(len(X), base)
+        for f, thr, lv, rv in stumps:
+            out += np.where(X[:, f] < thr, lv, rv)
+        return out
+
+    for r in range(rounds):
+        G = [np.zeros(len(e) + 1) for e in edges]
+        H = [np.zeros(len(e) + 1) for e in edges]
+        for ids, X, y in source():
+            train = ~_split(ids, holdout)
+            X, y = X[train], y[train]
+            p = _sigmoid(margin(X))
+            g, h = p - y, p * (1 - p)
+            for f, e in enumerate(edges):
+                b = np.searchsorted(e, X[:, f], side="right")
+                G[f] += np.bincount(b, weights=g, minlength=len(e) + 1)
+                H[f] += np.bincount(b, weights=h, minlength=len(e) + 1)
+        best = None
+        for f, e in enumerate(edges):
+            if not len(e):
+                continue
+            gl, hl = np.cumsum(G[f])[:-1], np.cumsum(H[f])[:-1]
+            gt, ht = G[f].sum(), H[f].sum()
+            gr, hr = gt - gl, ht - hl
+            gain = gl ** 2 / (hl + l2) + gr ** 2 / (hr + l2) - gt ** 2 / (ht + l2)
+            k = int(np.argmax(gain))
+            if best is None or gain[k] > best[0]:
+                best = (gain[k], f, float(e[k]), -gl[k] / (hl[k] + l2), -gr[k] / (hr[k] + l2))
+        if best is None or best[0] <= 1e-12:
+            break
+        _, f, thr, lv, rv = best
+        stumps.append((f, thr, learning_rate * float(lv), learning_rate * float(rv)))
+        logger.info("Round %d/%d: split %s < %.6g", r + 1, rounds, features[f], thr)
+
+    data: Dict[str, List] = {k: [] for k in ("roots", "feature", "threshold", "left", "right", "value")}
+    for f, thr, lv, rv in stumps:
+        root = len(data["feature"])
+        data["roots"].append(root)
+        data["feature"] += [f, -1, -1]
+        data["threshold"] += [thr, 0.0, 0.0]
+        data["left"] += [root + 1, -1, -1]
+        data["right"] += [root + 2, -1, -1]
+        data["value"] += [0.0, lv, rv]
+    return {"type": "tree_ensemble", "base_score": base, **data, "n_samples": stats.n}
+
+
+def calibration_stats(
+    predict: Callable[[np.ndarray], np.ndarray],
+    source: ChunkSource,
+    holdout: int = 10,
+    n_bins: int = 10,
+) -> Dict[str, Any]:
+    """Reliability table, log loss and Brier score on the holdout split."""
+    count = np.zeros(n_bins)
+    pred_sum = np.zeros(n_bins)
+    pos_sum = np.zeros(n_bins)
+    log_loss = brier = 0.0
+    use_all = holdout <= 1
+    for ids, X, y in source():
+        mask = np.ones(len(ids), dtype=bool) if use_all else _split(ids, holdout)
+        if not mask.any():
+            continue
+        p = np.clip(predict(X[mask]), 1e-12, 1 - 1e-12)
+        t = y[mask]
+        b = np.minimum((p * n_bins).astype(int), n_bins - 1)
+        count += np.bincount(b, minlength=n_bins)
+        pred_sum += np.bincount(b, weights=p, minlength=n_bins)
+        pos_sum += np.bincount(b, weights=t, minlength=n_bins)
+        log_loss -= float((t * np.log(p) + (1 - t) * np.log(1 - p)).sum())
+        brier += float(((p - t) ** 2).sum())
+    n = int(count.sum())
+    nz = np.maximum(count, 1)
+    return {
+        "n_eval": n,
+        "log_loss": log_loss / n if n else None,
+        "brier": brier / n if n else None,
+        "positive_rate": float(pos_sum.sum() / n) if n else None,
+        "bins": [
+            {
+                "lower": i / n_bins,
+                "upper": (i + 1) / n_bins,
+                "count": int(count[i]),
+                "mean_pred": float(pred_sum[i] / nz[i]),
+                "observed": float(pos_sum[i] / nz[i]),
+            }
+            for i in range(n_bins)
+        ],
+    }
+
+
+def train(
+    out: Path | str,
+    model_type: str = "logistic",
+    db_path: Path | str = storage._DB_PATH,
+    parquet: Sequence[str] | None = None,
+    features: Sequence[str] | None = None,
+    chunk_size: int = 10000,
+    holdout: int = 10,
+    **params: Any,
+) -> Dict[str, Any]:
+    """Train ``model_type`` and write a versioned ``model.json`` to ``out``.
+
+    ``features`` defaults to the recorded core features; requested features
+    that are unknown or not recorded raise :class:`ValueError`.
+    """
+    from .model import _LOADERS
+
+    if model_type not in _TRAINERS:
+        raise ValueError(f"Unknown model type '{model_type}'")
+    if parquet:
+        import pyarrow.parquet as pq
+
+        available = set(pq.read_schema(parquet[0]).names)
+    else:
+        available = set(storage.recorded_columns(db_path))
+    if features:
+        unknown = sorted(set(features) - set(TRAINABLE_FEATURES))
+        if unknown:
+            raise ValueError(f"Unknown features: {', '.join(unknown)}")
+        missing = sorted(set(features) - available)
+        if missing:
+            raise ValueError(f"Features not recorded: {', '.join(missing)}")
+        features = [f for f in TRAINABLE_FEATURES if f in features]
+    else:
+        features = [f for f in FEATURE_NAMES if f in available]
+    if not features:
+        raise ValueError("No model features recorded in storage")
+    if parquet:
+        source = parquet_chunks(parquet, features, chunk_size, db_path)
+    else:
+        source = sqlite_chunks(features, chunk_size, db_path)
+
+    logger.info("Training %s on %s", model_type, ", ".join(features))
+    started = time.time()
+    data = _TRAINERS[model_type](source, features, holdout=holdout, **params)
+    data["features"] = list(features)
+    data["version"] = time.strftime("%Y%m%d%H%M%S", time.gmtime(started))
+    data["trained_at"] = int(started)
+
+    model = _LOADERS[model_type](data, Path(out))
+    data["calibration"] = calibration_stats(model.predict_batch, source, holdout)
+    out = Path(out)
+    out.write_text(json.dumps(data, indent=2))
+    logger.info("Wrote %s model version %s to %s", model_type, data["version"], out)
+    return data
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Train model.json from recorded signals")
+    parser.add_argument("--out", default="model.json")
+    parser.add_argument("--model-type", default="logistic", choices=sorted(_TRAINERS))
+    parser.add_argument("--db", default=str(storage._DB_PATH))
+    parser.add_argument("--parquet", help="glob of Parquet signal dumps to read instead of SQLite")
+    parser.add_argument("--features", nargs="*")
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--holdout", type=int, default=10, help="hold out every N-th signal id")
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument("--lr", type=float, default=0.1)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    parquet = sorted(glob.glob(args.parquet)) if args.parquet else None
+    data = train(
+        args.out,
+        args.model_type,
+        db_path=args.db,
+        parquet=parquet,
+        features=args.features,
+        chunk_size=args.chunk_size,
+        holdout=args.holdout,
+        epochs=args.epochs,
+        lr=args.lr,
+        rounds=args.rounds,
+    )
+    cal = data["calibration"]
+    print(f"version {data['version']} n={data['n_samples']} log_loss={cal['log_loss']} brier={cal['brier']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+import logging
+import time
+from typing import Any, Dict, List
+
+import httpx
+import numpy as np
+
+from .metrics import UNIVERSE_PROMOTIONS, UNIVERSE_SIZE
+
+
+logger = logging.getLogger(__name__)
+
+
+def _field(item: Dict[str, Any], *keys: str) -> float:
+    for k in keys:
+        v = item.get(k)
+        if v not in (None, ""):
+            return float(v)
+    return 0.0
+
+
+class UniverseScanner:
+    """Cheap first-stage scan over every pair using bulk ticker snapshots.
+
+    Each poll of ``/api/v3/ticker/24hr`` returns all pairs in one request.
+    Snapshots are kept in a ``(history, n_symbols)`` ring buffer so that
+    lightweight features are computed for the whole universe with a few
+    NumPy operations:
+
+    * ``rel_vol`` – quote volume traded over ``window_sec`` relative to the
+      average rate of the last 24h,
+    * ``ret`` – price return over ``window_sec``,
+    * ``spread`` – relative bid/ask spread.
+
+    Pairs crossing the pre-thresholds are returned for promotion into the
+    full kline/depth tier.
+    """
+
+    def __init__(self, rest_url: str, cfg: Dict[str, Any]) -> None:
+        self.rest_url = rest_url
+        self.cfg = cfg
+        self.history = max(2, int(cfg.get("history", 32)))
+        self._index: Dict[str, int] = {}
+        self._symbols: List[str] = []
+        self._ts = np.full(self.history, np.nan)
+        self._vol = np.zeros((self.history, 0))
+        self._price = np.zeros((self.history, 0))
+        self._pos = -1
+        self.request_count = 0
+        self.last_features: Dict[str, np.ndarray] = {}
+
+    @property
+    def symbols(self) -> List[str]:
+        return self._symbols
+
+    def _grow(self, n: int) -> None:
+        extra = n - self._vol.shape[1]
+        if extra > 0:
+            pad = np.full((self.history, extra), np.nan)
+            self._vol = np.hstack([self._vol, pad])
+            self._price = np.hstack([self._price, pad])
+
+    def update(self, data: List[Dict[str, Any]], now: float | None = None) -> List[str]:
+        """Ingest one bulk ticker payload and return symbols to promote."""
+        now = time.time() if now is None else now
+        n = len(data)
+        idx = np.empty(n, dtype=np.int64)
+        vol = np.empty(n)
+        price = np.empty(n)
+        bid = np.empty(n)
+        ask = np.empty(n)
+        for i, item in enumerate(data):
+            sym = item.get("symbol") or item.get("s")
+            j = self._index.get(sym)
+            if j is None:
+                j = self._index[sym] = len(self._symbols)
+                self._symbols.append(sym)
+            idx[i] = j
+            vol[i] = _field(item, "quoteVolume", "quote_volume", "q")
+            price[i] = _field(item, "lastPrice", "last", "c")
+            bid[i] = _field(item, "bidPrice", "b")
+            ask[i] = _field(item, "askPrice", "a")
+        self._grow(len(self._symbols))
+
+        self._pos = (self._pos + 1) % self.history
+        self._ts[self._pos] = now
+        self._vol[self._pos] = np.nan
+        self._price[self._pos] = np.nan
+        self._vol[self._pos, idx] = vol
+        self._price[self._pos, idx] = price
+        UNIVERSE_SIZE.set(len(self._symbols))
+
+        window = float(self.cfg.get("window_sec", 60))
+        age = now - self._ts
+        # oldest snapshot still inside the window
+        valid = np.where(age <= window, age, -np.inf)
+        valid[self._pos] = -np.inf
+        if not np.isfinite(valid).any():
+            return []
+        base = int(np.argmax(valid))
+        dt = now - self._ts[base]
+        if dt <= 0:
+            return []
+
+        vol_now = self._vol[self._pos]
+        vol_then = self._vol[base]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            traded = np.clip(vol_now - vol_then, 0, None)
+            rel_vol = traded / (vol_now * dt / 86400.0)
+            ret = self._price[self._pos] / self._price[base] - 1
+            spread_all = np.full(len(self._symbols), np.nan)
+            spread_all[idx] = (ask - bid) / ((ask + bid) / 2)
+        rel_vol = np.nan_to_num(rel_vol, nan=0.0, posinf=0.0)
+        ret = np.nan_to_num(ret, nan=0.0, posinf=0.0, neginf=0.0)
+        spread_all = np.nan_to_num(spread_all, nan=np.inf)
+        self.last_features = {"rel_vol": rel_vol, "ret": ret, "spread": spread_all}
+
+        mask = (
+            (rel_vol >= float(self.cfg.get("pre_vsr", 3.0)))
+            & (ret >= float(self.cfg.get("pre_pm", 0.01)))
+            & (spread_all <= float(self.cfg.get("max_spread", 0.015)))
+            & (np.nan_to_num(vol_now) >= float(self.cfg.get("min_quote_vol_usd", 0)))
+        )
+        hits = np.flatnonzero(mask)
+        if not len(hits):
+            return []
+        score = rel_vol[hits] * (1 + ret[hits] * 50)
+        order = hits[np.argsort(-score)][: int(self.cfg.get("max_promote", 20))]
+        promoted = [self._symbols[i] for i in order]
+        UNIVERSE_PROMOTIONS.inc(len(promoted))
+        logger.info("Universe scan promoting %s", ", ".join(promoted))
+        return promoted
+
+    async def poll(self) -> List[str]:
+        """Fetch all tickers and return symbols to promote."""
+        url = self.rest_url.rstrip("/") + "/api/v3/ticker/24hr"
+        self.request_count += 1
+        async with httpx.AsyncClient() as client:
+            resp = await client.get(url)
+            resp.raise_for_status()
+            data = resp.json()
+        return self.update(data)
@@ -1,3 +1,4 @@
+import asyncio
 import time
 from dataclasses import dataclass
 from collections import deque
@@ -5,6 +6,8 @@ from typing import Deque, Dict, List, Tuple, Any
 
 import httpx
 
+from .metrics import SCOUT_ACTIVITY, SCOUT_POLL_INTERVAL, SCOUT_REST_WEIGHT
+
 
 @dataclass
 class PairStat:
@@ -97,3 +100,109 @@ class VolumeScout:
         self.request_count += 1
         return await poll_stats(self.rest_url, self.history, self.cfg)
 
+
+
+class AdaptivePollScheduler:
+    """Choose the next :class:`VolumeScout` poll delay from market activity.
+
+    Activity is the larger of two signals, both in ``[0, 1]``:
+
+    * ranking shift – Jaccard distance between consecutive top-``k`` sets,
+    * near-threshold share – symbols with ``pm_delta_5m >= near_pm`` relative
+      to ``near_target``.
+
+    Busy markets poll down to ``min_interval``; quiet ones back off
+    geometrically to ``max_interval``. A sliding one-minute window of REST
+    weight keeps the schedule within ``weight_budget_per_min``. The universe
+    scan and the symbol cache spend the same budget through :meth:`acquire`.
+    """
+
+    def __init__(self, cfg: Dict[str, Any], base_interval: float = 60.0) -> None:
+        self.cfg = cfg
+        self.base_interval = base_interval
+        self.interval = base_interval
+        self.activity = 0.0
+        self._prev_top: set[str] = set()
+        self._weights: Deque[Tuple[float, float]] = deque()
+        self._last_requests = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.cfg.get("enabled", False))
+
+    def _activity(self, stats: List[PairStat]) -> float:
+        k = int(self.cfg.get("top_k", 20))
+        top = {s.symbol for s in stats[:k]}
+        union = top | self._prev_top
+        shift = 1 - len(top & self._prev_top) / len(union) if union and self._prev_top else 0.0
+        self._prev_top = top
+        near_pm = float(self.cfg.get("near_pm", 0.01))
+        near = sum(1 for s in stats if s.pm_delta_5m >= near_pm)
+        near_share = min(near / max(float(self.cfg.get("near_target", 10)), 1.0), 1.0)
+        return max(shift, near_share)
+
+    def spent_weight(self, now: float) -> float:
+        while self._weights and now - self._weights[0][0] > 60:
+            self._weights.popleft()
+        return sum(w for _, w in self._weights)
+
+    def charge(self, weight: float, now: float | None = None) -> None:
+        """Record REST weight spent outside the scout poll."""
+        now = time.time() if now is None else now
+        self._weights.append((now, weight))
+        SCOUT_REST_WEIGHT.set(self.spent_weight(now))
+
+    def wait_time(self, weight: float, now: float | None = None) -> float:
+        """Seconds until ``weight`` more fits in the one-minute budget."""
+        now = time.time() if now is None else now
+        budget = float(self.cfg.get("weight_budget_per_min", 600))
+        if not self.enabled or budget <= 0:
+            return 0.0
+        spent = self.spent_weight(now)
+        wait = 0.0
+        for ts, w in self._weights:
+            if spent + weight <= budget:
+                break
+            # room frees up once this entry leaves the window
+            spent -= w
+            wait = 60.0 - (now - ts)
+        return max(wait, 0.0)
+
+    async def acquire(self, weight: float) -> None:
+        """Wait until ``weight`` fits in the budget, then charge it."""
+        while (delay := self.wait_time(weight)) > 0:
+            await asyncio.sleep(delay)
+        self.charge(weight)
+
+    def next_interval(self, stats: List[PairStat], request_count: int, now: float | None = None) -> float:
+        """Record a finished poll and return the delay before the next one."""
+        now = time.time() if now is None else now
+        weight = float(self.cfg.get("weight_per_poll", 40))
+        requests = request_count - self._last_requests
+        self._last_requests = request_count
+        if requests > 0:
+            self._weights.append((now, requests * weight))
+        if not self.enabled:
+            self.interval = self.base_interval
+            SCOUT_POLL_INTERVAL.set(self.interval)
+            SCOUT_REST_WEIGHT.set(self.spent_weight(now))
+            return self.interval
+
+        lo = float(self.cfg.get("min_interval", 10))
+        hi = float(self.cfg.get("max_interval", 120))
+        self.activity = self._activity(stats)
+        target = hi - self.activity * (hi - lo)
+        if target > self.interval:
+            target = min(target, self.interval * float(self.cfg.get("backoff", 1.5)))
+        budget = float(self.cfg.get("weight_budget_per_min", 600))
+        floor = 60.0 * weight / budget if budget > 0 else lo
+        interval = min(max(target, floor, lo), max(hi, floor))
+        spent = self.spent_weight(now)
+        if budget > 0 and spent + weight > budget and self._weights:
+            # wait until the oldest poll leaves the one-minute window
+            interval = max(interval, 60.0 - (now - self._weights[0][0]))
+        self.interval = interval
+        SCOUT_POLL_INTERVAL.set(interval)
+        SCOUT_ACTIVITY.set(self.activity)
+        SCOUT_REST_WEIGHT.set(spent)
+        return self.interval
@@ -0,0 +1,138 @@
+import sqlite3
+
+import numpy as np
+import pytest
+
+import scanner.analytics as analytics
+import scanner.storage as storage
+from scanner.features import FeatureVector
+
+
+def make_db(path):
+    storage.init_db(path)
+    conn = sqlite3.connect(path)
+    rows = [
+        ("AAA", 6.0, 0.03, 0.65, 0),
+        ("BBB", 7.0, 0.04, 0.72, 10),
+        ("AAA", 8.0, 0.05, 0.81, 3700),
+        ("CCC", 5.5, 0.02, 0.61, 3800),
+        ("AAA", 9.0, 0.06, 0.93, 7300),
+    ]
+    conn.executemany("INSERT INTO signals(symbol, vsr, pm, probability, ts) VALUES(?,?,?,?,?)", rows)
+    conn.executemany(
+        "INSERT INTO actions(signal_id, action, ts) VALUES(?,?,?)",
+        [(1, "skip", 1), (1, "buy", 2), (2, "skip", 11), (3, "buy", 3701)],
+    )
+    conn.commit()
+    conn.close()
+
+
+def test_migrations_create_indexes(tmp_path):
+    db = tmp_path / "pump.db"
+    storage.init_db(db)
+    conn = sqlite3.connect(db)
+    assert storage.schema_version(conn) == len(storage.MIGRATIONS)
+    names = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+    assert {"idx_signals_ts", "idx_signals_symbol_ts", "idx_actions_signal"} <= names
+    plan = conn.execute("EXPLAIN QUERY PLAN SELECT * FROM signals WHERE ts >= 5 ORDER BY ts").fetchall()
+    assert any("idx_signals_ts" in r[-1] for r in plan)
+    # re-running is a no-op
+    assert storage.migrate(conn) == len(storage.MIGRATIONS)
+    conn.close()
+
+
+def test_signals_store_every_feature(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "_DATA_DIR", tmp_path)
+    db = tmp_path / "pump.db"
+    fv = FeatureVector("AAA", 6.0, 0.03, 0.2, 0.0, 0.01, 1000.0, True, ofi=1.5, market_breadth=0.25)
+    storage.save_signal(fv, 0.8, db)
+    assert set(storage.feature_columns()) <= set(storage.signal_columns(db))
+    cols = analytics.query_signals(columns=["symbol", "ofi", "market_breadth", "ready"], db_path=db)
+    assert list(cols["ofi"]) == [1.5] and list(cols["market_breadth"]) == [0.25]
+    assert list(cols["symbol"]) == ["AAA"] and list(cols["ready"]) == [1]
+
+
+def test_query_signals_columnar(tmp_path):
+    db = tmp_path / "pump.db"
+    make_db(db)
+    res = analytics.query_signals(start=0, end=4000, symbols=["AAA", "CCC"], db_path=db)
+    assert list(res["symbol"]) == ["AAA", "AAA", "CCC"]
+    assert res["vsr"].dtype == np.float64
+    assert np.array_equal(res["ts"], [0, 3700, 3800])
+    res = analytics.query_signals(prob_min=0.7, prob_max=0.9, columns=["id"], db_path=db)
+    assert list(res) == ["id"] and list(res["id"]) == [2, 3]
+    empty = analytics.query_signals(start=10**9, db_path=db)
+    assert len(empty["id"]) == 0
+
+
+def test_query_signals_arrow(tmp_path):
+    pytest.importorskip("pyarrow")
+    db = tmp_path / "pump.db"
+    make_db(db)
+    table = analytics.query_signals(as_arrow=True, db_path=db)
+    assert table.num_rows == 5
+
+
+def test_iter_signals_cursor(tmp_path):
+    db = tmp_path / "pump.db"
+    make_db(db)
+    pages = list(analytics.iter_signals(chunk_size=2, columns=["id"], db_path=db))
+    assert [list(p["id"]) for p, _ in pages] == [[1, 2], [3, 4], [5]]
+    cursor = pages[0][1]
+    rest = [list(p["id"]) for p, _ in analytics.iter_signals(chunk_size=10, columns=["id"], cursor=cursor, db_path=db)]
+    assert rest == [[3, 4, 5]]
+
+
+def test_iter_signals_rejects_unknown_columns(tmp_path):
+    db = tmp_path / "pump.db"
+    make_db(db)
+    with pytest.raises(ValueError, match="Unknown signal columns"):
+        analytics.query_signals(columns=["id", "1; DROP TABLE signals"], db_path=db)
+
+
+def test_probability_buckets_on_edges(tmp_path):
+    db = tmp_path / "pump.db"
+    storage.init_db(db)
+    conn = sqlite3.connect(db)
+    conn.executemany(
+        "INSERT INTO signals(symbol, probability, ts) VALUES('AAA', ?, 0)", [(0.3,), (0.7,), (0.69,)]
+    )
+    conn.commit()
+    conn.close()
+    buckets = analytics.probability_buckets(0.1, db_path=db)
+    assert list(buckets["bucket"]) == [0.3, 0.6, 0.7]
+    assert list(buckets["count"]) == [1, 1, 1]
+
+
+def test_sql_aggregates(tmp_path):
+    db = tmp_path / "pump.db"
+    make_db(db)
+    per_hour = analytics.signals_per_hour(db_path=db)
+    assert list(per_hour["hour"]) == [0, 3600, 7200]
+    assert list(per_hour["count"]) == [2, 2, 1]
+    buckets = analytics.probability_buckets(0.1, db_path=db)
+    assert np.allclose(buckets["bucket"], [0.6, 0.7, 0.8, 0.9])
+    assert list(buckets["count"]) == [2, 1, 1, 1]
+    stats = analytics.action_stats_per_symbol(db_path=db)
+    i = list(stats["symbol"]).index("AAA")
+    assert stats["signals"][i] == 3
+    assert stats["conversion"][i] == pytest.approx(2 / 3)
+    assert stats["hit_rate"][i] == 1.0
+    j = list(stats["symbol"]).index("BBB")
+    assert stats["hit_rate"][j] == 0.0
+
+
+def test_duckdb_over_parquet(tmp_path):
+    pytest.importorskip("duckdb")
+    pd = pytest.importorskip("pandas")
+    db = tmp_path / "pump.db"
+    make_db(db)
+    conn = sqlite3.connect(db)
+    df = pd.read_sql("SELECT * FROM signals", conn)
+    conn.close()
+    df.to_parquet(tmp_path / "signals_202501.parquet", index=False)
+    pattern = str(tmp_path / "signals_*.parquet")
+    per_hour = analytics.signals_per_hour(parquet=pattern)
+    assert list(per_hour["count"]) == [2, 2, 1]
+    buckets = analytics.probability_buckets(0.1, parquet=pattern)
+    assert list(buckets["count"]) == [2, 1, 1, 1]
@@ -0,0 +1,127 @@
+import numpy as np
+import pytest
+
+import scanner.backtest as backtest
+from scanner.features import FeatureVector
+from scanner.model import FEATURE_NAMES, LogisticModel
+from scanner.rules import is_candidate
+
+
+def record(path, n_sec=2000, symbols=("AAA", "BBB", "CCC"), seed=3):
+    rng = np.random.default_rng(seed)
+    rec = backtest.FeatureRecorder(path, flush_rows=500)
+    price = {s: 1.0 for s in symbols}
+    for t in range(n_sec):
+        for k, s in enumerate(symbols):
+            pumping = s == "AAA" and 600 <= t < 700 or s == "BBB" and 1500 <= t < 1550
+            price[s] *= 1.002 if pumping else 1 + rng.normal(0, 0.0005)
+            fv = FeatureVector(
+                s,
+                float(rng.uniform(4, 8) if pumping else rng.uniform(0, 5)),
+                float(rng.uniform(0.01, 0.05) if pumping else rng.normal(0, 0.01)),
+                float(rng.uniform(0.1, 0.4)),
+                0.0,
+                float(rng.uniform(0.001, 0.01)),
+                float(10_000 + t),
+                True,
+            )
+            rec.append(fv, price[s], ts=1_700_000_000 + t)
+    rec.flush()
+    return backtest.FeatureDataset.open(path)
+
+
+def test_recorder_roundtrip(tmp_path):
+    data = record(tmp_path / "features", n_sec=100)
+    assert len(data) == 300
+    assert data.names == backtest.RECORDED_FEATURES
+    assert data.symbols == ["AAA", "BBB", "CCC"]
+    assert isinstance(data.X, np.memmap)
+    assert data.ts[3] == 1_700_000_001 and data.symbol[4] == 1
+    # appending to an existing directory keeps symbol ids
+    rec = backtest.FeatureRecorder(tmp_path / "features")
+    rec.append(FeatureVector("CCC", 1, 0, 0, 0, 0, 0, True), 1.0, ts=1_700_000_100)
+    rec.flush()
+    data = backtest.FeatureDataset.open(tmp_path / "features")
+    assert len(data) == 301 and data.symbol[-1] == 2
+
+
+def test_labels_use_same_symbol_horizon(tmp_path):
+    data = record(tmp_path / "features")
+    labels = data.labels(horizon_sec=60, target=0.05)
+    aaa = np.flatnonzero(labels & (np.asarray(data.symbol) == 0))
+    assert len(aaa) and data.ts[aaa].min() >= 1_700_000_000 + 540
+    assert data.ts[aaa].max() < 1_700_000_000 + 700
+    # cached copy is reused
+    assert (tmp_path / "features" / "labels_60_0.05.npy").exists()
+    assert np.array_equal(data.labels(horizon_sec=60, target=0.05), labels)
+
+
+def test_candidate_mask_matches_rules():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(500, len(FEATURE_NAMES)))
+    cfg = {"vsr": 0.1, "pm": -0.2, "obi": 0.0, "spread": 0.5, "listing_age_min": -1}
+    mask = backtest.candidate_mask(X, FEATURE_NAMES, cfg)
+    expected = [is_candidate(FeatureVector("X", *row, True), cfg) for row in X]
+    assert mask.tolist() == expected
+
+
+def test_candidate_mask_optional_market_rules():
+    names = (*FEATURE_NAMES, "vsr_rel", "market_breadth")
+    X = np.array([[1, 1, 1, 0, 0, 1, 3.0, 0.2], [1, 1, 1, 0, 0, 1, 1.0, 0.2], [1, 1, 1, 0, 0, 1, 3.0, 0.9]])
+    assert backtest.candidate_mask(X[:, :6], FEATURE_NAMES, {}).all()
+    mask = backtest.candidate_mask(X, names, {"vsr_rel": 2.0, "max_breadth": 0.5})
+    assert mask.tolist() == [True, False, False]
+    with pytest.raises(ValueError, match="vsr_rel"):
+        backtest.candidate_mask(X[:, :6], FEATURE_NAMES, {"vsr_rel": 2.0})
+
+
+def test_recorded_optional_features_replay(tmp_path):
+    rec = backtest.FeatureRecorder(tmp_path / "features")
+    fv = FeatureVector("AAA", 6.0, 0.03, 0.3, 0.0, 0.001, 3600.0, True, vsr_rel=3.0, mom_1m=0.02)
+    rec.append(fv, 1.0, ts=1_700_000_000)
+    rec.flush()
+    data = backtest.FeatureDataset.open(tmp_path / "features")
+    X = np.asarray(data.X, dtype=float)
+    assert backtest.candidate_mask(X, data.names, {"vsr_rel": 2.0}).tolist() == [True]
+    assert backtest.candidate_mask(X, data.names, {"rule": "mom_1m > 0.01"}).tolist() == [True]
+    # a recording made with the core features only keeps its layout
+    old = backtest.FeatureRecorder(tmp_path / "old", FEATURE_NAMES)
+    old.append(fv, 1.0, ts=1_700_000_000)
+    old.flush()
+    assert backtest.FeatureRecorder(tmp_path / "old").names == FEATURE_NAMES
+    with pytest.raises(ValueError, match="mom_1m"):
+        backtest.feature_index(FEATURE_NAMES, ["vsr", "mom_1m"])
+
+
+def test_sweep_reports_precision_recall(tmp_path):
+    data = record(tmp_path / "features")
+    model = LogisticModel(-5.0, {"vsr": 0.6, "pm": 60.0}, {}, normalize=False)
+    grid = {"vsr": [1, 4, 6], "pm": [0.0, 0.01], "prob_threshold": [0.3, 0.9]}
+    base = {"obi": 0, "spread": 0.02, "listing_age_min": 0}
+    results = backtest.sweep(data, model, grid, base, horizon_sec=60, target=0.05, workers=1)
+    assert len(results) == 12
+
+    best = next(
+        r for r in results if r["vsr"] == 6 and r["pm"] == 0.01 and r["prob_threshold"] == 0.3
+    )
+    assert best["recall"] == 1.0
+    assert best["precision"] == 1.0
+    assert best["alerts"] == 2
+    assert best["alerts_per_day"] == pytest.approx(best["alerts"] / data.days)
+    loose = next(
+        r for r in results if r["vsr"] == 1 and r["pm"] == 0.0 and r["prob_threshold"] == 0.3
+    )
+    assert loose["alerts"] > best["alerts"]
+    assert loose["precision"] < best["precision"]
+
+    parallel = backtest.sweep(data, model, grid, base, horizon_sec=60, target=0.05, workers=2)
+    key = lambda r: (r["vsr"], r["pm"], r["prob_threshold"])
+    assert sorted(parallel, key=key) == sorted(results, key=key)
+
+
+def test_candidate_mask_rule_expression():
+    rng = np.random.default_rng(1)
+    X = rng.uniform(0, 1, (200, len(FEATURE_NAMES)))
+    col = {n: i for i, n in enumerate(FEATURE_NAMES)}
+    mask = backtest.candidate_mask(X, FEATURE_NAMES, {"vsr": 99, "rule": "vsr > 0.5 and pm < 0.3"})
+    assert mask.tolist() == ((X[:, col["vsr"]] > 0.5) & (X[:, col["pm"]] < 0.3)).tolist()
@@ -0,0 +1,129 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+import scanner.storage as storage
+from scanner.bus import EventBus, SignalEvent
+from scanner.features import FeatureVector
+from scanner.outcomes import OutcomeTracker
+from scanner.sinks import OutcomeSink, StorageSink, metrics_sink
+
+
+def event(signal_id, symbol="AAA", profile="default"):
+    fv = FeatureVector(symbol, 6.0, 0.03, 0.2, 0.0, 0.004, 3600.0, True)
+    return SignalEvent(signal_id, fv, 0.8, 0.0, profile, 1_700_000_000.0, price=1.5, thresholds={"vsr": 5})
+
+
+def test_slow_sink_does_not_delay_others():
+    bus = EventBus()
+    fast, slow = [], []
+    release = asyncio.Event()
+
+    async def slow_sink(ev):
+        await release.wait()
+        slow.append(ev)
+
+    async def run():
+        bus.subscribe("fast", fast.append)
+        bus.subscribe("slow", slow_sink, queue_size=2)
+        bus.start()
+        for i in range(5):
+            await asyncio.wait_for(bus.publish(i), 0.1)
+        await asyncio.sleep(0.01)
+        assert fast == [0, 1, 2, 3, 4]
+        release.set()
+        await bus.stop()
+
+    asyncio.run(run())
+    # the slow sink took event 0 before blocking and kept the newest two
+    assert slow == [0, 3, 4]
+    assert bus.subscribers[1].dropped == 2
+
+
+def test_drop_newest_and_block_policies():
+    bus = EventBus({"queue_size": 1, "sinks": {"new": {"policy": "drop_newest"}}})
+    got = {"new": [], "block": []}
+
+    async def run():
+        bus.subscribe("new", got["new"].append)
+        bus.subscribe("block", got["block"].append, policy="block")
+        for i in range(3):
+            if i == 0:
+                await bus.publish(i)
+            else:
+                # the blocking sink has no worker yet, so publishing waits
+                with pytest.raises(asyncio.TimeoutError):
+                    await asyncio.wait_for(bus.publish(i), 0.01)
+        bus.start()
+        await bus.stop()
+
+    asyncio.run(run())
+    assert got["new"] == [0]
+    assert got["block"] == [0]
+
+
+def test_sink_errors_are_isolated():
+    bus = EventBus()
+    seen = []
+
+    def broken(ev):
+        raise RuntimeError("boom")
+
+    async def run():
+        bus.subscribe("broken", broken)
+        bus.subscribe("ok", seen.append)
+        bus.start()
+        await bus.publish(1)
+        await bus.publish(2)
+        await bus.stop()
+
+    asyncio.run(run())
+    assert seen == [1, 2]
+    assert bus.subscribers[0].errors == 2
+
+
+def test_invalid_policy():
+    with pytest.raises(ValueError):
+        EventBus({"policy": "later"}).subscribe("x", print)
+
+
+def test_storage_and_outcome_sinks(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "_DATA_DIR", tmp_path)
+    db = tmp_path / "pump.db"
+    assert storage.max_signal_id(db) == 0
+    pinned = {}
+    tracker = OutcomeTracker(lambda s: 1.0, db_path=db)
+
+    async def run():
+        bus = EventBus()
+        bus.subscribe("storage", StorageSink(db))
+        bus.subscribe("metrics", metrics_sink)
+        bus.subscribe("outcomes", OutcomeSink(tracker, lambda s, ttl: pinned.__setitem__(s, ttl)))
+        bus.start()
+        await bus.publish([event(7), event(8, "BBB", "aggressive")])
+        await bus.stop()
+        assert not any(s.errors for s in bus.subscribers)
+
+    asyncio.run(run())
+    conn = sqlite3.connect(db)
+    rows = conn.execute("SELECT id, symbol, profile, ts FROM signals ORDER BY id").fetchall()
+    conn.close()
+    assert rows == [(7, "AAA", "default", 1_700_000_000), (8, "BBB", "aggressive", 1_700_000_000)]
+    assert storage.max_signal_id(db) == 8
+    assert len(tracker._due) == 2 * len(tracker.horizons)
+    assert pinned["AAA"] == tracker.max_horizon + tracker.grace_sec
+
+
+def test_reserved_signal_ids_never_collide(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "_DATA_DIR", tmp_path)
+    db = tmp_path / "pump.db"
+    assert storage.reserve_signal_ids(2, db) == 1
+    # a second scanner on the same database continues after the reservation
+    assert storage.reserve_signal_ids(1, db) == 3
+    StorageSink(db).write([event(1)])
+    assert storage.reserve_signal_ids(1, db) == 4
+    # rows written without a reserved id are numbered after every reservation
+    fv = FeatureVector("CCC", 6.0, 0.03, 0.2, 0.0, 0.01, 1000.0, True)
+    assert storage.save_signal(fv, 0.9, db) == 5
+    assert storage.reserve_signal_ids(1, db) == 6
@@ -0,0 +1,36 @@
+from scanner.candles import CandleAccumulator, candle_start
+
+
+def test_candle_start_parses_milliseconds():
+    assert candle_start({"t": 1700000000000}) == 1700000000.0
+    assert candle_start({"t": "1700000001"}) == 1700000001.0
+    assert candle_start({"c": "1"}) is None
+
+
+def test_cumulative_updates_close_once():
+    acc = CandleAccumulator()
+    assert acc.update("AAA", 10, 1.0, 5) is None
+    assert acc.update("AAA", 10, 1.1, 8) is None
+    assert acc.update("AAA", 10, 1.2, 12) is None
+    closed = acc.update("AAA", 11, 1.3, 2)
+    assert (closed.start, closed.close, closed.volume) == (10, 1.2, 12)
+    assert acc.current("AAA").volume == 2
+
+
+def test_duplicate_and_late_pushes_ignored():
+    acc = CandleAccumulator()
+    acc.update("AAA", 10, 1.0, 5)
+    assert acc.update("AAA", 10, 1.0, 5) is None  # repeated push
+    assert acc.update("AAA", 10, 1.0, 3) is None  # stale, lower cumulative
+    acc.update("AAA", 11, 1.0, 1)
+    assert acc.update("AAA", 10, 1.0, 9) is None  # candle already closed
+    assert acc.duplicates == 3
+    assert acc.update("AAA", 11, 1.1, 1) is None  # price-only update is kept
+    assert acc.current("AAA").close == 1.1
+
+
+def test_pushes_without_open_time_are_intervals():
+    acc = CandleAccumulator()
+    assert acc.update("AAA", None, 1.0, 5).volume == 5
+    assert acc.update("AAA", None, 1.0, 5).volume == 5
+    assert acc.duplicates == 0
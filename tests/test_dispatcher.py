@@ -0,0 +1,165 @@
+import asyncio
+import time
+
+from aiohttp import web
+from telegram import Bot
+
+from scanner.dispatcher import AlertDispatcher, TokenBucket
+
+
+class FakeBotAPI:
+    """Local stand-in for the Telegram Bot API ``sendMessage`` method."""
+
+    def __init__(self, flood_chats=(), delay=0.0):
+        self.flood_chats = set(flood_chats)
+        self.delay = delay
+        self.received = []
+        self.flooded = []
+
+    async def handle(self, request):
+        data = await request.post() if request.content_type != "application/json" else await request.json()
+        chat_id = int(data["chat_id"])
+        if chat_id in self.flood_chats:
+            self.flood_chats.discard(chat_id)
+            self.flooded.append(chat_id)
+            return web.json_response(
+                {
+                    "ok": False,
+                    "error_code": 429,
+                    "description": "Too Many Requests: retry after 1",
+                    "parameters": {"retry_after": 1},
+                },
+                status=429,
+            )
+        await asyncio.sleep(self.delay)
+        self.received.append((chat_id, data["text"], time.monotonic()))
+        return web.json_response(
+            {
+                "ok": True,
+                "result": {
+                    "message_id": len(self.received),
+                    "date": int(time.time()),
+                    "chat": {"id": chat_id, "type": "private"},
+                    "text": data["text"],
+                },
+            }
+        )
+
+    async def get_me(self, request):
+        return web.json_response(
+            {"ok": True, "result": {"id": 1, "is_bot": True, "first_name": "fake", "username": "fake_bot"}}
+        )
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post("/botTOKEN/getMe", self.get_me)
+        app.router.add_post("/botTOKEN/sendMessage", self.handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}/bot"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+
+async def _with_fake_api(api, body):
+    base_url = await api.start()
+    bot = Bot("TOKEN", base_url=base_url)
+    await bot.initialize()
+    try:
+        return await body(bot)
+    finally:
+        await bot.shutdown()
+        await api.stop()
+
+
+def test_token_bucket_rate():
+    bucket = TokenBucket(rate=10, capacity=1)
+
+    async def take():
+        start = time.monotonic()
+        for _ in range(4):
+            await bucket.acquire()
+        return time.monotonic() - start
+
+    elapsed = asyncio.run(take())
+    assert elapsed >= 0.25
+
+
+def test_dispatcher_concurrent_fanout():
+    api = FakeBotAPI(delay=0.2)
+
+    async def body(bot):
+        disp = AlertDispatcher(bot, global_rate=100, per_chat_rate=10)
+        start = time.monotonic()
+        disp.submit(range(1, 6), "pump")
+        submitted = time.monotonic() - start
+        await disp.join()
+        elapsed = time.monotonic() - start
+        await disp.stop()
+        return submitted, elapsed, disp
+
+    submitted, elapsed, disp = asyncio.run(_with_fake_api(api, body))
+    assert submitted < 0.05
+    assert sorted(c for c, _, _ in api.received) == [1, 2, 3, 4, 5]
+    assert elapsed < 0.2 * 5
+    assert disp.sent == 5
+
+
+def test_dispatcher_per_chat_limit():
+    api = FakeBotAPI()
+
+    async def body(bot):
+        disp = AlertDispatcher(bot, global_rate=100, per_chat_rate=5)
+        for i in range(8):
+            disp.submit([1], f"m{i}")
+        await disp.join()
+        await disp.stop()
+
+    asyncio.run(_with_fake_api(api, body))
+    texts = [t for _, t, _ in api.received]
+    assert texts == [f"m{i}" for i in range(8)]
+    # the bucket holds 5 tokens; later sends wait 1 / 5 s for a new one
+    sent = [ts for _, _, ts in api.received]
+    gaps = [b - a for a, b in zip(sent[4:], sent[5:])]
+    assert all(gap >= 0.2 * 0.9 for gap in gaps)
+    assert sent[-1] - sent[0] >= 3 * 0.2 * 0.9
+
+
+def test_dispatcher_retries_after_429():
+    api = FakeBotAPI(flood_chats=[7])
+
+    async def body(bot):
+        disp = AlertDispatcher(bot, global_rate=100, per_chat_rate=10)
+        start = time.monotonic()
+        disp.submit([7, 8], "pump")
+        await disp.join()
+        elapsed = time.monotonic() - start
+        await disp.stop()
+        return elapsed, disp
+
+    elapsed, disp = asyncio.run(_with_fake_api(api, body))
+    assert api.flooded == [7]
+    assert sorted(c for c, _, _ in api.received) == [7, 8]
+    assert elapsed >= 1.0
+    assert disp.sent == 2 and disp.failed == 0
+
+
+def test_dispatcher_drops_when_queue_full():
+    class SlowBot:
+        async def send_message(self, **kwargs):
+            await asyncio.sleep(10)
+
+    async def body():
+        disp = AlertDispatcher(SlowBot(), max_queue=2)
+        for _ in range(5):
+            disp.submit([1], "x")
+        await asyncio.sleep(0)
+        size = disp._queues[1].qsize()
+        await disp.stop(timeout=0)
+        return size
+
+    assert asyncio.run(body()) <= 2
@@ -85,6 +85,19 @@ def test_stream_count(monkeypatch):
     assert mgr.stream_count == client.active_streams
 
 
+def test_stream_count_includes_deals(monkeypatch):
+    async def fake_connect(url):
+        return DummyWS()
+
+    monkeypatch.setattr(MexcWSClient, "_reader", dummy_reader)
+    monkeypatch.setattr("scanner.collector.websockets.connect", fake_connect)
+    client = MexcWSClient([], trades=True)
+    run(client.connect())
+    mgr = SubscriptionManager(client, top_n=500, lru_ttl_sec=10)
+    run(mgr.ensure_subscribed([f"P{i}" for i in range(10)]))
+    assert mgr.stream_count == client.active_streams == 30
+
+
 def test_switch_latency(monkeypatch):
     times = [0]
     monkeypatch.setattr(sub_manager.time, "time", lambda: times[0])
@@ -1,9 +1,39 @@
+import asyncio
+
 import pytest
 
 import scanner.features as features
+from scanner.candles import Candle
 from scanner.collector import Tick
 
 
+class DummyClient:
+    """Client stub closing one candle per tick, like pushes without an open time."""
+
+    def __init__(self):
+        self.closed = []
+
+    def push(self, tick):
+        self.closed.append(Candle(None, float(tick.kline["c"]), float(tick.kline["quoteVol"])))
+        return tick
+
+    def drain_candles(self, symbol):
+        closed, self.closed = self.closed, []
+        return closed
+
+    def get_cum_depth(self, symbol):
+        return (100, 90)
+
+    def get_microstructure(self, symbol):
+        return None
+
+    def get_trades(self, symbol):
+        return None
+
+    def get_best(self, symbol):
+        return ((100, 1), (101, 1))
+
+
 def test_rolling_window_basic():
     rw = features.RollingWindow(2)
     rw.append(0, 1)
@@ -20,7 +50,7 @@ def test_rolling_window_basic():
 
 def test_feature_engine_update(monkeypatch):
     class NoTrimWindow(features.RollingWindow):
-        def _trim(self, now):
+        def trim(self, now):
             pass
 
     monkeypatch.setattr(features, "RollingWindow", NoTrimWindow)
@@ -28,21 +58,137 @@ def test_feature_engine_update(monkeypatch):
     times = [0]
     monkeypatch.setattr(features.time, "time", lambda: times[0])
 
-    class DummyClient:
-        def get_cum_depth(self, symbol):
-            return (100, 90)
-
-        def get_best(self, symbol):
-            return ((100, 1), (101, 1))
-
     engine = features.FeatureEngine()
+    client = DummyClient()
     tick1 = Tick(symbol="ABC", kline={"c": "100", "quoteVol": "10"}, depth={}, ts=0)
-    fv1 = engine.update(tick1, DummyClient())
+    fv1 = engine.update(client.push(tick1), client)
     assert fv1.vsr == 1.0  # only one point -> median equals sum
 
     times[0] = 1
     tick2 = Tick(symbol="ABC", kline={"c": "110", "quoteVol": "20"}, depth={}, ts=1)
-    fv2 = engine.update(tick2, DummyClient())
+    fv2 = engine.update(client.push(tick2), client)
     assert pytest.approx(fv2.vsr, rel=1e-3) == 2.0
     assert pytest.approx(fv2.pm, rel=1e-3) == 0.03125
     assert fv2.ready is False
+
+
+def test_bar_series_folds_updates():
+    bars = features.BarSeries(60, 3)
+    bars.update(0, 10, 1)
+    bars.update(30, 12, 2)
+    bars.update(59, 9, 3)
+    cur = bars.current
+    assert (cur.open, cur.high, cur.low, cur.close, cur.volume, cur.updates) == (10, 12, 9, 9, 6, 3)
+    assert len(bars.closed) == 0
+
+    for minute in range(1, 5):
+        bars.update(minute * 60, 10 + minute, minute)
+    assert len(bars.closed) == 3  # oldest bar dropped
+    assert list(bars.array("close")) == [11, 12, 13]
+    assert bars.prev_close() == 13
+    assert bars.first_start() == 60
+
+
+def test_bar_resampler_features():
+    rs = features.BarResampler()
+    for t in range(0, 7 * 60):
+        minute = t // 60
+        # volume doubles in the last closed minute, price steps every minute
+        rs.update(t, 100 + minute, 20 if minute == 5 else 10)
+    assert len(rs.m1.closed) == 6 and len(rs.m5.closed) == 1
+    assert rs.volume_rate_median() == 10
+    assert rs.volume_acceleration() == pytest.approx(2.0)
+    assert rs.momentum(rs.m1, 107) == pytest.approx(107 / 105 - 1)
+    assert rs.momentum(rs.m5, 107) == pytest.approx(107 / 104 - 1)
+    assert rs.momentum(rs.h1, 107) == 0.0
+    assert rs.volatility() > 0
+    assert not rs.covers(7 * 60, 21600)
+
+
+def test_feature_engine_six_hour_bars(monkeypatch):
+    times = [0]
+    monkeypatch.setattr(features.time, "time", lambda: times[0])
+
+    engine = features.FeatureEngine()
+    client = DummyClient()
+    for t in range(0, 21600, 5):
+        times[0] = t
+        engine.update(client.push(Tick(symbol="ABC", kline={"c": "100", "quoteVol": "10"}, depth={}, ts=t)), client)
+    times[0] = 21600
+    tick = Tick(symbol="ABC", kline={"c": "101", "quoteVol": "10"}, depth={}, ts=21600)
+    fv = engine.update(client.push(tick), client)
+    assert fv.ready is True
+    assert len(engine._bars["ABC"].m1.closed) == 360
+    # 60 updates of 10 in the 5m window over a median of 10 per update
+    assert fv.vsr == pytest.approx(61.0)
+    assert fv.mom_1h == pytest.approx(0.01)
+
+
+def test_feature_engine_reads_candles_closed_by_client(monkeypatch):
+    from scanner.collector import MexcWSClient
+
+    monkeypatch.setattr(features.time, "time", lambda: 0)
+    client = MexcWSClient(["ABC"])
+    engine = features.FeatureEngine()
+    pushes = [(1000, "10", "4"), (1000, "11", "10"), (1000, "11", "10"), (2000, "12", "5"), (3000, "12", "1")]
+
+    async def feed():
+        # the mailbox merged these pushes into one tick: the engine runs once
+        for t, c, q in pushes:
+            client._update_kline("ABC", {"t": t, "c": c, "quoteVol": q})
+        return engine.update(Tick(symbol="ABC", kline={"t": 3000, "c": "12", "quoteVol": "1"}, depth={}, ts=0), client)
+
+    fv = asyncio.run(feed())
+    # candles of 10 and 5 closed; the open third candle is not counted yet
+    assert [float(v) for v in engine._vol_5m["ABC"].values()] == [10.0, 5.0]
+    assert client._candles.duplicates == 1
+    assert fv.vsr == pytest.approx(15 / 7.5)
+    assert client.drain_candles("ABC") == []
+    engine.forget("ABC")
+    assert "ABC" not in engine._vol_5m and "ABC" not in engine._bars and "ABC" not in engine._first_seen
+
+
+def test_feature_engine_book_features(monkeypatch):
+    from scanner.collector import MexcWSClient
+
+    times = [0]
+    monkeypatch.setattr(features.time, "time", lambda: times[0])
+    client = MexcWSClient(["ABC"])
+    client._update_depth("ABC", {"b": [["99.99", "3"]], "a": [["100.01", "1"]]})
+    engine = features.FeatureEngine()
+    tick = Tick(symbol="ABC", kline={"c": "100", "quoteVol": "10"}, depth={}, ts=0)
+    fv = engine.update(tick, client)
+    assert fv.obi == pytest.approx(0.5)
+    assert fv.imbalance_10bp == pytest.approx(0.5)
+    assert fv.microprice_dev > 0
+    assert fv.ofi == 0.0
+
+    times[0] = 1
+    client._update_depth("ABC", {"b": [["99.99", "5"]], "a": []})
+    fv = engine.update(tick, client)
+    assert fv.ofi == pytest.approx(2 / 6)
+
+
+def test_feature_engine_trade_features(monkeypatch):
+    from scanner.collector import MexcWSClient
+    from scanner.trades import TradeAggregator
+
+    times = [10.0]
+    monkeypatch.setattr(features.time, "time", lambda: times[0])
+    client = MexcWSClient(["ABC"], trades=True, large_trade_usd=500)
+    client._update_depth("ABC", {"b": [["99.99", "3"]], "a": [["100.01", "1"]]})
+    client._trades["ABC"] = agg = TradeAggregator(500)
+    agg.add_deals(
+        [{"p": "100", "v": "6", "S": 1, "t": 8000}, {"p": "98", "v": "2", "S": 2, "t": 9000}], now=9
+    )
+    engine = features.FeatureEngine()
+    fv = engine.update(Tick(symbol="ABC", kline={"c": "101", "quoteVol": "10"}, depth={}, ts=0), client)
+    assert fv.trade_count_1m == 2
+    assert fv.buy_ratio == pytest.approx(600 / 796)
+    assert fv.large_trades_1m == 1
+    assert fv.avg_trade_usd == pytest.approx(398)
+    assert fv.trade_vwap_dev == pytest.approx(101 / (796 / 8) - 1)
+
+    times[0] = 80.0  # both seconds fall out of the 1m window
+    fv = engine.update(Tick(symbol="ABC", kline={"c": "101", "quoteVol": "10"}, depth={}, ts=0), client)
+    assert fv.trade_count_1m == 0
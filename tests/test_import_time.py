@@ -0,0 +1,18 @@
+import pytest
+
+import scanner
+from benchmarks.import_time import BUDGETS_MS, loaded_heavy_modules
+
+
+@pytest.mark.parametrize("module", sorted(BUDGETS_MS))
+def test_light_imports_skip_heavy_dependencies(module):
+    assert loaded_heavy_modules(module) == []
+
+
+def test_lazy_attributes_resolve():
+    assert scanner.Scanner.__name__ == "Scanner"
+    assert callable(scanner.load_config)
+    assert scanner.scanner.Scanner is scanner.Scanner
+    assert "fetch_all_pairs" in dir(scanner)
+    with pytest.raises(AttributeError):
+        scanner.does_not_exist
@@ -1,6 +1,7 @@
 import asyncio
 
 import scanner
+from scanner.candles import Candle
 from scanner.collector import Tick
 import scanner.features as features
 import config
@@ -9,22 +10,37 @@ import config
 class FakeClient:
     def __init__(self, ticks):
         self._ticks = ticks
+        self._closed = {}
 
     async def connect(self):
         return None
 
-    async def yield_ticks(self):
+    async def yield_batches(self):
         for t in self._ticks:
             _time[0] = t.ts
+            # every tick closes one candle
+            self._closed[t.symbol] = [Candle(None, float(t.kline["c"]), float(t.kline["quoteVol"]))]
             await asyncio.sleep(0)
-            yield t
+            yield [t]
+
+    def drain_candles(self, symbol):
+        return self._closed.pop(symbol, [])
 
     def get_best(self, symbol):
         return ((99.0, 1.0), (100.0, 1.0))
 
+    def get_mid(self, symbol):
+        return 99.5
+
     def get_cum_depth(self, symbol):
         return (100.0, 90.0)
 
+    def get_microstructure(self, symbol):
+        return None
+
+    def get_trades(self, symbol):
+        return None
+
 
 def test_scanner_alert_generation(monkeypatch):
     cfg = {
@@ -53,7 +69,7 @@ def test_scanner_alert_generation(monkeypatch):
     monkeypatch.setattr(scanner.scanner, "MexcWSClient", lambda symbols, ws_url=None: FakeClient(ticks))
 
     class NoTrim(features.RollingWindow):
-        def _trim(self, now):
+        def trim(self, now):
             pass
 
     monkeypatch.setattr(features, "RollingWindow", NoTrim)
@@ -65,7 +81,7 @@ def test_scanner_alert_generation(monkeypatch):
 
     async def collect():
         res = []
-        async for fv, prob, ts in sc.run():
+        async for fv, prob, ts, profile in sc.run():
             res.append(prob)
             break
         return res
@@ -104,6 +120,7 @@ def test_scanner_dynamic_subscription(monkeypatch):
     class DummyManager:
         def __init__(self, *a, **k):
             self.calls = []
+            self.remove_listeners = []
 
         async def ensure_subscribed(self, pairs):
             self.calls.append(list(pairs))
@@ -112,7 +129,7 @@ def test_scanner_dynamic_subscription(monkeypatch):
     monkeypatch.setattr(scanner.scanner, "SubscriptionManager", DummyManager)
 
     class NoTrim(features.RollingWindow):
-        def _trim(self, now):
+        def trim(self, now):
             pass
 
     monkeypatch.setattr(features, "RollingWindow", NoTrim)
@@ -128,3 +145,57 @@ def test_scanner_dynamic_subscription(monkeypatch):
 
     asyncio.run(collect())
     assert sc.sub_manager.calls and sc.sub_manager.calls[0] == ["NEW"]
+
+
+def test_scanner_regime_streams_reference_pairs(monkeypatch):
+    cfg = {
+        "mexc": {"ws_url": "wss://test"},
+        "scanner": {"prob_threshold": 0.5, "metrics": {}},
+        "regime": {"enabled": True, "btc": "BTCUSDT", "eth": "ETHUSDT"},
+    }
+    monkeypatch.setattr(config, "load_config", lambda: cfg)
+    monkeypatch.setattr(scanner.scanner, "MexcWSClient", lambda symbols, ws_url=None: FakeClient([]))
+
+    sc = scanner.Scanner(["ABC", "BTCUSDT"])
+    assert sc.symbols == ["ABC", "BTCUSDT", "ETHUSDT"]
+    assert {"BTCUSDT", "ETHUSDT"} <= set(sc.sub_manager.pinned)
+    assert sc.market.reference == ("BTCUSDT", "ETHUSDT")
+
+
+def test_scanner_publishes_signal_events(monkeypatch):
+    cfg = {
+        "mexc": {"ws_url": "wss://test"},
+        "scanner": {"prob_threshold": 0.5, "metrics": {"vsr": 5}},
+        "bus": {"sinks": {"storage": {"queue_size": 1}}},
+    }
+    monkeypatch.setattr(config, "load_config", lambda: cfg)
+    monkeypatch.setattr(scanner.scanner, "MexcWSClient", lambda symbols, ws_url=None: FakeClient([]))
+    monkeypatch.setattr(config, "get_thresholds", lambda: cfg["scanner"]["metrics"])
+    reserved = []
+    monkeypatch.setattr(scanner.scanner, "reserve_signal_ids", lambda count: reserved.append(count) or 42)
+
+    sc = scanner.Scanner(["ABC"])
+    assert [s.name for s in sc.bus.subscribers] == ["storage", "metrics"]
+    assert sc.bus.subscribers[0].queue.maxsize == 1
+    assert sc.bus.subscribers[0].policy == "drop_oldest"
+    sc.latest = {"ABC": None, "XYZ": None}
+    for listener in sc.sub_manager.remove_listeners:
+        listener(["XYZ"])
+    assert list(sc.latest) == ["ABC"]
+    received = []
+    sc.bus.subscribers = [sc.bus.subscribers[1]]
+    sc.bus.subscribe("probe", received.append)
+    fv = features.FeatureVector("ABC", 6.0, 0.03, 0.2, 0.0, 0.01, 1000.0, True)
+
+    async def run():
+        sc.bus.start()
+        await sc.publish([(fv, 0.7, 0.0, "default"), (fv, 0.8, 0.0, "default")])
+        await sc.publish([(fv, 0.9, 0.0, "default")])
+        await sc.bus.stop()
+
+    asyncio.run(run())
+    batch, second = received
+    assert [ev.id for ev in batch] == [42, 43] and second[0].id == 44
+    # one database round-trip serves a block of ids
+    assert reserved == [sc.ID_BLOCK]
+    assert batch[0].price == 99.5 and batch[0].thresholds == {"vsr": 5, "prob_threshold": 0.5}
@@ -0,0 +1,101 @@
+import asyncio
+import json
+
+import numpy as np
+import websockets
+
+from scanner.collector import MexcWSClient
+from scanner.mexc_sim import MarketGenerator, MexcStandIn, Scenario
+
+
+def test_generator_pumps_and_gaps():
+    gen = MarketGenerator(Scenario(symbols=500, pump_rate=0.01, gap_rate=0.01, seed=1))
+    start = gen.price.copy()
+    live = None
+    for t in range(1, 61):
+        live = gen.step(1000.0 + t)
+    assert gen.pumps_started > 0
+    pumping = gen.pump_until > gen.now
+    assert (gen.price[pumping] / start[pumping]).mean() > (gen.price[~pumping] / start[~pumping]).mean()
+    assert not live.all()
+    assert len(gen.tickers()) == 500
+    depth = gen.depth(0)
+    assert float(depth["b"][0][0]) < gen.price[0] < float(depth["a"][0][0])
+
+
+def test_stand_in_protocol():
+    async def scenario():
+        async with MexcStandIn(Scenario(symbols=20, rate_hz=50, max_streams_per_conn=4)) as server:
+            async with websockets.connect(server.ws_url) as ws:
+                name = server.market.names[0]
+                await ws.send(json.dumps({"method": "SUBSCRIPTION", "params": [f"{name}@kline_1s", f"{name}@depth.diff"], "id": 1}))
+                ack = json.loads(await ws.recv())
+                assert ack["code"] == 0 and ack["id"] == 1
+                streams = set()
+                while len(streams) < 2:
+                    msg = json.loads(await ws.recv())
+                    streams.add(msg["stream"])
+                    assert msg["data"]["s"] == name
+                assert streams == {f"{name}@kline_1s", f"{name}@depth.diff"}
+
+                params = [f"{s}@kline_1s" for s in server.market.names[1:4]]
+                await ws.send(json.dumps({"method": "SUBSCRIPTION", "params": params, "id": 2}))
+                while True:
+                    msg = json.loads(await ws.recv())
+                    if msg.get("id") == 2:
+                        break
+                assert msg["code"] == 1 and server.rejected == 1
+
+    asyncio.run(scenario())
+
+
+def test_client_resubscribes_after_disconnect(monkeypatch):
+    async def scenario():
+        async with MexcStandIn(Scenario(symbols=40, rate_hz=20)) as server:
+            symbols = server.market.names[:20]
+            client = MexcWSClient(symbols, server.ws_url)
+            await client.connect()
+            assert len(client._conns) == 2
+
+            async def collect(n):
+                seen = set()
+                async for tick in client.yield_ticks():
+                    seen.add(tick.symbol)
+                    if len(seen) >= n:
+                        return seen
+
+            assert len(await asyncio.wait_for(collect(20), 5)) == 20
+            assert client.get_mid(symbols[0]) is not None
+
+            await server.conns[0].ws.close()
+            await asyncio.sleep(0.2)
+            # reconnect after the 1s backoff restores the dropped streams
+            await asyncio.wait_for(collect(20), 5)
+            assert sum(c.stream_count for c in server.conns) == 40
+            assert client.messages_received > 0
+            for task in client._tasks:
+                task.cancel()
+            await asyncio.gather(*client._tasks, return_exceptions=True)
+            for ws in client._conns:
+                await ws.close()
+
+    asyncio.run(scenario())
+
+
+def test_client_aggregates_deals_stream():
+    async def scenario():
+        async with MexcStandIn(Scenario(symbols=5, rate_hz=20)) as server:
+            symbols = server.market.names[:5]
+            client = MexcWSClient(symbols, server.ws_url, trades=True)
+            await client.connect()
+            await asyncio.sleep(0.5)
+            assert sum(c.stream_count for c in server.conns) == 15
+            agg = client.get_trades(symbols[0])
+            assert agg is not None and agg.trades > 0
+            for task in client._tasks:
+                task.cancel()
+            await asyncio.gather(*client._tasks, return_exceptions=True)
+            for ws in client._conns:
+                await ws.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,43 @@
+import pytest
+
+from scanner.collector import MexcWSClient
+from scanner.microstructure import Microstructure
+
+
+def test_band_imbalance_microprice_and_slope():
+    micro = Microstructure()
+    bids = [(99.99, 3.0), (99.96, 1.0), (99.92, 4.0)]
+    asks = [(100.01, 1.0), (100.04, 1.0), (100.08, 2.0)]
+    f = micro.update(bids, asks)
+    assert f.mid == pytest.approx(100.0)
+    assert f.imbalance_l1 == pytest.approx(0.5)
+    assert f.imbalance_5bp == pytest.approx((4 - 2) / 6)
+    assert f.imbalance_10bp == pytest.approx((8 - 4) / 12)
+    assert f.microprice == pytest.approx((100.01 * 3 + 99.99 * 1) / 4)
+    assert (f.depth_bid, f.depth_ask) == (8.0, 4.0)
+    assert f.depth_slope > 0  # more size per bp on the bid side
+    assert f.ofi == 0.0
+
+
+def test_order_flow_imbalance():
+    micro = Microstructure()
+    micro.update([(100.0, 5.0)], [(101.0, 5.0)])
+    # bid size grows at the same price: +2
+    assert micro.update([(100.0, 7.0)], [(101.0, 5.0)]).ofi == pytest.approx(2.0)
+    # ask lifted to a higher price: previous ask size leaves the book, +5
+    assert micro.update([(100.0, 7.0)], [(101.5, 3.0)]).ofi == pytest.approx(7.0)
+    # bid drops a level: previous bid size is lost, -7
+    assert micro.update([(99.5, 2.0)], [(101.5, 3.0)]).ofi == pytest.approx(0.0)
+    assert micro.update([], [(101.5, 3.0)]) is None
+
+
+def test_client_maintains_book_features():
+    client = MexcWSClient(["AAA"])
+    client._update_depth("AAA", {"b": [["99.99", "3"], ["99.5", "9"]], "a": [["100.01", "1"]]})
+    f = client.get_microstructure("AAA")
+    assert f.imbalance_l1 == pytest.approx(0.5)
+    # the level outside 0.1% of the mid is trimmed from the book
+    assert client.get_cum_depth("AAA") == (3.0, 1.0)
+    client._update_depth("AAA", {"b": [["99.99", "5"]], "a": []})
+    assert client.get_microstructure("AAA").ofi == pytest.approx(2.0)
+    assert client.get_microstructure("BBB") is None
@@ -1,4 +1,9 @@
+import json
 import math
+
+import numpy as np
+import pytest
+
 import scanner.model as model
 from scanner.features import FeatureVector
 
@@ -20,3 +25,94 @@ def test_logistic_model_predict(monkeypatch):
     x = -1 + 5 * 0.4 + 0.1 * 0.35 + 0.2 * 0.25
     expected = 1 / (1 + math.exp(-x))
     assert abs(p - expected) < 1e-6
+
+
+def _fv(**kw):
+    base = dict(symbol="ABC", vsr=5.0, pm=0.1, obi=0.2, cum_depth_delta=10.0,
+                spread=0.01, listing_age=1000.0, ready=True)
+    base.update(kw)
+    return FeatureVector(**base)
+
+
+def test_logistic_predict_batch_matches_scalar(monkeypatch):
+    monkeypatch.setattr(model, "get_thresholds", lambda: {"vsr": 2, "pm": 0.5, "obi": 1})
+    m = model.LogisticModel(-1.0, {"vsr": 0.4, "pm": 0.35, "obi": 0.25, "spread": -3.0}, model.get_thresholds())
+    fvs = [_fv(vsr=v, spread=s) for v, s in [(1.0, 0.01), (5.0, 0.02), (9.0, 0.0)]]
+    batch = m.predict_batch(model.feature_matrix(fvs, m.feature_names))
+    assert np.allclose(batch, [m.predict_proba(fv) for fv in fvs])
+
+
+def test_logistic_optional_features():
+    m = model.LogisticModel(0.0, {"vsr": 0.0, "ofi": 2.0, "unknown": 9.0}, {}, normalize=False)
+    assert m.feature_names == ("vsr", "ofi")
+    assert m.predict_proba(_fv(vsr=0.0, ofi=0.5)) == pytest.approx(1 / (1 + math.exp(-1.0)))
+
+
+def test_tree_ensemble_json(tmp_path, monkeypatch):
+    monkeypatch.setattr(model, "get_thresholds", lambda: {})
+    # tree 0: vsr < 3 -> -1 else +1 ; tree 1: pm < 0.05 -> 0 else 0.5
+    data = {
+        "type": "tree_ensemble",
+        "version": "t1",
+        "features": ["vsr", "pm"],
+        "base_score": 0.1,
+        "roots": [0, 3],
+        "feature": [0, -1, -1, 1, -1, -1],
+        "threshold": [3.0, 0, 0, 0.05, 0, 0],
+        "left": [1, -1, -1, 4, -1, -1],
+        "right": [2, -1, -1, 5, -1, -1],
+        "value": [0, -1.0, 1.0, 0, 0.0, 0.5],
+    }
+    path = tmp_path / "trees.json"
+    path.write_text(json.dumps(data))
+    m = model.load_model(path)
+    assert isinstance(m, model.TreeEnsembleModel)
+    assert m.version == "t1"
+    out = m.predict_batch(np.array([[1.0, 0.0], [4.0, 0.0], [4.0, 0.1]]))
+    margins = np.array([0.1 - 1.0, 0.1 + 1.0, 0.1 + 1.5])
+    assert np.allclose(out, 1 / (1 + np.exp(-margins)))
+    assert model.load_model(path) is m
+    assert abs(m.predict_proba(_fv(vsr=4.0, pm=0.1)) - out[2]) < 1e-9
+
+
+def test_model_cache_keeps_newest_load_per_path(tmp_path, monkeypatch):
+    thresholds = {"vsr": 5}
+    monkeypatch.setattr(model, "get_thresholds", lambda: thresholds)
+    path = tmp_path / "m.json"
+    path.write_text(json.dumps({"type": "logistic", "intercept": 0.0, "coefficients": {"vsr": 1.0}}))
+    first = model.load_model(path)
+    thresholds = {"vsr": 6}
+    second = model.load_model(path)
+    assert second is not first and model.load_model(path) is second
+    assert [m for _, m in model._CACHE.values() if m in (first, second)] == [second]
+
+
+def test_unknown_model_type(tmp_path, monkeypatch):
+    monkeypatch.setattr(model, "get_thresholds", lambda: {})
+    path = tmp_path / "m.json"
+    path.write_text(json.dumps({"type": "nope"}))
+    with pytest.raises(ValueError):
+        model.load_model(path)
+
+
+def test_onnx_model(tmp_path, monkeypatch):
+    pytest.importorskip("onnxruntime")
+    onnx = pytest.importorskip("onnx")
+    from onnx import TensorProto, helper, numpy_helper
+
+    monkeypatch.setattr(model, "get_thresholds", lambda: {})
+    w = numpy_helper.from_array(np.array([[0.5], [2.0]], dtype=np.float32), "w")
+    graph = helper.make_graph(
+        [helper.make_node("MatMul", ["x", "w"], ["z"]), helper.make_node("Sigmoid", ["z"], ["p"])],
+        "g",
+        [helper.make_tensor_value_info("x", TensorProto.FLOAT, [None, 2])],
+        [helper.make_tensor_value_info("p", TensorProto.FLOAT, [None, 1])],
+        [w],
+    )
+    proto = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)])
+    proto.ir_version = 8
+    onnx.save(proto, tmp_path / "m.onnx")
+    (tmp_path / "m.json").write_text(json.dumps({"type": "onnx", "path": "m.onnx", "features": ["vsr", "pm"]}))
+    m = model.load_model(tmp_path / "m.json")
+    out = m.predict_batch(np.array([[1.0, 0.0], [0.0, 1.0]]))
+    assert np.allclose(out, 1 / (1 + np.exp(-np.array([0.5, 2.0]))), atol=1e-6)
@@ -0,0 +1,66 @@
+import asyncio
+import json
+import sqlite3
+
+import pandas as pd
+
+import scanner.storage as storage
+from scanner.features import FeatureVector
+from scanner.outcomes import OutcomeTracker
+
+
+def make_fv(symbol="AAA"):
+    return FeatureVector(symbol, 6.0, 0.03, 0.2, 15.0, 0.004, 3600.0, True)
+
+
+def test_save_signal_full_record(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "_DATA_DIR", tmp_path)
+    db = tmp_path / "pump.db"
+    sid = storage.save_signal(
+        make_fv(), 0.8, db, price=1.5, config_hash="abc", model_version="7", thresholds={"vsr": 5},
+        profile="aggressive",
+    )
+    conn = sqlite3.connect(db)
+    conn.row_factory = sqlite3.Row
+    row = conn.execute("SELECT * FROM signals WHERE id=?", (sid,)).fetchone()
+    conn.close()
+    assert row["obi"] == 0.2 and row["cum_depth_delta"] == 15.0
+    assert row["spread"] == 0.004 and row["listing_age"] == 3600.0
+    assert row["price"] == 1.5 and row["model_version"] == "7"
+    assert json.loads(row["thresholds"]) == {"vsr": 5}
+    assert row["price_1m"] is None
+    assert row["profile"] == "aggressive"
+
+    df = pd.read_parquet(storage._parquet_path())
+    assert df.loc[0, "config_hash"] == "abc"
+    assert df.loc[0, "listing_age"] == 3600.0
+
+
+def test_tracker_samples_and_flushes(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "_DATA_DIR", tmp_path)
+    db = tmp_path / "pump.db"
+    ids = [storage.save_signal(make_fv(s), 0.7, db, price=1.0) for s in ("AAA", "BBB")]
+    prices = {"AAA": 1.1, "BBB": None}
+    tracker = OutcomeTracker(prices.get, grace_sec=30, db_path=db)
+    for sid, sym in zip(ids, ("AAA", "BBB")):
+        tracker.track(sid, sym, ts=1000)
+
+    assert tracker.sample(now=1059) == 0
+    assert tracker.sample(now=1060) == 1
+    prices["AAA"] = 1.3
+    assert tracker.sample(now=1300) == 1
+    # BBB 1m sample is past grace and dropped, 5m is retried
+    assert tracker.next_due() == 1300
+    prices["BBB"] = 0.9
+    assert tracker.sample(now=1310) == 1
+    assert asyncio.run(tracker.flush_async()) == 3
+    assert tracker.flush() == 0
+
+    conn = sqlite3.connect(db)
+    rows = dict(
+        (r[0], r[1:]) for r in conn.execute("SELECT id, price_1m, price_5m, price_15m FROM signals")
+    )
+    conn.close()
+    assert rows[ids[0]] == (1.1, 1.3, None)
+    assert rows[ids[1]] == (None, 0.9, None)
+    assert tracker.next_due() == 1900
@@ -0,0 +1,135 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+import scanner.paper as paper
+import scanner.storage as storage
+from scanner.bus import SignalEvent
+from scanner.features import FeatureVector
+from scanner.paper import PaperTrader, walk_book
+
+BIDS = [(99.0, 1.0), (98.9, 2.0)]
+ASKS = [(100.0, 0.5), (100.1, 1.0), (100.2, 5.0)]
+
+
+def event(signal_id, symbol="AAA"):
+    fv = FeatureVector(symbol, 6.0, 0.03, 0.2, 0.0, 0.004, 3600.0, True)
+    return SignalEvent(signal_id, fv, 0.8, 0.0, "default", 0.0)
+
+
+def trader(tmp_path, books=None, **kw):
+    books = books if books is not None else {"AAA": (BIDS, ASKS)}
+    kw.setdefault("fee_bps", 0.0)
+    return PaperTrader(books.get, stake_usdt=100.0, db_path=tmp_path / "pump.db", **kw)
+
+
+def test_walk_book_quote_and_qty():
+    qty, cost = walk_book(ASKS, quote=100.0)
+    assert cost == pytest.approx(100.0)
+    assert qty == pytest.approx(0.5 + 50.0 / 100.1)
+    assert walk_book(BIDS, qty=2.0) == pytest.approx((2.0, 99.0 + 98.9))
+    assert walk_book(BIDS, qty=5.0) == pytest.approx((3.0, 99.0 + 2 * 98.9))
+
+
+def test_market_entry_walks_asks_and_exits_on_take_profit(tmp_path):
+    pt = trader(tmp_path, take_profit=0.01, stop_loss=0.02)
+    pos = pt.open(event(1), now=0)
+    assert pos.status == "open"
+    assert pos.entry_price == pytest.approx(100.0 / pos.qty)
+    assert pos.slippage_bps > 0
+    pt.on_book("AAA", [(100.5, 10.0)], [(100.6, 1.0)], now=5)
+    assert pos.status == "open"
+    pt.on_book("AAA", [(101.2, 10.0)], [(101.3, 1.0)], now=6)
+    assert pos.status == "closed" and pos.exit_reason == "take_profit"
+    assert pos.pnl_usdt == pytest.approx(pos.qty * 101.2 - 100.0)
+    assert pt.open_count == 0
+
+
+def test_stop_loss_fills_beyond_visible_book_at_worst_level(tmp_path):
+    pt = trader(tmp_path, stop_loss=0.01, fee_bps=10.0)
+    pos = pt.open(event(1), now=0)
+    pt.on_book("AAA", [(98.0, 0.2), (97.9, 0.1)], [(98.1, 1.0)], now=1)
+    assert pos.exit_reason == "stop_loss"
+    proceeds = 0.2 * 98.0 + (pos.qty - 0.2) * 97.9
+    fees = (100.0 + proceeds) * 0.001
+    assert pos.pnl_usdt == pytest.approx(proceeds - 100.0 - fees)
+    assert pos.pnl_pct < -0.01
+
+
+def test_limit_entry_fills_or_times_out(tmp_path):
+    pt = trader(tmp_path, books={"AAA": (BIDS, ASKS), "BBB": (BIDS, ASKS)}, entry="limit", limit_offset_bps=20, limit_timeout_sec=30)
+    filled = pt.open(event(1), now=0)
+    stale = pt.open(event(2, "BBB"), now=0)
+    assert filled.status == "pending" and filled.limit_price == pytest.approx(99.8)
+    pt.on_book("AAA", [(99.7, 5.0)], [(99.9, 5.0)], now=5)
+    assert filled.status == "pending"
+    # the ask trades down to the limit
+    pt.on_book("AAA", [(99.7, 5.0)], [(99.8, 5.0)], now=10)
+    assert filled.status == "open" and filled.entry_price == pytest.approx(99.8)
+    assert pt.expire(now=31) == 1
+    assert stale.status == "cancelled" and stale.exit_reason == "limit_timeout"
+    assert filled.status == "open"
+
+
+def test_limit_fill_ignores_asks_above_the_limit(tmp_path):
+    pt = trader(tmp_path, entry="limit", limit_offset_bps=20)
+    pos = pt.open(event(1), now=0)
+    # only 0.3 is offered at or below 99.8; the 100.5 level is out of reach
+    pt.on_book("AAA", [(99.7, 5.0)], [(99.75, 0.1), (99.8, 0.2), (100.5, 5.0)], now=1)
+    assert pos.status == "open"
+    assert pos.qty == pytest.approx(0.3)
+    assert pos.entry_price == pytest.approx((0.1 * 99.75 + 0.2 * 99.8) / 0.3)
+
+
+def test_max_hold_exit_and_batched_flush(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "_DATA_DIR", tmp_path)
+    pinned = {}
+    pt = trader(tmp_path, max_hold_sec=60, pin=pinned.__setitem__)
+    pt([event(1), event(2)])
+    assert "AAA" in pinned and pt.open_count == 2
+    assert pt.flush() == 2
+    assert pt.expire(now=pt.positions[1].entry_ts + 61) == 2
+    assert asyncio.run(pt.flush_async()) == 2
+    assert pt.positions == {} and pt.flush() == 0
+    rows = storage.fetch_paper_trades(tmp_path / "pump.db")
+    assert [(r["signal_id"], r["status"], r["exit_reason"]) for r in rows] == [
+        (2, "closed", "max_hold"),
+        (1, "closed", "max_hold"),
+    ]
+    conn = sqlite3.connect(tmp_path / "pump.db")
+    assert conn.execute("SELECT COUNT(*) FROM paper_trades").fetchone()[0] == 2
+    conn.close()
+
+
+def test_manual_buy_and_missing_book(tmp_path):
+    pt = trader(tmp_path, books={"AAA": (BIDS, ASKS)}, auto=False)
+    pt([event(1), event(2, "BBB")])
+    assert pt.open_count == 0
+    assert pt.buy(1).status == "open"
+    assert pt.buy(1) is pt.positions[1]
+    assert pt.buy(2) is None  # no book for BBB
+    assert pt.buy(3) is None
+
+
+def test_book_updates_only_touch_the_symbols_positions(tmp_path):
+    pt = trader(tmp_path, books={"AAA": (BIDS, ASKS), "BBB": (BIDS, ASKS)})
+    a = pt.open(event(1), now=0)
+    b = pt.open(event(2, "BBB"), now=0)
+    pt.on_book("BBB", [(50.0, 10.0)], [(50.1, 1.0)], now=1)
+    assert b.exit_reason == "stop_loss" and a.status == "open"
+    pt.on_book("CCC", [(1.0, 1.0)], [(1.1, 1.0)], now=1)
+    assert list(pt._by_symbol) == ["AAA"]
+
+
+def test_failed_flush_keeps_changes(tmp_path, monkeypatch):
+    pt = trader(tmp_path)
+    pt([event(1)])
+
+    def fail(rows, db_path):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(paper, "save_paper_trades", fail)
+    with pytest.raises(OSError):
+        asyncio.run(pt.flush_async())
+    assert list(pt._dirty) == [1] and 1 in pt.positions
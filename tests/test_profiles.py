@@ -0,0 +1,113 @@
+import json
+
+import numpy as np
+import pytest
+
+import scanner.scanner as scanner_mod
+from scanner.features import FeatureVector
+from scanner.model import Model
+from scanner.profiles import load_profiles
+from scanner.ruleset import RuleError
+
+
+class CountingModel(Model):
+    version = "1"
+    feature_names = ("vsr", "pm")
+
+    def __init__(self, prob):
+        self.prob = prob
+        self.calls = 0
+
+    def predict_batch(self, matrix):
+        self.calls += 1
+        return np.full(len(matrix), self.prob)
+
+
+def fv(symbol="ABC", **kw):
+    base = dict(vsr=4.0, pm=0.03, obi=0.3, cum_depth_delta=0.0, spread=0.01, listing_age=1000.0, ready=True)
+    base.update(kw)
+    return FeatureVector(symbol, **base)
+
+
+SCANNER_CFG = {
+    "prob_threshold": 0.6,
+    "metrics": {"vsr": 5, "pm": 0.02},
+    "profiles": {
+        "aggressive": {"prob_threshold": 0.4, "metrics": {"vsr": 3}, "chat_ids": ["42"]},
+        "strict": {"rules": {"default": "vsr > 3 and pm > 0.05"}},
+    },
+}
+
+
+def test_load_profiles_merges_over_scanner_section():
+    model = CountingModel(0.5)
+    default, aggressive, strict = load_profiles(SCANNER_CFG, SCANNER_CFG["metrics"], model)
+    assert [default.name, aggressive.name, strict.name] == ["default", "aggressive", "strict"]
+    assert aggressive.thresholds == {"vsr": 3, "pm": 0.02}
+    assert aggressive.settings == {"vsr": 3, "pm": 0.02, "prob_threshold": 0.4}
+    assert aggressive.chat_ids == [42] and default.chat_ids is None
+    assert strict.prob_threshold == 0.6
+    assert all(p.model is model for p in (default, aggressive, strict))
+    assert not default.rules.check(fv()) and aggressive.rules.check(fv()) and not strict.rules.check(fv())
+
+
+def test_load_profiles_model_path(tmp_path):
+    path = tmp_path / "alt.json"
+    path.write_text(json.dumps({"type": "logistic", "intercept": 0.0, "coefficients": {"vsr": 1.0}, "version": "alt"}))
+    cfg = {"profiles": {"alt": {"model": str(path)}}}
+    _, alt = load_profiles(cfg, {}, CountingModel(0.5))
+    assert alt.model.version == "alt"
+
+
+def test_load_profiles_rejects_bad_config():
+    with pytest.raises(RuleError):
+        load_profiles({"profiles": {"x": {"rules": {"default": "vsr >"}}}}, {}, CountingModel(0.5))
+    with pytest.raises(ValueError):
+        load_profiles({"profiles": {"default": {}}}, {}, CountingModel(0.5))
+
+
+def test_evaluate_shares_predictions_between_profiles():
+    shared = CountingModel(0.5)
+    sc = scanner_mod.Scanner.__new__(scanner_mod.Scanner)
+    sc.profiles = load_profiles(
+        {**SCANNER_CFG, "profiles": {**SCANNER_CFG["profiles"], "loose": {"metrics": {"vsr": 0}, "prob_threshold": 0.1}}},
+        SCANNER_CFG["metrics"],
+        shared,
+    )
+    hits = sc.evaluate(fv())
+    assert [(p.name, prob) for p, prob in hits] == [("aggressive", 0.5), ("loose", 0.5)]
+    assert shared.calls == 1
+    assert sc.evaluate(fv(pm=0.0)) == []
+    assert shared.calls == 1
+
+
+def test_evaluate_batch_predicts_once_per_model():
+    shared, alt = CountingModel(0.5), CountingModel(0.9)
+    sc = scanner_mod.Scanner.__new__(scanner_mod.Scanner)
+    sc.profiles = load_profiles(SCANNER_CFG, SCANNER_CFG["metrics"], shared)
+    sc.profiles[2].model = alt
+    batch = [fv("AAA"), fv("BBB", pm=0.06), fv("CCC", pm=0.0)]
+    hits = sc.evaluate_batch(batch)
+    assert [[(p.name, prob) for p, prob in row] for row in hits] == [
+        [("aggressive", 0.5)],
+        [("aggressive", 0.5), ("strict", 0.9)],
+        [],
+    ]
+    assert shared.calls == 1 and alt.calls == 1
+    assert hits[0] == sc.evaluate(batch[0])
+
+
+def test_reload_with_invalid_rule_keeps_config_and_profiles(monkeypatch):
+    sc = scanner_mod.Scanner.__new__(scanner_mod.Scanner)
+    sc.config = {"scanner": SCANNER_CFG}
+    sc.model = CountingModel(0.5)
+    sc.profiles = load_profiles(SCANNER_CFG, SCANNER_CFG["metrics"], sc.model)
+    old_profiles = sc.profiles
+    monkeypatch.setattr(scanner_mod.config, "_config", sc.config)
+    bad = {"scanner": {"metrics": {"vsr": 1}, "rules": {"default": "vsr >"}}}
+    monkeypatch.setattr(scanner_mod.config, "read_config", lambda path=None: bad)
+    with pytest.raises(RuleError):
+        sc.reload_thresholds()
+    assert sc.profiles is old_profiles
+    assert sc.config["scanner"] is SCANNER_CFG
+    assert scanner_mod.config.get_thresholds() == SCANNER_CFG["metrics"]
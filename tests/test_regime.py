@@ -0,0 +1,38 @@
+import pytest
+
+from scanner.features import FeatureVector
+from scanner.regime import MarketState
+
+
+def _fv(symbol, vsr, pm, mom_5m=0.0, ready=True):
+    return FeatureVector(symbol, vsr, pm, 0.0, 0.0, 0.001, 3600.0, ready, mom_5m=mom_5m)
+
+
+def test_market_stats_once_per_interval():
+    state = MarketState(interval=1.0, stale_sec=10.0)
+    for i, (vsr, pm) in enumerate([(1.0, 0.01), (2.0, -0.01), (3.0, 0.02), (50.0, 0.1)]):
+        state.observe(_fv(f"S{i}", vsr, pm), now=100.0)
+    assert state.refreshes == 1  # first observation only
+    state.observe(_fv("BTCUSDT", 1.0, 0.0, mom_5m=-0.02), now=100.5)
+    assert state.refreshes == 1
+
+    fv = _fv("S3", 50.0, 0.1)
+    state.observe(fv, now=101.0)
+    assert state.refreshes == 2
+    assert state.stats.symbols == 5
+    assert state.stats.median_vsr == 2.0
+    assert state.stats.breadth == pytest.approx(3 / 5)
+    assert state.stats.btc_ret_5m == -0.02 and state.stats.eth_ret_5m == 0.0
+    assert fv.vsr_rel == pytest.approx(25.0)
+    assert fv.market_breadth == pytest.approx(0.6)
+
+
+def test_stale_and_unready_symbols_are_ignored():
+    state = MarketState(stale_sec=5.0, capacity=2)
+    state.observe(_fv("OLD", 100.0, 0.5), now=0.0)
+    state.observe(_fv("WARM", 100.0, 0.5, ready=False), now=9.0)
+    for i in range(3):
+        state.observe(_fv(f"S{i}", 2.0, -0.01), now=10.0)
+    state.refresh(10.0)
+    assert state.stats.symbols == 3
+    assert state.stats.median_vsr == 2.0 and state.stats.breadth == 0.0
@@ -42,3 +42,12 @@ def test_is_candidate_fail():
         "listing_age_min": 900,
     }
     assert not rules.is_candidate(fv, cfg)
+
+
+def test_market_regime_rules_are_optional():
+    fv = FeatureVector("ABC", 6.0, 0.05, 0.3, 0.0, 0.01, 1000.0, True, vsr_rel=1.2, market_breadth=0.7)
+    cfg = {"vsr": 5, "pm": 0.02, "obi": 0.25}
+    assert rules.is_candidate(fv, cfg)
+    assert not rules.is_candidate(fv, {**cfg, "vsr_rel": 2.0})
+    assert not rules.is_candidate(fv, {**cfg, "max_breadth": 0.5})
+    assert rules.is_candidate(fv, {**cfg, "vsr_rel": 1.0, "max_breadth": 0.8})
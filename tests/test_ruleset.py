@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from scanner.features import FeatureVector
+from scanner.rules import is_candidate
+from scanner.ruleset import Rule, RuleError, RuleSet, rule_from_thresholds
+
+
+def fv(symbol="ABC", **kw):
+    base = dict(vsr=6.0, pm=0.05, obi=0.3, cum_depth_delta=0.0, spread=0.01, listing_age=1000.0, ready=True)
+    base.update(kw)
+    return FeatureVector(symbol, **base)
+
+
+def test_rule_evaluates_feature_vector():
+    rule = Rule("vsr > 3 and (pm > 0.02 or imbalance_5bp > 0.3) and not spread >= 0.02")
+    assert rule.features == {"vsr", "pm", "imbalance_5bp", "spread"}
+    assert rule(fv())
+    assert rule(fv(pm=0.0, imbalance_5bp=0.5))
+    assert not rule(fv(pm=0.0))
+    assert not rule(fv(spread=0.03))
+    assert Rule("-0.01 < pm < 0.1")(fv())
+    assert not Rule("0 < pm < 0.01")(fv())
+
+
+@pytest.mark.parametrize(
+    "source",
+    ["vsr > ", "volume > 3", "vsr + 1 > 3", "vsr in (1, 2)", "f(vsr) > 1", "vsr > 'x'", "vsr"],
+)
+def test_rule_rejects_invalid_expressions(source):
+    with pytest.raises(RuleError):
+        Rule(source)
+
+
+def test_mask_matches_per_vector_check():
+    rng = np.random.default_rng(0)
+    n = 500
+    cols = {"vsr": rng.uniform(0, 8, n), "pm": rng.normal(0, 0.03, n), "obi": rng.uniform(-1, 1, n)}
+    rule = Rule("vsr > 4 and (pm > 0.01 or obi > 0.5)")
+    mask = rule.mask(cols)
+    expected = [rule(fv(vsr=cols["vsr"][i], pm=cols["pm"][i], obi=cols["obi"][i])) for i in range(n)]
+    assert mask.dtype == bool and mask.tolist() == expected
+
+
+def test_thresholds_rule_matches_is_candidate():
+    cfg = {"vsr": 5, "pm": 0.02, "obi": 0.25, "spread": 0.015, "listing_age_min": 900, "max_breadth": 0.6}
+    rule = rule_from_thresholds(cfg)
+    for vec in (fv(), fv(vsr=4.0), fv(spread=0.02), fv(listing_age=10.0), fv(market_breadth=0.7)):
+        assert rule(vec) == is_candidate(vec, cfg)
+    assert "spread" not in rule_from_thresholds({"vsr": 5}).features
+
+
+def test_ruleset_class_overrides():
+    rules = RuleSet.from_config(
+        {
+            "rules": {
+                "default": "vsr > 5",
+                "classes": {"majors": {"rule": "vsr > 2", "symbols": ["BTC*", "ETHUSDT"]}},
+            }
+        },
+        {},
+    )
+    vec = fv(vsr=3.0)
+    assert not rules.check(vec)
+    assert rules.check(fv("BTCUSDT", vsr=3.0))
+    assert rules.check(fv("ETHUSDT", vsr=3.0))
+    mask = rules.mask({"vsr": np.array([3.0, 3.0, 6.0])}, ["ABC", "BTCUSDT", "ABC"])
+    assert mask.tolist() == [False, True, True]
+
+
+def test_ruleset_falls_back_to_thresholds():
+    rules = RuleSet.from_config({}, {"vsr": 5, "pm": 0.02})
+    assert rules.default.features == {"vsr", "pm", "obi", "listing_age"}
+    assert rules.check(fv())
+
+
+def test_explain_lists_failed_clauses():
+    rule = Rule("vsr > 5 and pm > 0.1 and (obi > 0.5 or spread < 0.001)")
+    assert rule.explain(fv()) == ["pm > 0.1", "obi > 0.5 or spread < 0.001"]
+    assert rule.explain(fv(pm=0.2, obi=0.6)) == []
@@ -0,0 +1,104 @@
+import asyncio
+import json
+
+import aiohttp
+
+from scanner.bus import EventBus, SignalEvent
+from scanner.features import FeatureVector
+from scanner.service import ScannerService
+
+
+class StubScanner:
+    def __init__(self):
+        self.bus = EventBus()
+        self.latest = {}
+        self.ticks_processed = 0
+
+
+def fv(symbol, vsr, ready=True):
+    return FeatureVector(symbol, vsr, 0.03, 0.2, 0.0, 0.01, 1000.0, ready)
+
+
+def signal(signal_id, symbol="AAA"):
+    return SignalEvent(signal_id, fv(symbol, 9.0), 0.8, 0.0, "default", 1_700_000_000.0, price=1.5)
+
+
+def run_service(check, stream_interval=0.01):
+    sc = StubScanner()
+    sc.latest = {"AAA": fv("AAA", 2.0), "BBB": fv("BBB", 7.0), "CCC": fv("CCC", 5.0), "NEW": fv("NEW", 50.0, ready=False)}
+
+    async def run():
+        async with ScannerService(sc, port=0, stream_interval=stream_interval) as service:
+            sc.bus.start()
+            async with aiohttp.ClientSession() as session:
+                await check(service, sc, session)
+            await sc.bus.stop()
+
+    asyncio.run(run())
+
+
+def test_query_endpoints():
+    async def check(service, sc, session):
+        async with session.get(f"{service.url}/features/bbb") as resp:
+            assert resp.status == 200
+            assert (await resp.json())["vsr"] == 7.0
+        async with session.get(f"{service.url}/features/ZZZ") as resp:
+            assert resp.status == 404
+        async with session.get(f"{service.url}/top?n=2") as resp:
+            assert [d["symbol"] for d in await resp.json()] == ["BBB", "CCC"]
+        async with session.get(f"{service.url}/top?by=volume") as resp:
+            assert resp.status == 400
+        await sc.bus.publish([signal(1), signal(2, "BBB")])
+        await sc.bus.join()
+        async with session.get(f"{service.url}/signals?limit=1") as resp:
+            assert [(d["id"], d["symbol"]) for d in await resp.json()] == [(2, "BBB")]
+        async with session.get(f"{service.url}/health") as resp:
+            assert await resp.json() == {"symbols": 4, "ticks": 0, "clients": 0, "signals": 2}
+
+    run_service(check)
+
+
+def test_websocket_streams_signals_and_changed_features():
+    async def check(service, sc, session):
+        async with session.ws_connect(f"{service.url}/ws") as ws:
+            first = json.loads((await ws.receive(timeout=1)).data)
+            assert first["type"] == "features"
+            assert sorted(d["symbol"] for d in first["data"]) == ["AAA", "BBB", "CCC"]
+            sc.latest["AAA"] = fv("AAA", 3.0)
+            update = json.loads((await ws.receive(timeout=1)).data)
+            assert [d["symbol"] for d in update["data"]] == ["AAA"]
+            await sc.bus.publish([signal(5)])
+            msg = json.loads((await ws.receive(timeout=1)).data)
+            assert msg["type"] == "signal" and msg["id"] == 5 and msg["features"]["vsr"] == 9.0
+            assert service.clients == 1
+        for _ in range(100):
+            if not service.clients:
+                break
+            await asyncio.sleep(0.01)
+        assert service.clients == 0
+
+    run_service(check)
+
+
+def test_sse_signals_only():
+    async def check(service, sc, session):
+        async with session.get(f"{service.url}/events?features=0") as resp:
+            assert resp.headers["Content-Type"] == "text/event-stream"
+            await asyncio.sleep(0.05)
+            await sc.bus.publish([signal(9)])
+            event = await asyncio.wait_for(resp.content.readline(), 1)
+            data = await asyncio.wait_for(resp.content.readline(), 1)
+            assert event == b"event: signal\n"
+            assert json.loads(data[len(b"data: "):])["id"] == 9
+
+    run_service(check)
+
+
+def test_changed_features_forgets_dropped_symbols():
+    sc = StubScanner()
+    sc.latest = {"AAA": fv("AAA", 2.0), "BBB": fv("BBB", 7.0)}
+    service = ScannerService(sc)
+    assert len(service.changed_features()) == 2
+    del sc.latest["BBB"]
+    assert service.changed_features() == []
+    assert list(service._sent) == ["AAA"]
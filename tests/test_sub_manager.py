@@ -46,11 +46,105 @@ def test_eviction_ttl(monkeypatch):
     monkeypatch.setattr(sub_manager.time, "time", lambda: times[0])
     client = StubClient()
     mgr = SubscriptionManager(client, top_n=10, lru_ttl_sec=5)
+    removed = []
+    mgr.remove_listeners.append(removed.extend)
 
     run(mgr.ensure_subscribed(["AAA", "BBB"]))
+    assert removed == []
     times[0] = 6
     run(mgr.ensure_subscribed([]))
 
     assert set(client.subscribed) == {"AAA", "BBB"}
     assert set(client.unsubscribed) == {"AAA", "BBB"}
+    assert set(removed) == {"AAA", "BBB"}
     assert not mgr.active_pairs
+
+
+class BatchClient(StubClient):
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    def is_subscribed(self, sym):
+        return sym in self._symbols
+
+    async def subscribe_many(self, syms):
+        self.batches.append(("add", list(syms)))
+        for s in syms:
+            await self.subscribe(s)
+
+    async def unsubscribe_many(self, syms):
+        self.batches.append(("remove", list(syms)))
+        for s in syms:
+            await self.unsubscribe(s)
+
+
+def test_plan_is_batched(monkeypatch):
+    times = [0]
+    monkeypatch.setattr(sub_manager.time, "time", lambda: times[0])
+    client = BatchClient()
+    mgr = SubscriptionManager(client, top_n=3, lru_ttl_sec=100)
+    run(mgr.ensure_subscribed(["A", "B", "C"]))
+    times[0] = 1
+    run(mgr.ensure_subscribed(["D", "E", "A"]))
+    assert client.batches == [("add", ["A", "B", "C"]), ("add", ["D", "E"]), ("remove", ["B", "C"])]
+    assert list(mgr.active_pairs) == ["D", "E", "A"]
+
+
+def test_plan_skips_add_then_evict():
+    mgr = SubscriptionManager(StubClient(), top_n=2, lru_ttl_sec=100)
+    plan = mgr.plan(["A", "B", "C", "D"], now=0)
+    assert plan.add == ["C", "D"]
+    assert plan.remove == []
+
+
+def test_pinned_symbols_survive(monkeypatch):
+    times = [0]
+    monkeypatch.setattr(sub_manager.time, "time", lambda: times[0])
+    client = StubClient()
+    mgr = SubscriptionManager(client, top_n=2, lru_ttl_sec=10)
+    run(mgr.ensure_subscribed(["AAA"]))
+    mgr.pin("AAA", ttl_sec=100)
+    times[0] = 1
+    run(mgr.ensure_subscribed(["BBB"]))
+    times[0] = 2
+    run(mgr.ensure_subscribed(["CCC"]))
+    assert "AAA" in mgr.active_pairs
+    assert client.unsubscribed == ["BBB"]
+    times[0] = 50  # TTL passed but still pinned
+    run(mgr.ensure_subscribed([]))
+    assert list(mgr.active_pairs) == ["AAA"]
+    times[0] = 200  # pin expired
+    run(mgr.ensure_subscribed([]))
+    assert not mgr.active_pairs
+
+
+def test_large_eviction_is_linear():
+    import time as _time
+
+    mgr = SubscriptionManager(StubClient(), top_n=100, lru_ttl_sec=1e9)
+    mgr.plan([f"P{i}" for i in range(20000)], now=0)
+    start = _time.perf_counter()
+    plan = mgr.plan([f"Q{i}" for i in range(20000)], now=1)
+    assert _time.perf_counter() - start < 1.0
+    assert len(mgr.active_pairs) == 100
+    assert len(plan.remove) == 100
+
+
+def test_quality_drops_reach_remove_listeners():
+    from scanner.collector import MexcWSClient
+
+    client = MexcWSClient(["AAA"], "wss://test")
+    client.get_best = lambda symbol: ((90.0, 1.0), (100.0, 1.0))  # 10% spread
+
+    async def unsubscribe(symbol):
+        client._symbol_conn.pop(symbol, None)
+
+    client.unsubscribe = unsubscribe
+    mgr = SubscriptionManager(client, top_n=10, lru_ttl_sec=100)
+    mgr.active_pairs["AAA"] = 0.0
+    removed = []
+    mgr.remove_listeners.append(removed.extend)
+    run(client._check_quality("AAA"))
+    assert removed == ["AAA"]
+    assert "AAA" not in mgr.active_pairs
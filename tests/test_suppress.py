@@ -0,0 +1,81 @@
+import asyncio
+
+from scanner.features import FeatureVector
+from scanner.suppress import SignalSuppressor
+
+
+def make_fv(symbol, vsr=6.0):
+    return FeatureVector(
+        symbol=symbol,
+        vsr=vsr,
+        pm=0.05,
+        obi=0.3,
+        cum_depth_delta=0.0,
+        spread=0.01,
+        listing_age=1000.0,
+        ready=True,
+    )
+
+
+def test_cooldown_and_ttl_eviction():
+    sup = SignalSuppressor(cooldown_sec=60, prob_delta=0.1, vsr_delta=2.0)
+    assert sup.allow(make_fv("AAA"), 0.7, now=0)
+    assert not sup.allow(make_fv("AAA"), 0.72, now=10)
+    assert sup.allow(make_fv("BBB"), 0.7, now=20)
+    assert sup.allow(make_fv("AAA"), 0.7, now=61)
+    # BBB expires once its cooldown passes
+    sup.allow(make_fv("CCC"), 0.7, now=90)
+    assert ("default", "BBB") not in sup._last
+    assert len(sup) == 2
+
+
+def test_escalation_realerts():
+    sup = SignalSuppressor(cooldown_sec=300, prob_delta=0.1, vsr_delta=2.0)
+    assert sup.allow(make_fv("AAA", vsr=6), 0.6, now=0)
+    assert sup.allow(make_fv("AAA", vsr=6), 0.75, now=1)
+    assert not sup.allow(make_fv("AAA", vsr=7), 0.76, now=2)
+    assert sup.allow(make_fv("AAA", vsr=8.5), 0.76, now=3)
+
+
+def test_batches_group_simultaneous_signals():
+    sup = SignalSuppressor(cooldown_sec=300, batch_window_sec=0.05)
+
+    async def stream():
+        yield make_fv("AAA"), 0.7, 0.0, "default"
+        yield make_fv("BBB"), 0.7, 0.0, "default"
+        yield make_fv("AAA"), 0.7, 0.0, "default"
+        await asyncio.sleep(0.1)
+        yield make_fv("CCC"), 0.7, 0.0, "default"
+
+    async def collect():
+        return [[fv.symbol for fv, *_ in b] async for b in sup.batches(stream())]
+
+    assert asyncio.run(collect()) == [["AAA", "BBB"], ["CCC"]]
+
+
+def test_cooldown_is_per_profile():
+    sup = SignalSuppressor(cooldown_sec=60)
+    assert sup.allow(make_fv("AAA"), 0.7, now=0)
+    assert sup.allow(make_fv("AAA"), 0.7, now=1, profile="aggressive")
+    assert not sup.allow(make_fv("AAA"), 0.7, now=2, profile="aggressive")
+    assert not sup.allow(make_fv("AAA"), 0.7, now=3)
+
+
+def test_batches_reraise_source_errors():
+    sup = SignalSuppressor(cooldown_sec=300, batch_window_sec=0.01)
+
+    async def stream():
+        yield make_fv("AAA"), 0.7, 0.0, "default"
+        await asyncio.sleep(0.05)
+        raise RuntimeError("feed lost")
+
+    async def collect():
+        seen = []
+        try:
+            async for batch in sup.batches(stream()):
+                seen.append([fv.symbol for fv, *_ in batch])
+        except RuntimeError as exc:
+            return seen, str(exc)
+        return seen, None
+
+    assert asyncio.run(collect()) == ([["AAA"]], "feed lost")
@@ -30,3 +30,141 @@ def test_fetch_all_pairs(monkeypatch):
     monkeypatch.setattr(symbols.aiohttp, "ClientSession", lambda: dummy)
     res = asyncio.run(symbols.fetch_all_pairs("https://api.test"))
     assert res == ["AAA_USDT", "BBB_USDT"]
+
+
+class RoutingSession(DummySession):
+    def __init__(self, routes):
+        self.routes = routes
+        self.urls = []
+
+    def get(self, url):
+        self.urls.append(url)
+        for key, data in self.routes.items():
+            if key in url:
+                return DummyResp(data)
+        raise AssertionError(url)
+
+
+EXCHANGE_INFO = {
+    "symbols": [
+        {"symbol": "AAA_USDT", "status": "1", "baseAsset": "AAA", "quoteAsset": "USDT", "quotePrecision": 4},
+        {
+            "symbol": "BBB_USDT",
+            "status": "1",
+            "filters": [{"filterType": "PRICE_FILTER", "tickSize": "0.01"}],
+        },
+    ]
+}
+
+
+def test_symbol_cache_refresh_and_reload(tmp_path, monkeypatch):
+    session = RoutingSession({"exchangeInfo": EXCHANGE_INFO, "klines": [[1600000000000, "1"]]})
+    monkeypatch.setattr(symbols.aiohttp, "ClientSession", lambda: session)
+    path = tmp_path / "symbols.json"
+    cache = symbols.SymbolCache(path, ttl_sec=100)
+    assert cache.is_stale()
+    asyncio.run(cache.refresh("https://api.test"))
+    assert cache.symbols == ["AAA_USDT", "BBB_USDT"]
+    assert cache.meta["AAA_USDT"].tick_size == 1e-4
+    assert cache.meta["BBB_USDT"].tick_size == 0.01
+    assert cache.listing_ts("AAA_USDT") == 1600000000.0
+    assert not cache.is_stale()
+
+    # a new process reads the cache from disk without touching the network
+    monkeypatch.setattr(symbols.aiohttp, "ClientSession", lambda: None)
+    warm = symbols.SymbolCache(path)
+    assert asyncio.run(symbols.load_pairs("https://api.test", warm)) == ["AAA_USDT", "BBB_USDT"]
+    assert warm.listing_ts("BBB_USDT") == 1600000000.0
+
+
+def test_symbol_cache_keeps_listing_times(tmp_path, monkeypatch):
+    path = tmp_path / "symbols.json"
+    cache = symbols.SymbolCache(path)
+    cache.meta["AAA_USDT"] = symbols.SymbolMeta("AAA_USDT", listing_ts=123.0)
+    session = RoutingSession({"exchangeInfo": EXCHANGE_INFO, "klines": [[5000, "1"]]})
+    monkeypatch.setattr(symbols.aiohttp, "ClientSession", lambda: session)
+    asyncio.run(cache.refresh("https://api.test"))
+    assert cache.listing_ts("AAA_USDT") == 123.0
+    assert cache.listing_ts("BBB_USDT") == 5.0
+    assert sum("klines" in u for u in session.urls) == 1
+    assert all("interval=1m" in u for u in session.urls if "klines" in u)
+
+
+def test_symbol_cache_ignores_incompatible_file(tmp_path):
+    path = tmp_path / "symbols.json"
+    path.write_text('{"fetched_at": 1, "symbols": [{"symbol": "AAA_USDT", "retired": true}]}')
+    cache = symbols.SymbolCache(path)
+    assert cache.meta == {} and cache.is_stale()
+
+
+def test_symbol_cache_retries_failed_lookups_later(tmp_path, monkeypatch):
+    session = RoutingSession({"exchangeInfo": EXCHANGE_INFO, "klines": []})
+    monkeypatch.setattr(symbols.aiohttp, "ClientSession", lambda: session)
+    path = tmp_path / "symbols.json"
+    cache = symbols.SymbolCache(path, retry_sec=600)
+    asyncio.run(cache.refresh("https://api.test"))
+    assert cache.listing_ts("AAA_USDT") is None
+    assert cache.meta["AAA_USDT"].lookup_failed_ts is not None
+    # failures persist, so the fresh cache has nothing to do until the retry
+    warm = symbols.SymbolCache(path, retry_sec=600)
+    assert not warm.is_stale()
+    assert warm.missing_listings() == []
+    session.urls.clear()
+    assert asyncio.run(warm.lookup_missing("https://api.test")) == 0
+    assert session.urls == []
+
+    session.routes["klines"] = [[5000, "1"]]
+    later = max(m.lookup_failed_ts for m in warm.meta.values()) + 600
+    assert len(warm.missing_listings(now=later)) == 2
+    for meta in warm.meta.values():
+        meta.lookup_failed_ts -= 600
+    assert asyncio.run(warm.lookup_missing("https://api.test")) == 2
+    assert all("klines" in u for u in session.urls)
+    assert warm.listing_ts("BBB_USDT") == 5.0
+    assert warm.meta["BBB_USDT"].lookup_failed_ts is None
+
+
+def test_symbol_cache_charges_rest_weight(tmp_path, monkeypatch):
+    spent = []
+
+    async def acquire(weight):
+        spent.append(weight)
+
+    session = RoutingSession({"exchangeInfo": EXCHANGE_INFO, "klines": [[5000, "1"]]})
+    monkeypatch.setattr(symbols.aiohttp, "ClientSession", lambda: session)
+    cache = symbols.SymbolCache(tmp_path / "symbols.json", acquire=acquire)
+    asyncio.run(cache.refresh("https://api.test"))
+    assert spent == [10, 1, 1]
+
+
+def test_feature_engine_uses_listing_time(monkeypatch):
+    import scanner.features as features
+    from scanner.collector import Tick
+
+    monkeypatch.setattr(features.time, "time", lambda: 10000.0)
+
+    class Meta:
+        def listing_ts(self, symbol):
+            return 1000.0 if symbol == "OLD" else None
+
+    class Client:
+        def get_cum_depth(self, symbol):
+            return None
+
+        def get_microstructure(self, symbol):
+            return None
+
+        def get_trades(self, symbol):
+            return None
+
+        def drain_candles(self, symbol):
+            return []
+
+        def get_best(self, symbol):
+            return None
+
+    engine = features.FeatureEngine(Meta())
+    tick = Tick("OLD", {"c": "1", "quoteVol": "1"}, {}, 0)
+    assert engine.update(tick, Client()).listing_age == 9000.0
+    tick = Tick("NEW", {"c": "1", "quoteVol": "1"}, {}, 0)
+    assert engine.update(tick, Client()).listing_age == 0.0
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from scanner import trades
+from scanner.trades import TradeAggregator
+
+
+def _deal(p, v, side, t):
+    return {"p": str(p), "v": str(v), "S": side, "t": t}
+
+
+def test_aggregates_per_second():
+    agg = TradeAggregator(large_trade_usd=1000)
+    agg.add_deals([_deal(10, 5, 1, 1000), _deal(10, 200, 2, 1500), _deal(11, 1, 1, 1999)], now=0)
+    agg.add_deals([_deal(12, 2, 1, 2100)], now=0)
+    secs, rows = agg.drain()
+    assert list(secs) == [1]
+    row = rows[0]
+    assert row[trades.BUY_VOL] == pytest.approx(61)
+    assert row[trades.SELL_VOL] == pytest.approx(2000)
+    assert (row[trades.BUY_COUNT], row[trades.SELL_COUNT], row[trades.LARGE]) == (2, 1, 1)
+    # 11 -> <100, 50 -> <100, 2000 -> <10k bucket
+    assert list(row[trades.HIST:]) == [2, 0, 1, 0, 0]
+
+    agg.roll(now=3.0)
+    secs, rows = agg.drain()
+    assert list(secs) == [2] and rows[0][trades.BUY_VOL] == pytest.approx(24)
+    assert len(agg.drain()[0]) == 0
+
+
+def test_batch_spanning_seconds_and_ring_overflow():
+    agg = TradeAggregator(capacity=3)
+    agg.add_deals([_deal(1, 1, 1, t * 1000) for t in range(6)], now=0)
+    agg.roll(now=10)
+    secs, rows = agg.drain()
+    assert list(secs) == [3, 4, 5]  # oldest seconds overwritten
+    assert agg.trades == 6
+
+
+def test_summarize_burst():
+    agg = TradeAggregator(large_trade_usd=50)
+    rng = np.random.default_rng(0)
+    burst = [_deal(1.0, q, 1 if i % 4 else 2, 5000) for i, q in enumerate(rng.uniform(1, 100, 5000))]
+    agg.add_deals(burst, now=0)
+    agg.roll(now=6)
+    _, rows = agg.drain()
+    s = trades.summarize(rows)
+    assert s["trade_count"] == 5000
+    assert s["buy_ratio"] == pytest.approx(0.75, abs=0.02)
+    assert 0 < s["large_trades"] < 5000
+    assert s["small_share"] == 1.0
+    assert s["vwap"] == pytest.approx(1.0)
+    assert trades.summarize(np.zeros((0, trades.ROW_SIZE)))["buy_ratio"] == 0.0
@@ -0,0 +1,102 @@
+import json
+import sqlite3
+
+import numpy as np
+import pytest
+
+import scanner.model as model
+import scanner.storage as storage
+import scanner.train as train
+
+
+def make_db(path, n=2000, seed=1):
+    storage.init_db(path)
+    rng = np.random.default_rng(seed)
+    conn = sqlite3.connect(path)
+    for i in range(n):
+        vsr = float(rng.uniform(0, 10))
+        pm = float(rng.normal(0.02, 0.01))
+        conn.execute(
+            "INSERT INTO signals(symbol, vsr, pm, probability, ts) VALUES(?,?,?,?,?)",
+            ("AAA", vsr, pm, 0.5, i),
+        )
+        if i % 7 == 3:
+            continue  # unlabelled signal
+        buy = rng.random() < (0.9 if vsr > 5 else 0.1)
+        conn.execute(
+            "INSERT INTO actions(signal_id, action, ts) VALUES(?,?,?)",
+            (i + 1, "buy" if buy else "skip", i),
+        )
+    conn.commit()
+    conn.close()
+
+
+def test_sqlite_chunks_are_bounded(tmp_path):
+    db = tmp_path / "pump.db"
+    make_db(db, n=100)
+    chunks = list(train.sqlite_chunks(["vsr", "pm"], 25, db)())
+    assert all(len(ids) <= 25 for ids, _, _ in chunks)
+    total = sum(len(ids) for ids, _, _ in chunks)
+    assert total == 100 - len([i for i in range(100) if i % 7 == 3])
+
+
+@pytest.mark.parametrize("kind", ["logistic", "tree_ensemble"])
+def test_train_writes_versioned_model(tmp_path, monkeypatch, kind):
+    monkeypatch.setattr(model, "get_thresholds", lambda: {"vsr": 5, "pm": 0.02, "obi": 0.25})
+    db = tmp_path / "pump.db"
+    make_db(db)
+    out = tmp_path / "model.json"
+    data = train.train(out, kind, db_path=db, chunk_size=128, epochs=3, rounds=10)
+
+    saved = json.loads(out.read_text())
+    assert saved["type"] == kind
+    assert saved["version"] == data["version"]
+    assert saved["features"] == ["vsr", "pm"]
+    cal = saved["calibration"]
+    assert cal["n_eval"] > 0
+    assert sum(b["count"] for b in cal["bins"]) == cal["n_eval"]
+    assert cal["brier"] < 0.2
+
+    m = model.load_model(out)
+    probs = m.predict_batch(np.array([[1.0, 0.02], [9.0, 0.02]]))
+    assert probs[0] < 0.3 < 0.7 < probs[1]
+
+
+def test_train_from_parquet(tmp_path, monkeypatch):
+    pd = pytest.importorskip("pandas")
+    monkeypatch.setattr(model, "get_thresholds", lambda: {})
+    db = tmp_path / "pump.db"
+    make_db(db, n=500)
+    conn = sqlite3.connect(db)
+    df = pd.read_sql("SELECT id, symbol, vsr, pm, probability, ts FROM signals", conn)
+    conn.close()
+    pq_path = tmp_path / "signals_202501.parquet"
+    df.to_parquet(pq_path, index=False)
+
+    data = train.train(tmp_path / "m.json", db_path=db, parquet=[str(pq_path)], chunk_size=64)
+    assert data["n_samples"] > 0
+    assert data["coefficients"]["vsr"] > 0
+
+
+def test_train_on_optional_features(tmp_path, monkeypatch):
+    monkeypatch.setattr(model, "get_thresholds", lambda: {})
+    db = tmp_path / "pump.db"
+    make_db(db, n=500)
+    with pytest.raises(ValueError, match="not recorded: ofi"):
+        train.train(tmp_path / "m.json", db_path=db, features=["vsr", "ofi"])
+    with pytest.raises(ValueError, match="Unknown features: volume"):
+        train.train(tmp_path / "m.json", db_path=db, features=["volume"])
+    conn = sqlite3.connect(db)
+    conn.execute("UPDATE signals SET ofi = vsr / 10")
+    conn.commit()
+    conn.close()
+    data = train.train(tmp_path / "m.json", db_path=db, features=["ofi", "vsr"])
+    assert data["features"] == ["vsr", "ofi"]
+    assert set(data["coefficients"]) == {"vsr", "ofi"}
+
+
+def test_train_without_labels(tmp_path):
+    db = tmp_path / "pump.db"
+    storage.init_db(db)
+    with pytest.raises(ValueError):
+        train.train(tmp_path / "m.json", db_path=db)
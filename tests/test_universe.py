@@ -0,0 +1,132 @@
+import asyncio
+import time
+
+import numpy as np
+
+import scanner.scanner as scanner_mod
+import scanner.universe as universe
+from scanner.features import WARMUP_SEC
+from scanner.sub_manager import SubscriptionManager
+from scanner.universe import UniverseScanner
+
+
+def payload(n, vol, price, bid=None, ask=None):
+    return [
+        {
+            "symbol": f"S{i}_USDT",
+            "quoteVolume": str(vol[i]),
+            "lastPrice": str(price[i]),
+            "bidPrice": str(bid[i] if bid is not None else price[i] * 0.999),
+            "askPrice": str(ask[i] if ask is not None else price[i] * 1.001),
+        }
+        for i in range(n)
+    ]
+
+
+CFG = {"window_sec": 60, "pre_vsr": 3, "pre_pm": 0.01, "max_spread": 0.015, "min_quote_vol_usd": 0}
+
+
+def test_promotes_only_pumping_pairs():
+    n = 2000
+    us = UniverseScanner("https://api.test", CFG)
+    vol = np.full(n, 864000.0)  # 10 USDT/s on average
+    price = np.ones(n)
+    assert us.update(payload(n, vol, price), now=0) == []
+
+    vol2 = vol + 300.0  # normal pace: 30 s * 10 USDT/s
+    vol2[7] += 5000.0
+    price2 = price.copy()
+    price2[7] = 1.05
+    price2[8] = 1.05  # price move without volume
+    assert us.update(payload(n, vol2, price2), now=30) == ["S7_USDT"]
+    feats = us.last_features
+    assert feats["rel_vol"].shape == (n,)
+    assert abs(feats["rel_vol"][0] - 1.0) < 1e-3
+
+
+def test_wide_spread_not_promoted_and_cap():
+    us = UniverseScanner("https://api.test", {**CFG, "max_promote": 1})
+    vol = np.full(3, 86400.0)
+    price = np.ones(3)
+    us.update(payload(3, vol, price), now=0)
+    vol2 = vol + np.array([1000.0, 2000.0, 3000.0])
+    price2 = np.array([1.05, 1.05, 1.05])
+    bid = price2 * 0.999
+    ask = price2 * 1.001
+    ask[2] = price2[2] * 1.1
+    assert us.update(payload(3, vol2, price2, bid, ask), now=10) == ["S1_USDT"]
+
+
+def test_new_symbols_and_window(monkeypatch):
+    us = UniverseScanner("https://api.test", {**CFG, "history": 4})
+    us.update(payload(1, [86400.0], [1.0]), now=0)
+    # snapshot older than the window is ignored
+    assert us.update(payload(2, [96400.0, 10.0], [1.5, 1.0]), now=120) == []
+    assert us.symbols == ["S0_USDT", "S1_USDT"]
+
+
+def test_poll(monkeypatch):
+    class Resp:
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return payload(2, [100.0, 100.0], [1.0, 1.0])
+
+    class Client:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            pass
+
+        async def get(self, url):
+            assert url.endswith("/api/v3/ticker/24hr")
+            return Resp()
+
+    monkeypatch.setattr(universe.httpx, "AsyncClient", lambda: Client())
+    us = UniverseScanner("https://api.test", CFG)
+    assert asyncio.run(us.poll()) == []
+    assert us.request_count == 1
+
+
+def test_promoted_pairs_survive_scout_polls():
+    class Client:
+        def __init__(self):
+            self.subscribed = set()
+
+        async def subscribe_many(self, symbols):
+            self.subscribed.update(symbols)
+
+        async def unsubscribe_many(self, symbols):
+            self.subscribed.difference_update(symbols)
+
+        def is_subscribed(self, symbol):
+            return symbol in self.subscribed
+
+    class Universe:
+        cfg = {"poll_interval": 60}
+
+        async def poll(self):
+            return ["NEW_USDT"]
+
+    class Scheduler:
+        async def acquire(self, weight):
+            pass
+
+    sc = scanner_mod.Scanner.__new__(scanner_mod.Scanner)
+    sc.universe = Universe()
+    sc.scheduler = Scheduler()
+    sc.sub_manager = SubscriptionManager(Client(), top_n=2, lru_ttl_sec=60)
+
+    async def run():
+        task = asyncio.create_task(sc._universe_loop())
+        await asyncio.sleep(0.01)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        # the next scout poll fills the tier with other pairs
+        await sc.sub_manager.ensure_subscribed(["AAA_USDT", "BBB_USDT", "CCC_USDT"])
+
+    asyncio.run(run())
+    assert sc.sub_manager.client.is_subscribed("NEW_USDT")
+    assert sc.sub_manager.pinned["NEW_USDT"] > time.time() + WARMUP_SEC - 60
@@ -62,3 +62,67 @@ def test_poll_stats_no_history(monkeypatch):
     assert ps.vol_delta_5m == 0
     assert ps.pm_delta_5m == 0
 
+
+
+def _stats(symbols, pm=0.0):
+    return [scout.PairStat(s, 1e6, 0.0, pm, 1.0) for s in symbols]
+
+
+ADAPTIVE = {
+    "enabled": True,
+    "min_interval": 10,
+    "max_interval": 120,
+    "weight_per_poll": 40,
+    "weight_budget_per_min": 600,
+    "top_k": 5,
+    "near_target": 5,
+}
+
+
+def test_scheduler_disabled_uses_base_interval():
+    sched = scout.AdaptivePollScheduler({}, base_interval=60)
+    assert sched.next_interval(_stats(["A"]), 1, now=0) == 60
+
+
+def test_scheduler_speeds_up_on_activity_and_backs_off():
+    sched = scout.AdaptivePollScheduler(ADAPTIVE, base_interval=60)
+    quiet = _stats(["A", "B", "C", "D", "E"])
+    # quiet market: back off geometrically towards max_interval
+    assert sched.next_interval(quiet, 1, now=0) == 90
+    assert sched.next_interval(quiet, 2, now=90) == 120
+    assert sched.next_interval(quiet, 3, now=210) == 120
+    # top set fully replaced -> maximal activity
+    hot = _stats(["F", "G", "H", "I", "J"])
+    assert sched.next_interval(hot, 4, now=270) == 10
+    # many symbols near the PM threshold keep the pace high
+    near = _stats(["F", "G", "H", "I", "J"], pm=0.02)
+    assert sched.next_interval(near, 5, now=280) == 10
+
+
+def test_scheduler_respects_weight_budget():
+    cfg = {**ADAPTIVE, "weight_budget_per_min": 120}
+    sched = scout.AdaptivePollScheduler(cfg, base_interval=60)
+    hot = [_stats([f"{c}{i}" for i in range(5)]) for c in "ABCDEF"]
+    delays = []
+    now = 0.0
+    for n, stats in enumerate(hot, start=1):
+        d = sched.next_interval(stats, n, now=now)
+        delays.append(d)
+        now += d
+    assert min(delays) >= 20  # 60 * 40 / 120
+    assert sched.spent_weight(now) <= 120 + 40
+
+
+def test_scheduler_budget_shared_with_other_requests():
+    cfg = {**ADAPTIVE, "weight_budget_per_min": 120}
+    sched = scout.AdaptivePollScheduler(cfg, base_interval=60)
+    sched.charge(40, now=0)
+    sched.charge(40, now=10)
+    assert sched.wait_time(40, now=20) == 0
+    sched.charge(40, now=20)
+    # full: the next request waits for the first entry to leave the window
+    assert sched.wait_time(40, now=30) == 30
+    assert sched.wait_time(80, now=30) == 40
+    # the scout poll sees the weight spent by others
+    assert sched.next_interval(_stats(["A"]), 1, now=30) >= 30
+    assert scout.AdaptivePollScheduler({}, 60).wait_time(1000, now=0) == 0
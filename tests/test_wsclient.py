@@ -50,3 +50,94 @@ def test_subscribe_unsubscribe(monkeypatch):
     run(client.unsubscribe("A0"))
     assert client._stream_counts == [28, 2]
     assert client.active_streams == 30
+
+
+def test_mailbox_coalesces_per_symbol():
+    from scanner.collector import Tick, TickMailbox
+
+    box = TickMailbox(maxsize=10)
+    box.put(Tick("AAA", {"c": "1"}, {}, 0))
+    box.put(Tick("BBB", {"c": "2"}, {}, 0))
+    box.put(Tick("AAA", {"c": "3"}, {}, 1))
+    assert len(box) == 2
+    assert box.coalesced == 1
+    first = run(box.get())
+    assert first.symbol == "AAA" and first.kline["c"] == "3"
+    assert run(box.get()).symbol == "BBB"
+
+
+def test_mailbox_bounded_overflow():
+    from scanner.collector import Tick, TickMailbox
+
+    box = TickMailbox(maxsize=3)
+    for i in range(5):
+        box.put(Tick(f"S{i}", {}, {}, i))
+    assert len(box) == 3
+    assert box.overflowed == 2
+    assert [run(box.get()).symbol for _ in range(3)] == ["S2", "S3", "S4"]
+
+
+def test_subscribe_many_batches_messages(monkeypatch):
+    conns = []
+    async def fake_connect(url):
+        ws = DummyWS()
+        conns.append(ws)
+        return ws
+    monkeypatch.setattr(MexcWSClient, "_reader", dummy_reader)
+    monkeypatch.setattr("scanner.collector.websockets.connect", fake_connect)
+    client = MexcWSClient(["S0"])
+    run(client.connect())
+    run(client.subscribe_many([f"A{i}" for i in range(20)]))
+    assert client._stream_counts == [30, 12]
+    assert len(conns[0].sent) == 2 and len(conns[1].sent) == 1
+    assert client.is_subscribed("A19")
+    run(client.unsubscribe_many(["A0", "A19", "missing"]))
+    assert client._stream_counts == [28, 10]
+    assert conns[0].sent[-1]["method"] == "UNSUBSCRIPTION"
+    assert not client.is_subscribed("A0")
+    assert "A19" not in client._symbols
+
+
+def test_volume_window_counts_each_candle_once():
+    client = MexcWSClient(["AAA"])
+
+    async def feed():
+        for t, vol in [(1000, 5), (1000, 8), (1000, 8), (2000, 3), (2000, 6), (3000, 1)]:
+            client._update_kline("AAA", {"t": t, "c": "1", "quoteVol": str(vol)})
+
+    run(feed())
+    assert [v for _, v in client._volume_window["AAA"]] == [8.0, 6.0]
+
+
+def test_deals_stream(monkeypatch):
+    conns = []
+    async def fake_connect(url):
+        ws = DummyWS()
+        conns.append(ws)
+        return ws
+    monkeypatch.setattr(MexcWSClient, "_reader", dummy_reader)
+    monkeypatch.setattr("scanner.collector.websockets.connect", fake_connect)
+    client = MexcWSClient([f"S{i}" for i in range(11)], trades=True)
+    run(client.connect())
+    assert client._stream_counts == [30, 3]
+    assert "S0@deals" in conns[0].sent[0]["params"]
+
+    deals = [{"p": "2", "v": "10", "S": 1, "t": 1000}, {"p": "2", "v": "5", "S": 2, "t": 1000}]
+    run(client._handle_message({"stream": "S0@deals", "data": {"s": "S0", "deals": deals}}))
+    agg = client.get_trades("S0")
+    agg.roll(now=2)
+    assert agg.drain()[1][0][:2].tolist() == [20.0, 10.0]
+    run(client.unsubscribe("S0"))
+    assert client.get_trades("S0") is None
+    assert client._stream_counts == [27, 3]
+
+
+def test_book_listeners_get_sorted_levels():
+    client = MexcWSClient(["AAA"])
+    seen = []
+    client.book_listeners.append(lambda s, bids, asks: seen.append((s, bids[0], asks[0])))
+    client._update_depth("AAA", {"b": [["99.98", "1"], ["100", "2"]], "a": [["100.12", "3"], ["100.1", "4"]]})
+    assert seen == [("AAA", (100.0, 2.0), (100.1, 4.0))]
+    bids, asks = client.get_levels("AAA")
+    assert bids == [(100.0, 2.0), (99.98, 1.0)] and asks == [(100.1, 4.0), (100.12, 3.0)]
+    assert client.get_levels("BBB") is None